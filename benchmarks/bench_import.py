@@ -0,0 +1,54 @@
+""" Import time benchmark of the package entry points, measured with `python -X importtime` in a fresh interpreter.
+
+    Each statement is run in its own subprocess, so every module it pulls in is imported from scratch:
+
+        pygment             the top level package, which loads the renderer, components and pygame lazily
+        pygment.editor      the `Style` class, used by headless tools without pygame
+        pygment.component   one component class, which imports only its own module
+        ViewRenderer        the renderer, which imports pygame
+
+    Run with `python -m benchmarks.bench_import` from the repository root.
+"""
+from __future__ import annotations
+import os
+import subprocess
+import sys
+
+
+STATEMENTS = {
+    "pygment": "import pygment",
+    "pygment.editor": "from pygment.editor import Style",
+    "pygment.component": "from pygment.component import Frame",
+    "ViewRenderer": "from pygment import ViewRenderer",
+}
+REPEAT = 5
+
+
+def import_times(statement: str) -> dict[str, tuple[int, int]]:
+    """ Run a statement in a fresh interpreter and get the (self, cumulative) import time of every module it imported, in µs. """
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1", SDL_VIDEODRIVER="dummy")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], 
+        capture_output=True, text=True, check=True, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("| imported package"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def total_ms(statement: str) -> float:
+    """ Get the shortest of `REPEAT` total import times of a statement, in ms. """
+    return min(sum(self_us for self_us, _ in import_times(statement).values()) for _ in range(REPEAT)) / 1000
+
+
+def run() -> dict[str, float]:
+    return {f"{name}_ms": total_ms(statement) for name, statement in STATEMENTS.items()}
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:>20}: {value:>12,.3f}")
@@ -0,0 +1,91 @@
+""" Startup benchmark of building a layout from Python statements, from a JSON spec and from a binary snapshot.
+
+    The layout is a grid of cards, each made of a frame with an image placeholder, a title and a button, styled the
+    same way as the spotify card example. Every way of building it is timed from its source form:
+
+        python    constructing and joining the components directly
+        json      parsing the JSON spec and building it with `build_layout`
+        snapshot  decoding the binary snapshot and building it with `LayoutSnapshot.build`
+
+    Run with `python -m benchmarks.bench_loader [card count]` from the repository root.
+"""
+from __future__ import annotations
+from typing import Any, Callable
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from pygment.component import Button, Frame, Label
+from pygment.core.layoutnode import LayoutNode
+from pygment.core.loader import LayoutSnapshot, build_layout
+
+
+REPEAT = 5
+
+
+def build_python(count: int) -> tuple[LayoutNode, ...]:
+    root = Frame("grid", (0, 0, "100sw", "100sh"), color=(18, 18, 18))
+    for i in range(count):
+        card = Frame(f"card{i}", (f"{i % 8 * 12.5}pw", i // 8 * 220, "12pw", 200), color=(24, 24, 24), border_radius=10)
+        card.join(root)
+        image = Frame("card_image", ("50pw", 10, "85pw", "60ph"), color="darkgreen", border_radius=6, centered=True)
+        image.join(card)
+        Label("title", (10, "70ph", "80pw", 20), text=f"Playlist {i}", text_color=(220, 220, 220), text_size=18).join(card)
+        Button("button_play", ("80pw", "50ph", 30, 30), color=(30, 215, 96), border_radius=30, centered=True, hidden=True).join(image)
+    return (root,)
+
+
+def make_spec(count: int) -> dict[str, Any]:
+    cards = []
+    for i in range(count):
+        cards.append({
+            "type": "Frame", "name": f"card{i}", "rect": [f"{i % 8 * 12.5}pw", i // 8 * 220, "12pw", 200],
+            "style": {"color": [24, 24, 24], "border_radius": 10},
+            "children": [
+                {
+                    "type": "Frame", "name": "card_image", "rect": ["50pw", 10, "85pw", "60ph"],
+                    "style": {"color": "darkgreen", "border_radius": 6, "centered": True},
+                    "children": [{
+                        "type": "Button", "name": "button_play", "rect": ["80pw", "50ph", 30, 30],
+                        "style": {"color": [30, 215, 96], "border_radius": 30, "centered": True, "hidden": True},
+                    }],
+                },
+                {
+                    "type": "Label", "name": "title", "rect": [10, "70ph", "80pw", 20],
+                    "style": {"text": f"Playlist {i}", "text_color": [220, 220, 220], "text_size": 18},
+                },
+            ],
+        })
+    return {"type": "Frame", "name": "grid", "rect": [0, 0, "100sw", "100sh"], "style": {"color": [18, 18, 18]}, "children": cards}
+
+
+def best_time(operation: Callable[[], Any]) -> float:
+    """ Return the shortest of `REPEAT` runs of an operation, in ms. """
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def run(count: int = 500) -> dict[str, float]:
+    text = json.dumps(make_spec(count))
+    data = LayoutSnapshot.from_spec(json.loads(text)).to_bytes()
+    return {
+        "python_ms": best_time(lambda: build_python(count)),
+        "json_ms": best_time(lambda: build_layout(json.loads(text))),
+        "snapshot_ms": best_time(lambda: LayoutSnapshot.from_bytes(data).build()),
+        "snapshot_decode_ms": best_time(lambda: LayoutSnapshot.from_bytes(data)),
+        "json_bytes": len(text),
+        "snapshot_bytes": len(data),
+    }
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    for name, value in run(count).items():
+        print(f"{name:>20}: {value:>12,.3f}")
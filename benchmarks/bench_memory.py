@@ -0,0 +1,75 @@
+""" Memory benchmark of layout nodes, measured in bytes per node with `tracemalloc`.
+
+    Builds flat lists of `Frame` components, with and without style attributes and callbacks, and reports the memory
+    allocated for each node, including its style. Classed nodes take the same style attributes from a shared style class.
+
+    Run with `python -m benchmarks.bench_memory [node count]` from the repository root.
+"""
+from __future__ import annotations
+from typing import Callable
+import gc
+import sys
+import tracemalloc
+
+from pygment.component import Frame
+from pygment.core.layoutnode import LayoutNode
+from pygment.editor import Style
+
+
+def measure(build: Callable[[int], LayoutNode], count: int) -> float:
+    """ Return the number of bytes allocated per node by a node factory called `count` times. """
+    warmup = build(count) # warm up the caches of the first instantiation
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del nodes, warmup
+    return (after - before) / count
+
+
+def bare_node(i: int) -> LayoutNode:
+    return Frame(f"item{i}", (0, i * 20, "100pw", 20))
+
+
+def styled_node(i: int) -> LayoutNode:
+    return Frame(f"item{i}", (0, i * 20, "100pw", 20), color=(40, 40, 40), border_radius=4)
+
+
+ITEM_STYLE = Style(color=(40, 40, 40), border_radius=4)
+
+
+def classed_node(i: int) -> LayoutNode:
+    return Frame(f"item{i}", (0, i * 20, "100pw", 20), Style(classes=[ITEM_STYLE]))
+
+
+def interactive_node(i: int) -> LayoutNode:
+    node = Frame(f"item{i}", (0, i * 20, "100pw", 20), color=(40, 40, 40), border_radius=4)
+    node.on_mouse_click = lambda obj: None
+    return node
+
+
+def child_node(parent: LayoutNode) -> Callable[[int], LayoutNode]:
+    def build(i: int) -> LayoutNode:
+        node = Frame(f"item{i}", (0, i * 20, "100pw", 20))
+        node.join(parent)
+        return node
+    return build
+
+
+def run(count: int = 10_000) -> dict[str, float]:
+    parent = Frame("list", (0, 0, "100sw", "100sh"))
+    return {
+        "bare_bytes_per_node": measure(bare_node, count),
+        "styled_bytes_per_node": measure(styled_node, count),
+        "classed_bytes_per_node": measure(classed_node, count),
+        "interactive_bytes_per_node": measure(interactive_node, count),
+        "child_bytes_per_node": measure(child_node(parent), count),
+    }
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    for name, value in run(count).items():
+        print(f"{name:>28}: {value:>10,.0f}")
@@ -0,0 +1,247 @@
+""" Headless benchmark suite of the `ViewRenderer` frame loop.
+
+    Runs under the SDL dummy video driver, so no display is needed. Synthetic layouts of three shapes are generated
+    at every requested node count:
+
+        chain   deep chains of nested frames, each sized relative to its parent
+        flat    a wide flat list of frames under a single root, laid out in a grid
+        nested  a balanced tree of frames positioned and sized with `pw`/`ph` units
+
+    and the following operations are timed on each of them:
+
+        first_frame  building a renderer for the layout and producing its first frame
+        update       an idle `update` call with the mouse standing still
+        render       an idle `render` call with nothing to repaint
+        hover        moving the mouse to a random position and resolving hover in `update`
+        resize       changing the renderer `size` and producing a frame
+        drag         a burst of small `VIDEORESIZE` events, as sent while dragging the window edge, and a frame
+        style        changing the color of a random node and producing a frame
+
+    Results are written as JSON and can be compared against a previously stored run:
+
+        python -m benchmarks.bench_renderer --output baseline.json
+        python -m benchmarks.bench_renderer --baseline baseline.json --output current.json
+
+    Comparing exits with status 1 when any operation got slower than the baseline by more than the threshold.
+"""
+from __future__ import annotations
+from typing import Any, Callable
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from pygment import ViewRenderer
+from pygment.component import Frame
+from pygment.core.layoutnode import LayoutNode
+
+
+SURFACE_SIZE = (800, 600)
+RESIZED_SIZE = (640, 480)
+
+CHAIN_DEPTH = 128
+""" Maximum depth of a single chain. Geometry is resolved recursively through the parents, so deeper chains
+    would exceed the interpreter's recursion limit. Larger node counts are split into several chains.
+"""
+
+NESTED_BRANCHING = 4
+
+DEFAULT_SIZES = (100, 1_000, 10_000)
+FULL_SIZES = (100, 1_000, 10_000, 100_000)
+
+
+def build_chain(count: int) -> tuple[LayoutNode, ...]:
+    roots = []
+    for c in range(0, count, CHAIN_DEPTH):
+        node = root = Frame(f"chain{c}", (c // CHAIN_DEPTH * 3 % 200, 0, "100sw", "100sh"), color=(20, 20, 20))
+        roots.append(root)
+        for i in range(1, min(CHAIN_DEPTH, count - c)):
+            child = Frame(f"link{i}", (1, 1, "99pw", "99ph"), color=(i % 256, 40, 40))
+            child.join(node)
+            node = child
+    return tuple(roots)
+
+
+def build_flat(count: int) -> tuple[LayoutNode, ...]:
+    root = Frame("list", (0, 0, "100sw", "100sh"), color=(20, 20, 20))
+    columns = 40
+    for i in range(count - 1):
+        row, column = divmod(i, columns)
+        Frame(f"item{i}", (column * 20, row * 20 % 2000, 18, 18), color=(40, i % 256, 40)).join(root)
+    return (root,)
+
+
+def build_nested(count: int) -> tuple[LayoutNode, ...]:
+    root = Frame("tree", (0, 0, "100sw", "100sh"), color=(20, 20, 20))
+    created, level = 1, [root]
+    while created < count:
+        next_level = []
+        for parent in level:
+            for i in range(NESTED_BRANCHING):
+                if created == count:
+                    break
+                node = Frame(f"node{i}", (f"{i * 25}pw", f"{(i * 37) % 50}ph", "25pw", "50ph"), color=(40, 40, created % 256))
+                node.join(parent)
+                next_level.append(node)
+                created += 1
+        level = next_level
+    return (root,)
+
+
+LAYOUTS: dict[str, Callable[[int], tuple[LayoutNode, ...]]] = {
+    "chain": build_chain,
+    "flat": build_flat,
+    "nested": build_nested,
+}
+
+
+def all_nodes(layout: tuple[LayoutNode, ...]) -> list[LayoutNode]:
+    nodes = []
+    for root in layout:
+        ViewRenderer._cascade_action(root, nodes.append)
+    return nodes
+
+
+def measure(operation: Callable[[], Any], repeat: int, min_time: float) -> list[float]:
+    """ Time an operation at least 3 and at most `repeat` times, stopping early after `min_time` seconds. """
+    timings: list[float] = []
+    started = time.perf_counter()
+    while len(timings) < repeat and (len(timings) < 3 or time.perf_counter() - started < min_time):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings: list[float]) -> dict[str, float]:
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "runs": len(timings),
+    }
+
+
+def bench_layout(shape: str, count: int, repeat: int, min_time: float, seed: int = 0) -> dict[str, dict[str, float]]:
+    rng = random.Random(seed)
+    layout = LAYOUTS[shape](count)
+    nodes = all_nodes(layout)
+    dest = pygame.surface.Surface(SURFACE_SIZE)
+
+    start = time.perf_counter()
+    renderer = ViewRenderer(SURFACE_SIZE, layout)
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    results = {"first_frame": summarize([time.perf_counter() - start])}
+
+    def frame():
+        renderer.update(16)
+        renderer.render(dest, (0, 0))
+
+    def hover():
+        position = (rng.randrange(SURFACE_SIZE[0]), rng.randrange(SURFACE_SIZE[1]))
+        renderer.handle_event(pygame.event.Event(pygame.MOUSEMOTION, pos=position))
+        renderer.update(16)
+
+    def resize():
+        renderer.size = RESIZED_SIZE if renderer.size == SURFACE_SIZE else SURFACE_SIZE
+        frame()
+
+    def drag():
+        width, height = renderer.size
+        step = 8 if width <= SURFACE_SIZE[0] else -8
+        for i in range(1, 4):
+            size = (width + i * step, height + i * step)
+            renderer.handle_event(pygame.event.Event(pygame.VIDEORESIZE, size=size, w=size[0], h=size[1]))
+        frame()
+
+    def style():
+        rng.choice(nodes).style.color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        frame()
+
+    results["update"] = summarize(measure(lambda: renderer.update(16), repeat, min_time))
+    results["render"] = summarize(measure(lambda: renderer.render(dest, (0, 0)), repeat, min_time))
+    results["hover"] = summarize(measure(hover, repeat, min_time))
+    results["resize"] = summarize(measure(resize, repeat, min_time))
+    results["drag"] = summarize(measure(drag, repeat, min_time))
+    results["style"] = summarize(measure(style, repeat, min_time))
+    return results
+
+
+def run(sizes: tuple[int, ...] = DEFAULT_SIZES, shapes: tuple[str, ...] = tuple(LAYOUTS), repeat: int = 50, min_time: float = 0.5) -> dict[str, Any]:
+    """ Run the suite and return the results keyed by "shape/node count/operation". """
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    results = {}
+    for shape in shapes:
+        for count in sizes:
+            for operation, summary in bench_layout(shape, count, repeat, min_time).items():
+                results[f"{shape}/{count}/{operation}"] = summary
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "surface_size": SURFACE_SIZE,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> list[tuple[str, float, float, float]]:
+    """ Compare the median timings of two runs.
+
+        Returns:
+            a list of (key, baseline ms, current ms, ratio) for every operation present in both runs
+    """
+    rows = []
+    for key, summary in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is not None:
+            rows.append((key, base["median_ms"], summary["median_ms"], summary["median_ms"] / max(base["median_ms"], 1e-9)))
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0].strip(), formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="node counts of the generated layouts")
+    parser.add_argument("--full", action="store_true", help=f"run at all node counts: {', '.join(map(str, FULL_SIZES))}")
+    parser.add_argument("--shapes", nargs="+", choices=tuple(LAYOUTS), default=tuple(LAYOUTS))
+    parser.add_argument("--repeat", type=int, default=50, help="maximum number of runs per operation")
+    parser.add_argument("--min-time", type=float, default=0.5, help="time after which an operation stops being repeated, in seconds")
+    parser.add_argument("--output", help="path to write the JSON results to")
+    parser.add_argument("--baseline", help="path of stored JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = run(FULL_SIZES if args.full else tuple(args.sizes), tuple(args.shapes), args.repeat, args.min_time)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if not args.baseline:
+        for key, summary in results["results"].items():
+            print(f"{key:>28}: {summary['median_ms']:>10.3f} ms")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    regressions = 0
+    for key, base, current, ratio in compare(results, baseline):
+        regressed = ratio > 1 + args.threshold
+        regressions += regressed
+        print(f"{key:>28}: {base:>10.3f} ms -> {current:>10.3f} ms  {ratio:>6.2f}x{'  REGRESSION' if regressed else ''}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
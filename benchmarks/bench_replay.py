@@ -0,0 +1,47 @@
+""" Replay a recorded input session headless and report its frame timings.
+
+    Sessions are recorded with `ViewRenderer.start_recording` and saved with `Recording.save`. The layout is built
+    by a factory function given as "module:function", which has to return a fresh layout on every call:
+
+        python -m benchmarks.bench_replay session.pgrec myapp.ui:build_layout --checksum 1234567890
+
+    With `--checksum` the run fails when the final frame doesn't match, turning the session into a regression test.
+"""
+from __future__ import annotations
+import argparse
+import importlib
+import os
+import statistics
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from pygment.core.recording import Recording, replay
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0].strip())
+    parser.add_argument("recording", help="path of the recorded session")
+    parser.add_argument("factory", help="layout factory as module:function")
+    parser.add_argument("--checksum", type=int, help="expected checksum of the final frame")
+    args = parser.parse_args(argv)
+
+    module, _, name = args.factory.partition(":")
+    factory = getattr(importlib.import_module(module), name)
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    report = replay(Recording.load(args.recording), factory)
+    times = [seconds * 1000 for seconds in report.frame_times]
+    print(f"{'frames':>10}: {len(times)}")
+    if times:
+        print(f"{'total':>10}: {sum(times):.3f} ms")
+        print(f"{'median':>10}: {statistics.median(times):.3f} ms")
+        print(f"{'max':>10}: {max(times):.3f} ms")
+    print(f"{'checksum':>10}: {report.checksum}")
+    return 1 if args.checksum is not None and args.checksum != report.checksum else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
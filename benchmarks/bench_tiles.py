@@ -0,0 +1,71 @@
+""" Benchmark of painting large damaged regions on several render threads.
+
+    A kiosk sized layout of rounded cards with translucent overlays and titles is repainted in full on every frame,
+    by changing the color of its background, at each render thread count. The tiled repaint only gets faster 
+    with the number of threads when there are as many free cores, as pygame releases the GIL in fills and blits only.
+
+    Run with `python -m benchmarks.bench_tiles [width height]` from the repository root.
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from pygment import ViewRenderer
+from pygment.component import Frame, Label
+from pygment.core.layoutnode import LayoutNode
+
+
+THREAD_COUNTS = (1, 2, 4, 8)
+FRAMES = 10
+REPEAT = 3
+
+
+def build_layout() -> tuple[LayoutNode, ...]:
+    root = Frame("background", (0, 0, "100sw", "100sh"), color=(18, 18, 18))
+    for i in range(48):
+        card = Frame(f"card{i}", (f"{i % 8 * 12.5 + 0.5}pw", f"{i // 8 * 16.6 + 0.5}ph", "11.5pw", "15.6ph"), color=(40, 40, 40), border_radius=16)
+        card.join(root)
+        Frame("overlay", (0, "50ph", "100pw", "50ph"), color=(120, 20, 20, 128), border_radius=16).join(card)
+        Label("title", (12, 12, "90pw", 24), text=f"Playlist {i}", text_color=(220, 220, 220), text_size=22).join(card)
+    return (root,)
+
+
+def frame_ms(size: tuple[int, int], threads: int) -> float:
+    """ Get the shortest of `REPEAT` mean times of a full repaint, in ms. """
+    layout = build_layout()
+    renderer = ViewRenderer(size, layout, render_threads=threads)
+    dest = pygame.surface.Surface(size)
+    renderer.handle_event(pygame.event.Event(pygame.MOUSEMOTION, pos=(0, 0)))
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for frame in range(FRAMES):
+            layout[0].style.color = (18 + frame % 2, 18, 18)
+            renderer.update(16)
+            renderer.render(dest, (0, 0))
+        timings.append((time.perf_counter() - start) / FRAMES)
+    return min(timings) * 1000
+
+
+def run(size: tuple[int, int] = (3840, 2160)) -> dict[str, float]:
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    pygame.font.init()
+    results = {f"threads_{threads}_ms": frame_ms(size, threads) for threads in THREAD_COUNTS}
+    for threads in THREAD_COUNTS[1:]:
+        results[f"threads_{threads}_speedup"] = results["threads_1_ms"] / results[f"threads_{threads}_ms"]
+    return results
+
+
+if __name__ == "__main__":
+    size = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (3840, 2160)
+    print(f"{'cpus':>20}: {os.cpu_count():>12}")
+    for name, value in run(size).items():
+        print(f"{name:>20}: {value:>12,.3f}")
@@ -0,0 +1,72 @@
+""" Microbenchmark of size unit string parsing and unit property assignment.
+
+    Compares the registry based, cached `str_to_unit` against the previous implementation, which rebuilt the unit
+    name mapping and ran two uncompiled `re.sub` calls on every parse.
+
+    Run with `python -m benchmarks.bench_units` from the repository root.
+"""
+from __future__ import annotations
+from typing import Callable
+import re
+import timeit
+
+import pygment.core.uielement as uielement
+from pygment.editor.unit import SizeUnitType, str_to_unit
+
+
+def legacy_str_to_unit(value: str) -> SizeUnitType | float:
+    """ Verbatim copy of the original parser, kept as the benchmark baseline. """
+    unit_name_mapping: dict[str, type[SizeUnitType] | Callable[[float], float]] = {
+        unit.__name__: unit  for unit in SizeUnitType.__subclasses__()
+    }
+    identity = lambda x: x
+    unit_name_mapping.update(
+        {'': identity, "px": identity}
+    )
+
+    unit = re.sub(r"\A[\s\d\.-]+|\s+$", '', value)
+    unit_wrapper = unit_name_mapping.get(unit)
+    if not unit_wrapper:
+        raise ValueError(f"could not convert string '{value}' to unit. invalid size unit identifier '{unit}'")
+
+    try:
+        val = float(re.sub(r"[a-zA-Z_]+", '', value))
+    except ValueError as e:
+        raise ValueError(f"could not convert string '{value}' to unit. {e}")
+
+    return unit_wrapper(val)
+
+
+def measure_assignment(parser: Callable[[str], SizeUnitType | float], number: int) -> float:
+    """ Return the number of `obj.width = "74pw"` assignments per second using a given parser. """
+    node = type("Node", (uielement.UIElement,), {"update": lambda *_: False, "render": lambda *_: None})((0, 0, 0, 0))
+    values = ["70pw", "71pw", "72pw", "73pw", "74pw"] # a looping hover animation
+
+    original = uielement.str_to_unit
+    uielement.str_to_unit = parser
+    try:
+        def animate():
+            for value in values:
+                node.width = value
+        seconds = min(timeit.repeat(animate, number=number // len(values), repeat=5))
+    finally:
+        uielement.str_to_unit = original
+    return number / seconds
+
+
+def run(number: int = 100_000) -> dict[str, float]:
+    parse = lambda parser: number / min(timeit.repeat(lambda: parser("74pw"), number=number, repeat=5))
+    return {
+        "parse_legacy_per_s": parse(legacy_str_to_unit),
+        "parse_cached_per_s": parse(str_to_unit),
+        "assign_legacy_per_s": measure_assignment(legacy_str_to_unit, number),
+        "assign_cached_per_s": measure_assignment(str_to_unit, number),
+    }
+
+
+if __name__ == "__main__":
+    results = run()
+    for name, value in results.items():
+        print(f"{name:>22}: {value:>14,.0f}")
+    print(f"{'parse speedup':>22}: {results['parse_cached_per_s'] / results['parse_legacy_per_s']:>14.1f}x")
+    print(f"{'assignment speedup':>22}: {results['assign_cached_per_s'] / results['assign_legacy_per_s']:>14.1f}x")
@@ -1,6 +1,7 @@
 import pygame
 import pygment
 from pygment.component import Frame
+from pygment.editor import Style
 
 COL_BLACK = (5,5,6)
 COL_DARKGRAY = (23,22,26)
@@ -15,19 +16,21 @@ clock = pygame.time.Clock()
 header = Frame("header", (0, 0, "100sw", 50))
 header.style.color = COL_DARKGRAY
 
-button_style = {
-    "color": COL_DARKGRAY, 
-    "border_thickness": 2, 
-    "border_radius": 10, 
-    "border_color": COL_LIGHTGRAY
-}
+# style classes shared by the buttons, changing one restyles all the buttons using it
+button_style = Style(
+    color = COL_DARKGRAY, 
+    border_thickness = 2, 
+    border_radius = 10, 
+    border_color = COL_LIGHTGRAY
+)
+hovered_style = Style(color = COL_LIGHTGRAY)
 
 section = Frame("section", ("15sw", 100, "70sw", 270), color=(30,20,60), border_radius=20)
-section.add(Frame("button1", ("10pw", 50, "80pw", 70), style=button_style))
-section.add(Frame("button2", ("10pw", 150, "80pw", 70), style=button_style))
+section.add(Frame("button1", ("10pw", 50, "80pw", 70), style=Style(classes=[button_style])))
+section.add(Frame("button2", ("10pw", 150, "80pw", 70), style=Style(classes=[button_style])))
 
-section.button1.on_mouse_enter = lambda obj: setattr(obj.style, "color", COL_LIGHTGRAY)
-section.button1.on_mouse_leave = lambda obj: setattr(obj.style, "color", COL_DARKGRAY)
+section.button1.on_mouse_enter = lambda obj: obj.style.add_class(hovered_style)
+section.button1.on_mouse_leave = lambda obj: obj.style.remove_class(hovered_style)
 section.button2.on_mouse_click = lambda obj: print("click!")
 
 layout = (header, section)
@@ -37,12 +40,10 @@ renderer = pygment.ViewRenderer(window.get_size(), layout)
 finished = False
 while not finished:
     for event in pygame.event.get():
+        renderer.handle_event(event)
         if event.type == pygame.QUIT:
             finished = True
             
-        if event.type == pygame.VIDEORESIZE:
-            renderer.size = event.size
-            
     dt = clock.tick(60)
     renderer.update(dt)
 
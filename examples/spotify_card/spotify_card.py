@@ -61,6 +61,7 @@ card_content.join(card)
 
 image = pygment.component.Image("card_image", (0, 0, "100pw", "100pw"))
 image.style.source = "examples\\spotify_card\\playlist_image.png"
+image.style.placeholder_color = COL_CARD_HOVER
 image.join(card_content)
 
 button_play = pygment.component.Button("button_play", ("80pw", "80ph", 70, 70))
@@ -69,6 +70,7 @@ button_play.style = {
     "border_radius": 70,
     "centered": True,
     "hidden": True, 
+    "layer": True,
 }
 button_play.on_mouse_click = lambda: print("Play button pressed!")
 button_play.on_mouse_enter = button_play_enter_event
@@ -100,11 +102,9 @@ renderer = pygment.ViewRenderer((WIN_WIDTH, WIN_HEIGHT), layout)
 finished = False
 while not finished:
     for event in pygame.event.get():
+        renderer.handle_event(event)
         if event.type == pygame.QUIT:
             finished = True
-            
-        if event.type == pygame.VIDEORESIZE:
-            renderer.size = display.get_size()
     
     dt = clock.tick(60)
     renderer.update(dt)
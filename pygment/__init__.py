@@ -1,3 +1,15 @@
-from .core.viewrenderer import ViewRenderer
-from . import component
-from . import editor
+from typing import TYPE_CHECKING
+
+from pygment.core import lazy_exports
+
+if TYPE_CHECKING:
+    from pygment.core.viewrenderer import ViewRenderer
+    from pygment import component, editor
+
+# the renderer and subpackages, along with pygame, are imported on first access to keep `import pygment` cheap
+__all__ = ["ViewRenderer", "component", "editor"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "ViewRenderer": "pygment.core.viewrenderer",
+    "component": "pygment.component",
+    "editor": "pygment.editor",
+})
@@ -1,4 +1,22 @@
-from pygment.component.button import Button
-from pygment.component.frame import Frame
-from pygment.component.label import Label
-from pygment.component.image import Image
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from pygment.core import lazy_exports
+
+if TYPE_CHECKING:
+    from pygment.component.button import Button
+    from pygment.component.frame import Frame
+    from pygment.component.label import Label
+    from pygment.component.image import Image
+    from pygment.component.virtuallist import VirtualList
+    from pygment.component.scrollview import ScrollView
+
+# every component module is imported on the first access to its class
+__all__ = ["Button", "Frame", "Label", "Image", "VirtualList", "ScrollView"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "Button": "pygment.component.button",
+    "Frame": "pygment.component.frame",
+    "Label": "pygment.component.label",
+    "Image": "pygment.component.image",
+    "VirtualList": "pygment.component.virtuallist",
+    "ScrollView": "pygment.component.scrollview",
+})
@@ -1,24 +1,28 @@
 import pygame
 
 from pygment.core.layoutnode import LayoutNode
-from pygment.editor.type import _ColorValue
+from pygment.editor import ColorField, NumberField
 
 
 class Button(LayoutNode):
     """ Renderable component class. """
+    __slots__ = ()
+    style_schema = LayoutNode.style_schema.extend(
+        color = ColorField((255,255,255)),
+        border_radius = NumberField(10, minimum=0, integer=True),
+        border_thickness = NumberField(0, minimum=0, integer=True),
+        border_color = ColorField(0),
+    )
+    
+    
     def render(self, surface: pygame.surface.Surface) -> None:
-        if not self.style.get("hidden", False, expected_type=bool):
+        style = self.style.computed
+        if not style.hidden:
             rect = self.client_rect(surface)
-            color = self.style.get("color", (255,255,255), expected_type=_ColorValue)
+            pygame.draw.rect(surface, style.color, rect, border_radius=style.border_radius)
             
-            border_radius = round(max(self.style.get("border_radius", 10, expected_type=int | float), 0))
-            border_thickness = round(max(self.style.get("border_thickness", 0, expected_type=int | float), 0))
-            
-            pygame.draw.rect(surface, color, rect, border_radius=border_radius)
-            
-            if border_thickness > 0:
-                border_color = self.style.get("border_color", 0, expected_type=_ColorValue)
-                pygame.draw.rect(surface, border_color, rect, border_thickness, border_radius)
+            if style.border_thickness > 0:
+                pygame.draw.rect(surface, style.border_color, rect, style.border_thickness, style.border_radius)
                 
                 
     def update(self, dt: int) -> bool:
@@ -1,27 +1,100 @@
+from __future__ import annotations
+from concurrent.futures import Future
+from typing import Any, Iterable
+
 import pygame
 
+from pygment.core.assets import image_cache
 from pygment.core.layoutnode import LayoutNode
+from pygment.editor import ColorField, StyleField
 
 
 class Image(LayoutNode):
-    """ Renderable component class. """
+    """ Renderable component class.
+
+        Unless the `async_load` style is disabled, images are decoded and scaled on a background thread. Until the image
+        is ready, a low resolution preview of an already loaded size is drawn if available and `placeholder_preview` is set,
+        otherwise the rect is filled with `placeholder_color`, if any.
+    """
+    __slots__ = ("_request", "_request_seen")
+    style_schema = LayoutNode.style_schema.extend(
+        source = StyleField(str, ""),
+        async_load = StyleField(bool, True),
+        placeholder_preview = StyleField(bool, True),
+        placeholder_color = ColorField(None, optional=True),
+    )
+    
+    
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._request: tuple[tuple[str, tuple[int, int]], Future[pygame.surface.Surface]] | None = None
+        self._request_seen = True
+
+
+    @staticmethod
+    def prefetch(sources: Iterable[str], size: tuple[int, int] | None = None) -> None:
+        """ Start loading images in the background ahead of displaying them.
+
+            Args:
+                sources: image file paths
+                size: the size the images will be displayed at, or `None` to only decode them
+        """
+        image_cache.prefetch(sources, size)
+
+
     def render(self, surface: pygame.surface.Surface) -> None:
-        if not self.style.get("hidden", False, expected_type=bool):
-            source = self.style.get("source", "", str)
+        style = self.style.computed
+        if not style.hidden:
+            source = style.source
             if source:
                 rect = self.client_rect(surface)
-                
-                image = pygame.image.load(source)
-                image = pygame.transform.smoothscale(image, rect.size)
-                
+                if rect.w <= 0 or rect.h <= 0:
+                    return
+
+                if style.async_load:
+                    image = image_cache.lookup(source, rect.size)
+                    if image is not None:
+                        self._request = None # the cache owns the image now, and may evict it within its budget
+                    else:
+                        future = self._fetch(source, rect.size)
+                        if not future.done():
+                            self._render_placeholder(surface, rect, source)
+                            return
+                        image = future.result() # the image didn't fit into the cache or loading has failed
+                else:
+                    image = image_cache.get(source, rect.size)
+
                 mask = rect.move((-rect.x, -rect.y))
                 surface.blit(image, rect, mask)
-                
-                
+
+
+    def _fetch(self, source: str, size: tuple[int, int]) -> Future[pygame.surface.Surface]:
+        key = (source, size)
+        if self._request is None or self._request[0] != key:
+            self._request = (key, image_cache.fetch(source, size))
+            self._request_seen = self._request[1].done()
+        return self._request[1]
+
+
+    def _render_placeholder(self, surface: pygame.surface.Surface, rect: pygame.Rect, source: str) -> None:
+        style = self.style.computed
+        preview = image_cache.preview(source) if style.placeholder_preview else None
+        if preview is not None:
+            surface.blit(pygame.transform.scale(preview, rect.size), rect)
+            return
+
+        if style.placeholder_color is not None:
+            pygame.draw.rect(surface, style.placeholder_color, rect)
+
+
     def update(self, dt: int) -> bool:
         dirty = bool(self.style.poll_changes())
         for component in self:
             dirty |= component.update(dt)
-            
+
+        if not self._request_seen and self._request is not None and self._request[1].done():
+            self._request_seen = True
+            self.mark_dirty()
+
         return dirty | self._dirty
-    
\ No newline at end of file
+
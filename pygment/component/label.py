@@ -1,25 +1,34 @@
 import pygame
 
+from pygment.core.assets import text_cache
 from pygment.core.layoutnode import LayoutNode
-from pygment.editor.type import _ColorValue
+from pygment.editor import ColorField, NumberField, StyleField
 
 
 class Label(LayoutNode):
     """ Renderable component class. """
+    __slots__ = ()
+    style_schema = LayoutNode.style_schema.extend(
+        text = StyleField(str, ""),
+        text_color = ColorField((255,255,255)),
+        text_size = NumberField(-1), # negative values size the text to the component's height
+        align_center = StyleField(bool, False),
+    )
+    
+    
     def render(self, surface: pygame.surface.Surface) -> None:
-        if not self.style.get("hidden", False, expected_type=bool):
-            text = self.style.get("text", "", str)
+        style = self.style.computed
+        if not style.hidden:
+            text = style.text
             if text:
                 rect = self.client_rect(surface)
-                text_color = self.style.get("text_color", (255,255,255), expected_type=_ColorValue)
-                text_size = self.style.get("text_size", -1, expected_type=int | float)
+                text_size = style.text_size
                 if text_size < 0:
                     text_size = round(self.client_height(surface))
                 
-                font = pygame.font.Font(None, round(text_size * 1.3))
                 mask = rect.move((-rect.x, -rect.y))
-                label_surface = font.render(text, True, text_color)
-                if self.style.get("align_center", False, expected_type=bool):
+                label_surface = text_cache.render(text, style.text_color, round(text_size * 1.3))
+                if style.align_center:
                     rect = rect.move(((rect.w - label_surface.get_size()[0]) / 2, 0))
                 surface.blit(label_surface, rect, mask)
                 
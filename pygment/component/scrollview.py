@@ -0,0 +1,148 @@
+from __future__ import annotations
+from typing import Any
+import math
+
+import pygame
+
+from pygment.component.frame import Frame
+from pygment.editor import Style, StyleField
+from pygment.editor.type import _UnitRect
+
+
+class ScrollView(Frame):
+    """ Container scrolling its children by a content offset.
+
+        Children are laid out in the view's content space, as if it wasn't scrolled, so their client rects don't change
+        with the scroll position. The renderer translates them by `content_offset` when painting and hit-testing, and
+        clips them to the view. It keeps the view's content in a retained surface of the viewport's size. When the view
+        is scrolled, the existing pixels are shifted with `Surface.scroll` and only the newly exposed strips are drawn,
+        while changes of the content redraw just the regions they damage.
+
+        The view scrolls on mouse wheel events handled by the renderer. With the `smooth_scroll` style the content glides
+        towards the target offset over a few frames, moving by whole pixels, so every frame is still a blit-scroll.
+        The content size is cached until a child is added or the geometry of the view or its children changes, and the
+        target offset is clamped to the scrollable range again only then.
+    """
+    __slots__ = ("_scroll", "_target", "_content_offset", "_content_size", "_clamped")
+    scrolls_content = True
+    WHEEL_STEP = 40 # pixels scrolled per wheel notch
+    SMOOTH_TIME = 60 # time constant of smooth scrolling in ms
+    style_schema = Frame.style_schema.extend(
+        clip = StyleField(bool, True),
+        smooth_scroll = StyleField(bool, True),
+    )
+
+
+    def __init__(self, name: str, rect: _UnitRect, style: Style | dict[str, Any] = {}, **kwargs: Any):
+        self._scroll = (0.0, 0.0)
+        self._target = (0.0, 0.0)
+        self._content_offset = (0, 0)
+        self._content_size: tuple[tuple[int, int], tuple[float, float]] | None = None # (surface size, content size)
+        self._clamped = False # whether the target offset is within the current scrollable range
+        super().__init__(name, rect, style, **kwargs)
+
+
+    @property
+    def scroll_offset(self) -> tuple[float, float]:
+        """ Get or set the (x, y) scroll position in pixels, clamped to the scrollable range. Setting it stops smooth scrolling. """
+        return self._scroll
+
+
+    @scroll_offset.setter
+    def scroll_offset(self, value: tuple[float, float]) -> None:
+        self._target = self._clamp(value)
+        self._set_scroll(self._target)
+
+
+    @property
+    def content_offset(self) -> tuple[int, int]:
+        """ Get the whole pixel offset the content is currently laid out at. """
+        return self._content_offset
+
+
+    @property
+    def max_scroll_offset(self) -> tuple[float, float]:
+        renderer = self.renderer
+        if not renderer:
+            return 0.0, 0.0
+
+        surface = renderer.surface
+        width, height = self.content_size(surface)
+        return max(0.0, width - self.client_width(surface)), max(0.0, height - self.client_height(surface))
+
+
+    def content_size(self, surface: pygame.surface.Surface) -> tuple[float, float]:
+        """ Compute the size of the area spanned by this view's children, measured from the content origin. """
+        size = surface.get_size()
+        if self._content_size is not None and self._content_size[0] == size:
+            return self._content_size[1]
+        
+        origin_x, origin_y = self._content_origin(surface)
+        width = height = 0.0
+        for child in self:
+            x, y, w, h = child._client_geometry(surface)
+            width, height = max(width, x + w - origin_x), max(height, y + h - origin_y)
+        self._content_size = size, (width, height)
+        return width, height
+
+
+    def scroll_to(self, x: float, y: float, smooth: bool | None = None) -> None:
+        """ Scroll to an offset, gliding there on the next frames when `smooth`, which defaults to the `smooth_scroll` style. """
+        self._target = self._clamp((x, y))
+        if not (self.style.computed.smooth_scroll if smooth is None else smooth):
+            self._set_scroll(self._target)
+
+
+    def scroll_by(self, dx: float, dy: float, smooth: bool | None = None) -> None:
+        """ Scroll by a distance from the current target offset. """
+        self.scroll_to(self._target[0] + dx, self._target[1] + dy, smooth)
+
+
+    def handle_wheel(self, x: float, y: float) -> bool:
+        max_x, max_y = self.max_scroll_offset
+        if not max_x and not max_y:
+            return False
+
+        self.scroll_by(x * self.WHEEL_STEP, -y * self.WHEEL_STEP)
+        return True
+
+
+    def update(self, dt: int) -> bool:
+        if not self._clamped: # the content or the viewport has changed
+            self._target = self._clamp(self._target)
+            self._clamped = True
+        target = self._target
+        if target != self._scroll:
+            blend = 1 - math.exp(-dt / self.SMOOTH_TIME)
+            x, y = (current + (goal - current) * blend for current, goal in zip(self._scroll, target))
+            if abs(target[0] - x) < 0.5 and abs(target[1] - y) < 0.5:
+                x, y = target
+            self._set_scroll((x, y))
+        return super().update(dt)
+
+
+    def _clamp(self, offset: tuple[float, float]) -> tuple[float, float]:
+        max_x, max_y = self.max_scroll_offset
+        return max(0.0, min(offset[0], max_x)), max(0.0, min(offset[1], max_y))
+
+
+    def invalidate_geometry(self) -> None:
+        self._on_children_change()
+        super().invalidate_geometry()
+
+
+    def _on_children_change(self) -> None:
+        self._content_size = None
+        self._clamped = False
+
+
+    def _set_scroll(self, offset: tuple[float, float]) -> None:
+        self._scroll = offset
+        content_offset = (round(offset[0]), round(offset[1]))
+        if content_offset == self._content_offset:
+            return
+
+        self._content_offset = content_offset
+        renderer = self.renderer
+        if renderer:
+            renderer._on_scroll(self)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+from typing import Any, Callable
+import math
+
+import pygame
+
+from pygment.component.scrollview import ScrollView
+from pygment.core.layoutnode import LayoutNode
+from pygment.editor import Style
+from pygment.editor.type import _UnitRect
+
+
+RowFactory = Callable[[int, LayoutNode | None], LayoutNode]
+
+
+class VirtualList(ScrollView):
+    """ Scrollable list container creating child nodes only for the visible rows.
+
+        Rows are built by a row factory, called as `row_factory(index, row)`. It's called with `None` to create a new row
+        node for an item, and with a previously created row to rebind it to another item as the list is scrolled, in which
+        case it has to update and return that same row. The list positions the rows itself, overriding their rect.
+        Rows keep the names given to them by the factory, which have to be unique within the list. A recycled row keeps
+        the name it was created with, so rows are better looked up through `row_for` than by name.
+
+        Row callbacks receive the row node, which can be mapped back to its current item with `index_of`. A row which is
+        rebound while hovered or pressed gets its leave and up callbacks as the old item before being rebound.
+
+        The list scrolls the same way as a `ScrollView`, with the rows laid out in its content space, so scrolling only
+        rebinds the rows entering the visible window. `scroll_to_index` scrolls an item into view.
+    """
+    __slots__ = ("_item_count", "_row_height", "_row_factory", "_overscan", "_rows", "_spare", "_window")
+
+
+    def __init__(self, name: str, rect: _UnitRect, item_count: int, row_height: int, row_factory: RowFactory,
+                 overscan: int = 2, style: Style | dict[str, Any] = {}, **kwargs: Any):
+        """ Make a new virtual list.
+
+            Args:
+                name: the component name
+                rect: the component rect
+                item_count: the number of items in the list
+                row_height: the height of each row in pixels
+                row_factory: callable creating and rebinding row nodes
+                overscan: the number of rows kept bound above and below the visible ones
+        """
+        self._item_count = item_count
+        self._row_height = row_height
+        self._row_factory = row_factory
+        self._overscan = overscan
+        self._rows: dict[int, LayoutNode] = {} # item index -> row bound to it
+        self._spare: list[LayoutNode] = [] # created rows which aren't bound to any item
+        self._window = (0, 0)
+        super().__init__(name, rect, style, **kwargs)
+
+
+    @property
+    def item_count(self) -> int:
+        """ Get or set the number of items. Setting it rebinds all the rows, as the items may have changed. """
+        return self._item_count
+
+
+    @item_count.setter
+    def item_count(self, value: int) -> None:
+        self._item_count = value
+        self.refresh()
+
+
+    @property
+    def row_height(self) -> int:
+        return self._row_height
+
+
+    def content_size(self, surface: pygame.surface.Surface) -> tuple[float, float]:
+        """ Compute the size of the area spanned by all the items, bound to rows or not. """
+        return self.client_width(surface), self._item_count * self._row_height
+
+
+    def scroll_to_index(self, index: int, smooth: bool | None = None) -> None:
+        """ Scroll the minimal distance making an item fully visible. """
+        top = index * self._row_height
+        bottom = top + self._row_height - self._viewport_height()
+        self.scroll_to(self._target[0], min(max(self._target[1], bottom), top), smooth)
+
+
+    def index_of(self, row: LayoutNode) -> int | None:
+        """ Get the index of the item a row is currently bound to, or `None` if the row isn't bound. """
+        for index, bound in self._rows.items():
+            if bound is row:
+                return index
+        return None
+
+
+    def row_for(self, index: int) -> LayoutNode | None:
+        """ Get the row bound to an item, or `None` if the item is out of the bound window. """
+        return self._rows.get(index)
+
+
+    def refresh(self) -> None:
+        """ Rebind every row, e.g. after the underlying items have changed. """
+        renderer = self.renderer
+        for row in self._rows.values():
+            if renderer:
+                renderer._release_input(row)
+        self._window = (0, 0)
+        self._layout_rows(rebind=True)
+        self._target = self._clamp(self._target) # to the new item count
+        self._set_scroll(self._clamp(self._scroll))
+
+
+    def update(self, dt: int) -> bool:
+        self._layout_rows() # follows changes of the viewport height
+        return super().update(dt)
+
+
+    def _set_scroll(self, offset: tuple[float, float]) -> None:
+        super()._set_scroll(offset)
+        self._layout_rows()
+
+
+    def _viewport_height(self) -> float:
+        renderer = self.renderer
+        return self.client_height(renderer.surface) if renderer else 0
+
+
+    def _layout_rows(self, rebind: bool = False) -> None:
+        """ Bind rows to the items in the visible window plus overscan, recycling the rows which went out of it. """
+        height = self._viewport_height()
+        scroll = self._scroll[1]
+        first = max(0, math.floor(scroll / self._row_height) - self._overscan)
+        last = min(self._item_count, math.ceil((scroll + height) / self._row_height) + self._overscan)
+        last = max(first, last)
+        if (first, last) == self._window and not rebind:
+            return
+
+        bound = {index: row for index, row in self._rows.items() if first <= index < last and not rebind}
+        spare = self._spare
+        spare.extend(row for index, row in self._rows.items() if index not in bound)
+        renderer = self.renderer
+        for index in range(first, last):
+            if index in bound:
+                continue
+
+            recycled = spare.pop() if spare else None
+            if recycled is not None and renderer and not rebind:
+                renderer._release_input(recycled)
+            row = self._row_factory(index, recycled)
+            if recycled is not None and row is not recycled:
+                raise ValueError(f"row factory of '{self.name}' has to return the recycled row it was given")
+            if recycled is None:
+                row.x, row.width = 0, "100pw"
+                self.add(row)
+            y = index * self._row_height # in the content space, so the row stays in place while it's bound
+            if row.y != y or row.height != self._row_height:
+                row.y, row.height = y, self._row_height
+            bound[index] = row
+
+        for row in spare: # left over after the item count has shrunk or the viewport got smaller
+            if row.height != 0:
+                row.height = 0
+        self._rows = bound
+        self._window = (first, last)
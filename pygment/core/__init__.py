@@ -1,7 +1,38 @@
 from functools import partial
-from typing import Any, Callable
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+import sys
 
-__all__ = ["callback_property"]
+__all__ = ["callback_property", "lazy_exports"]
+
+
+def lazy_exports(module_name: str, exports: Mapping[str, str]) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """ Make the module level `__getattr__` and `__dir__` functions of a package which imports its exports on first access.
+    
+        Every export is imported from its submodule once and stored in the package namespace, so later lookups
+        don't go through `__getattr__` again.
+
+        Args:
+            module_name: the package `__name__`
+            exports: mapping of every exported name to the absolute name of the module defining it. Names mapped 
+                to the module of the same name export the module itself.
+    """
+    def __getattr__(name: str) -> Any:
+        source = exports.get(name)
+        if source is None:
+            raise AttributeError(f"module '{module_name}' has no attribute '{name}'")
+        
+        __import__(source) # unlike `importlib.import_module`, goes through the import statement machinery reported by `-X importtime`
+        module = sys.modules[source]
+        value = module if source == f"{module_name}.{name}" else getattr(module, name)
+        setattr(sys.modules[module_name], name, value)
+        return value
+    
+    
+    def __dir__() -> list[str]:
+        return sorted({*vars(sys.modules[module_name]), *exports})
+    
+    return __getattr__, __dir__
 
 
 class callback_property(property):
@@ -16,7 +47,18 @@ class callback_property(property):
 
         When setting a callbackproperty to a callable, it's automatically injected
         with a `self`-like argument.
+        
+        Callbacks are stored in the owner's `_callbacks` mapping, keyed by the property name. Objects without any
+        callbacks set should share the empty `NO_CALLBACKS` mapping, which is replaced by a dict on the first assignment.
+        
+        Callbacks defined with `async def` aren't awaited when called, but scheduled as a task on the running event loop,
+        so that slow IO doesn't hold up the frame they were triggered on. See `ViewRenderer.run`.
     """
+    NO_CALLBACKS: Mapping[str, Callable[..., Any]] = MappingProxyType({})
+    CO_COROUTINE = 0x80 # code flag of `async def` functions, the same as `inspect.CO_COROUTINE`
+    _tasks: set[Any] = set() # scheduled coroutine callbacks, referenced until done as the event loop only keeps weak references
+    
+    
     def __init__(self):
         """ Make a new descriptor property for callable types. """
         super().__init__(self._getter, self._setter, self._deleter)
@@ -28,12 +70,11 @@ class callback_property(property):
     
     
     def __set_name__(self, obj: type, name: str) -> None:
-        self.callback_accessor = f"_{name}"
-        setattr(obj, self.callback_accessor, self.NO_OP)
+        self.callback_accessor = name
 
 
     def _getter(self, obj: Any) -> Callable[[None], None]:
-        return getattr(obj, self.callback_accessor)
+        return obj._callbacks.get(self.callback_accessor, self.NO_OP)
     
     
     def _setter(self, obj: Any, callback: Callable[[None], None] | Callable[[], None] | None) -> None:
@@ -41,13 +82,35 @@ class callback_property(property):
             return self._deleter(obj)
         
         if not callable(callback):
-            raise ValueError(f"callback property {self.callback_accessor[1:]} expected a callable, got {type(callback)} instead")
+            raise ValueError(f"callback property {self.callback_accessor} expected a callable, got {type(callback)} instead")
 
+        coroutine = callback.__code__.co_flags & self.CO_COROUTINE
         if callback.__code__.co_argcount == 1:
             callback = partial(callback, obj)
-        setattr(obj, self.callback_accessor, callback)
+        if coroutine:
+            callback = partial(self._schedule, callback)
+        if obj._callbacks is self.NO_CALLBACKS:
+            obj._callbacks = {}
+        obj._callbacks[self.callback_accessor] = callback
             
         
+    @staticmethod
+    def _schedule(callback: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        import asyncio # imported by the running event loop already, kept out of `import pygment`
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            raise RuntimeError("coroutine callbacks have to be called from a running event loop, see `ViewRenderer.run`") from None
+        
+        task = loop.create_task(callback(*args, **kwargs))
+        callback_property._tasks.add(task)
+        task.add_done_callback(callback_property._tasks.discard)
+        return task
+    
+    
     def _deleter(self, obj: Any) -> None: # type: ignore
-        setattr(obj, self.callback_accessor, self.NO_OP)
+        if self.callback_accessor in obj._callbacks:
+            del obj._callbacks[self.callback_accessor]
+            if not obj._callbacks:
+                obj._callbacks = self.NO_CALLBACKS
         
\ No newline at end of file
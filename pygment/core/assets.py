@@ -0,0 +1,403 @@
+from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Generic, Hashable, Iterable, NamedTuple, TypeVar
+import os
+import threading
+import weakref
+
+import pygame
+
+
+__all__ = ["CacheStats", "LRUCache", "ImageCache", "TextCache", "image_cache", "text_cache", "surface_bytes"]
+
+
+class CacheStats(NamedTuple):
+    """ Snapshot of a cache's counters. """
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+
+
+
+_KT = TypeVar("_KT", bound=Hashable)
+_VT = TypeVar("_VT")
+class LRUCache(Generic[_KT, _VT]):
+    """ Least-recently-used mapping bounded by the summed size of its values.
+
+        The size of each value is computed by a `sizeof` callable, counting every entry as 1 by default.
+    """
+    def __init__(self, max_size: int, sizeof: Callable[[_VT], int] = lambda _: 1):
+        self._entries: OrderedDict[_KT, tuple[_VT, int]] = OrderedDict()
+        self._max_size = max_size
+        self._sizeof = sizeof
+        self._size = 0
+        self.hits = self.misses = self.evictions = 0
+
+
+    @property
+    def max_size(self) -> int:
+        """ Get or set the size budget of this cache. Lowering the budget evicts entries immediately. """
+        return self._max_size
+
+
+    @max_size.setter
+    def max_size(self, value: int) -> None:
+        self._max_size = value
+        self._evict()
+
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.evictions, len(self._entries), self._size)
+
+
+    def get(self, key: _KT) -> _VT | None:
+        """ Return the value for key, marking it as most recently used, or `None` on a cache miss. """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+
+    def peek(self, key: _KT) -> _VT | None:
+        """ Return the value for key without affecting its recency or the hit counters. """
+        entry = self._entries.get(key)
+        return None if entry is None else entry[0]
+
+
+    def put(self, key: _KT, value: _VT) -> None:
+        """ Insert or replace a value, evicting least recently used entries to fit the budget.
+
+            A value larger than the whole budget is not stored.
+        """
+        self.discard(key)
+        size = self._sizeof(value)
+        if size > self._max_size:
+            return
+
+        self._entries[key] = (value, size)
+        self._size += size
+        self._evict()
+
+
+    def discard(self, key: _KT) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+    def _evict(self) -> None:
+        while self._size > self._max_size:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+
+
+    def __contains__(self, key: _KT) -> bool:
+        return key in self._entries
+
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+
+
+def surface_bytes(surface: pygame.surface.Surface) -> int:
+    """ Get the approximate amount of memory held by a surface's pixels. """
+    return surface.get_pitch() * surface.get_height()
+
+
+
+
+class ImageCache:
+    """ Two-level cache of images loaded from disk.
+
+        The first level holds decoded surfaces keyed by file path and modification time, the second one holds scaled 
+        variants keyed by (path, size) and the modification time of their source. Entries made stale by a file change 
+        are never hit again and age out. Both levels evict their least recently used entries when their byte budget is exceeded.
+        
+        Images can be loaded synchronously with `get`, or decoded and scaled on a thread pool with `fetch` and `prefetch`.
+        The cache is safe to use from multiple threads.
+    """
+    def __init__(self, max_bytes: int = 64 * 2**20, max_decoded_bytes: int = 64 * 2**20, max_workers: int | None = None):
+        self._decoded: LRUCache[tuple[str, int], pygame.surface.Surface] = LRUCache(max_decoded_bytes, surface_bytes)
+        self._scaled: LRUCache[tuple[str, int, tuple[int, int]], pygame.surface.Surface] = LRUCache(max_bytes, surface_bytes)
+        self._previews: weakref.WeakValueDictionary[str, pygame.surface.Surface] = weakref.WeakValueDictionary()
+        self._lock = threading.RLock()
+        
+        self._max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor: ThreadPoolExecutor | None = None
+        self._inflight: dict[tuple[str, int, tuple[int, int] | None], Future[pygame.surface.Surface]] = {}
+
+
+    @property
+    def max_bytes(self) -> int:
+        """ Get or set the byte budget for scaled image variants. """
+        return self._scaled.max_size
+
+
+    @max_bytes.setter
+    def max_bytes(self, value: int) -> None:
+        with self._lock:
+            self._scaled.max_size = value
+
+
+    @property
+    def max_decoded_bytes(self) -> int:
+        """ Get or set the byte budget for decoded source images. """
+        return self._decoded.max_size
+
+
+    @max_decoded_bytes.setter
+    def max_decoded_bytes(self, value: int) -> None:
+        with self._lock:
+            self._decoded.max_size = value
+
+
+    @property
+    def stats(self) -> CacheStats:
+        """ Get the counters of the scaled variants level. """
+        return self._scaled.stats
+
+
+    @property
+    def decoded_stats(self) -> CacheStats:
+        """ Get the counters of the decoded images level. """
+        return self._decoded.stats
+
+
+    def load(self, path: str) -> pygame.surface.Surface:
+        """ Get the decoded image stored at path, loading it from disk when it's not cached or the file has changed.
+
+            Raises:
+                `FileNotFoundError` when the file doesn't exist and any error raised by `pygame.image.load`
+        """
+        return self._load(path, os.stat(path).st_mtime_ns)
+
+
+    def get(self, path: str, size: tuple[int, int]) -> pygame.surface.Surface:
+        """ Get the image stored at path smoothly scaled to size.
+
+            Raises:
+                `FileNotFoundError` when the file doesn't exist and any error raised by `pygame.image.load`
+        """
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            image = self._scaled.get((path, mtime, size))
+        return image if image is not None else self._scale(path, mtime, size)
+    
+    
+    def peek(self, path: str, size: tuple[int, int]) -> pygame.surface.Surface | None:
+        """ Get the image stored at path scaled to size if it's already cached, without loading anything. 
+        
+            Peeking doesn't affect the recency of the cached image nor the cache statistics. A file which can't be
+            accessed is reported as not cached, leaving the error to be raised when the image is loaded.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            return self._scaled.peek((path, mtime, size))
+
+
+    def lookup(self, path: str, size: tuple[int, int]) -> pygame.surface.Surface | None:
+        """ Like `peek`, but a cached image counts as a hit and becomes the most recently used one.
+
+            A miss isn't counted here, as it's counted by `fetch` once it schedules loading the image.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            key = (path, mtime, size)
+            return self._scaled.get(key) if key in self._scaled else None
+        
+        
+    def preview(self, path: str) -> pygame.surface.Surface | None:
+        """ Get the most recently produced surface of an image at any size, or `None` if there's none alive. """
+        return self._previews.get(path)
+    
+    
+    def fetch(self, path: str, size: tuple[int, int] | None = None) -> Future[pygame.surface.Surface]:
+        """ Decode and scale an image on the thread pool. Requests for an image which is already being loaded are shared.
+        
+            Args:
+                path: path of the image file
+                size: size to scale the image to, or `None` to only decode it
+                
+            Returns:
+                a `Future` resolving to the surface, which is already done when the image is cached. Loading errors,
+                including `FileNotFoundError`, are raised by the future's `result`. Scheduling a scaled image to be
+                loaded counts as a cache miss.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError as e:
+            future: Future[pygame.surface.Surface] = Future()
+            future.set_exception(e)
+            return future
+        
+        with self._lock:
+            image = self._decoded.peek((path, mtime)) if size is None else self._scaled.peek((path, mtime, size))
+            if image is not None:
+                future = Future()
+                future.set_result(image)
+                return future
+            
+            key = (path, mtime, size)
+            future = self._inflight.get(key) # type: ignore
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self._max_workers, thread_name_prefix="pygment-image")
+                    
+                job = self._load if size is None else self._scale
+                future = self._executor.submit(job, path, mtime, *(() if size is None else (size,)))
+                if size is not None:
+                    self._scaled.misses += 1
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            return future
+    
+    
+    def prefetch(self, paths: Iterable[str], size: tuple[int, int] | None = None) -> list[Future[pygame.surface.Surface]]:
+        """ Start loading a number of images in the background, e.g. ahead of navigating to a screen that displays them. 
+        
+            Args:
+                paths: paths of the image files
+                size: size the images will be displayed at, or `None` to only decode them
+        """
+        return [self.fetch(path, size) for path in paths]
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._decoded.clear()
+            self._scaled.clear()
+
+
+    def _load(self, path: str, mtime: int) -> pygame.surface.Surface:
+        with self._lock:
+            image = self._decoded.get((path, mtime))
+        if image is None:
+            image = pygame.image.load(path)
+            if pygame.display.get_surface() is not None: # pixel format conversion requires a display mode
+                image = image.convert_alpha()
+            with self._lock:
+                self._decoded.put((path, mtime), image)
+                self._previews[path] = image
+        return image
+    
+    
+    def _scale(self, path: str, mtime: int, size: tuple[int, int]) -> pygame.surface.Surface:
+        image = pygame.transform.smoothscale(self._load(path, mtime), size)
+        with self._lock:
+            self._scaled.put((path, mtime, size), image)
+            self._previews[path] = image
+        return image
+
+
+
+
+class TextCache:
+    """ Pool of fonts keyed by (font file, pixel size) and cache of rendered text surfaces.
+
+        Rendered surfaces are keyed by (text, color, size, antialias, font file) and the least recently used ones
+        are evicted when the configured number of entries is exceeded. The cache is safe to use from multiple threads,
+        which render text one at a time, as font objects can't be shared between threads.
+    """
+    def __init__(self, max_fonts: int = 32, max_surfaces: int = 512):
+        self._fonts: LRUCache[tuple[str | None, int], pygame.font.Font] = LRUCache(max_fonts)
+        self._surfaces: LRUCache[tuple[str, Any, int, bool, str | None], pygame.surface.Surface] = LRUCache(max_surfaces)
+        self._lock = threading.RLock()
+
+
+    @property
+    def max_fonts(self) -> int:
+        """ Get or set the maximum number of pooled fonts. """
+        return self._fonts.max_size
+
+
+    @max_fonts.setter
+    def max_fonts(self, value: int) -> None:
+        with self._lock:
+            self._fonts.max_size = value
+
+
+    @property
+    def max_surfaces(self) -> int:
+        """ Get or set the maximum number of cached text surfaces. """
+        return self._surfaces.max_size
+
+
+    @max_surfaces.setter
+    def max_surfaces(self, value: int) -> None:
+        with self._lock:
+            self._surfaces.max_size = value
+
+
+    @property
+    def stats(self) -> CacheStats:
+        """ Get the counters of the rendered text level. """
+        return self._surfaces.stats
+
+
+    @property
+    def font_stats(self) -> CacheStats:
+        """ Get the counters of the font pool. """
+        return self._fonts.stats
+
+
+    def font(self, size: int, file: str | None = None) -> pygame.font.Font:
+        """ Get a pooled font object for a font file and pixel size. `None` selects the default pygame font. """
+        key = (file, size)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is None:
+                font = pygame.font.Font(file, size)
+                self._fonts.put(key, font)
+            return font
+
+
+    def render(self, text: str, color: Any, size: int, antialias: bool = True, file: str | None = None) -> pygame.surface.Surface:
+        """ Get the surface of a text line rendered with a pooled font. 
+        
+            The returned surface is shared and shouldn't be modified.
+        """
+        key = (text, color, size, antialias, file)
+        with self._lock:
+            surface = self._surfaces.get(key)
+            if surface is None:
+                surface = self.font(size, file).render(text, antialias, color)
+                self._surfaces.put(key, surface)
+            return surface
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fonts.clear()
+            self._surfaces.clear()
+
+
+
+
+image_cache = ImageCache()
+""" Image cache shared by all `Image` components. """
+
+text_cache = TextCache()
+""" Font pool and text cache shared by all `Label` components. """
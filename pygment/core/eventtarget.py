@@ -1,3 +1,4 @@
 class EventTarget:
+    __slots__ = ()
     def __init__(self):
         pass
\ No newline at end of file
@@ -0,0 +1,105 @@
+from __future__ import annotations
+from collections import deque
+
+
+__all__ = ["FrameSample", "FrameStats"]
+
+
+class FrameSample:
+    """ Timings and counters of a single frame, spanning the `update` and `render` calls that produced it.
+
+        Phases, timed in seconds:
+            input       hover and click resolution
+            update      component `update` polling
+            index       bringing the spatial index and tree order up to date
+            paint       clearing and redrawing damaged regions and retained surfaces
+            blit        copying the renderer surface and layers to the destination
+
+        Counters:
+            nodes_visited       nodes tested for input or drawn
+            dirty_nodes         nodes repainted
+            unit_evaluations    size units evaluated to recompute invalidated geometry
+            clears              surface regions cleared before being redrawn
+            blits               retained surfaces and layers blitted, including the final blit
+            dirty_tiles         tiles of the renderer's dirty tile grid marked for repainting
+            repainted_pixels    area of the surface regions cleared and redrawn
+    """
+    PHASES = ("input", "update", "index", "paint", "blit")
+    COUNTERS = ("nodes_visited", "dirty_nodes", "unit_evaluations", "clears", "blits", "dirty_tiles", "repainted_pixels")
+
+
+    def __init__(self):
+        self.timings = dict.fromkeys(self.PHASES, 0.0)
+        self.counts = dict.fromkeys(self.COUNTERS, 0)
+
+
+    @property
+    def total(self) -> float:
+        """ Get the time spent in all phases of this frame, in seconds. """
+        return sum(self.timings.values())
+
+
+    def __repr__(self) -> str:
+        timings = ", ".join(f"{phase}={seconds * 1000:.3f}ms" for phase, seconds in self.timings.items())
+        counts = ", ".join(f"{counter}={count}" for counter, count in self.counts.items())
+        return f"FrameSample({timings}, {counts})"
+
+
+
+
+class FrameStats:
+    """ Rolling record of the renderer's per-frame costs.
+
+        A frame is closed by every `ViewRenderer.render` call. Only the last `history` frames are kept.
+    """
+    HISTOGRAM_BOUNDS = (1, 2, 4, 8, 16, 33, 66) # upper bounds of the frame cost histogram buckets, in milliseconds
+
+
+    def __init__(self, history: int = 240):
+        self.current = FrameSample() # the frame being recorded
+        self._history: deque[FrameSample] = deque(maxlen=history)
+        self.frames = 0
+
+
+    @property
+    def last(self) -> FrameSample | None:
+        """ Get the last complete frame, or `None` if no frame has been rendered yet. """
+        return self._history[-1] if self._history else None
+
+
+    @property
+    def history(self) -> tuple[FrameSample, ...]:
+        """ Get the recorded frames, oldest first. """
+        return tuple(self._history)
+
+
+    @property
+    def histogram(self) -> dict[float, int]:
+        """ Get the number of recorded frames falling into each frame cost bucket.
+
+            Buckets are keyed by their upper bound in milliseconds. The last one, keyed by `inf`, counts the rest.
+        """
+        buckets = dict.fromkeys((*self.HISTOGRAM_BOUNDS, float("inf")), 0)
+        for sample in self._history:
+            cost = sample.total * 1000
+            buckets[next(bound for bound in buckets if cost <= bound)] += 1
+        return buckets
+
+
+    def mean(self, phase: str | None = None) -> float:
+        """ Get the mean time of a phase, or of whole frames when `phase` is `None`, over the recorded frames in seconds. """
+        if not self._history:
+            return 0.0
+        return sum(sample.total if phase is None else sample.timings[phase] for sample in self._history) / len(self._history)
+
+
+    def end_frame(self) -> None:
+        self._history.append(self.current)
+        self.current = FrameSample()
+        self.frames += 1
+
+
+    def reset(self) -> None:
+        self._history.clear()
+        self.current = FrameSample()
+        self.frames = 0
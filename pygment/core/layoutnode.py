@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import Any, Iterator
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Iterator, Mapping
 import weakref
 
 import pygame
@@ -8,14 +9,21 @@ from pygment.core.uielement import UIElement
 from pygment.editor.type import _UnitRect
 from pygment.editor import Style
 
+if TYPE_CHECKING:
+    from pygment.core.viewrenderer import ViewRenderer
+
 
 class LayoutNode(UIElement):
     """ Represents a linked node that can store a number of ordered children. """
+    __slots__ = ("_elements", "_parent", "_renderer", "_name")
+    NO_CHILDREN: Mapping[str, LayoutNode] = MappingProxyType({}) # shared by all leaf nodes until they get a child
+    
+    
     def __init__(self, name: str, rect: _UnitRect, style: Style | dict[str, Any] = {}, **kwargs: Any):
-        super().__init__(rect, style, **kwargs)
-        self.__dict__["_elements"] = {} # built-in dict has the ability to remember insertion order since python3.7
-        self._elements: dict[str, LayoutNode]
+        self._elements: Mapping[str, LayoutNode] = LayoutNode.NO_CHILDREN
         self._parent: weakref.ReferenceType[LayoutNode] | None = None
+        self._renderer: weakref.ReferenceType[ViewRenderer] | None = None
+        super().__init__(rect, style, **kwargs)
 
         self._name = name
         
@@ -25,6 +33,17 @@ class LayoutNode(UIElement):
         return self._name
         
         
+    @property
+    def path(self) -> str:
+        """ Get the slash separated names of this component and its ancestors, starting at the layout root, e.g. `"card/card_frame"`. """
+        names = [self._name]
+        node = self.parent
+        while node is not None:
+            names.append(node._name)
+            node = node.parent
+        return "/".join(reversed(names))
+    
+    
     @property
     def parent(self) -> LayoutNode | None:
         """ Get this component's parent element. 
@@ -36,23 +55,78 @@ class LayoutNode(UIElement):
         return self._parent()
     
     
+    @property
+    def renderer(self) -> ViewRenderer | None:
+        """ Get the renderer this component's layout is attached to. 
+            
+            If the layout isn't rendered by any `ViewRenderer`, None is returned. 
+        """
+        if not self._renderer:
+            return None
+        return self._renderer()
+    
+    
     @property
     def children(self) -> tuple[LayoutNode]:
         return tuple(self._elements.values())
     
     
-    def client_x(self, surface: pygame.surface.Surface) -> float:
-        x = super().client_x(surface)
-        if self.parent:
-            x += self.parent.client_x(surface)
-        return x
+    def mark_dirty(self) -> None:
+        super().mark_dirty()
+        renderer = self.renderer
+        if renderer:
+            renderer._on_dirty(self)
+        
+        
+    def _count_unit_evaluations(self, count: int) -> None:
+        renderer = self.renderer
+        if renderer is not None and renderer._stats is not None:
+            renderer._stats.current.counts["unit_evaluations"] += count
+        
+        
+    def invalidate_geometry(self) -> None:
+        """ Drop the cached client geometry of this component and its whole subtree. """
+        if self._geometry_size is None:
+            return # a node can only hold a valid geometry while its parent does, so the subtree is already invalid
+        
+        super().invalidate_geometry()
+        renderer = self.renderer
+        if renderer:
+            renderer._on_geometry_change(self)
+        parent = self.parent
+        if parent:
+            parent._on_children_change()
+            
+        for child in self._elements.values():
+            child.invalidate_geometry()
+            
+            
+    def _on_children_change(self) -> None:
+        """ Called when a child is added to this component or the geometry of any of its children is invalidated. """
+        pass
     
     
-    def client_y(self, surface: pygame.surface.Surface) -> float:
-        y = super().client_y(surface)
-        if self.parent:
-            y += self.parent.client_y(surface)
-        return y
+    def _on_style_change(self, key: str) -> None:
+        super()._on_style_change(key)
+        renderer = self.renderer
+        if renderer:
+            renderer._on_style_change(self, key)
+    
+    
+    def _compute_geometry(self, surface: pygame.surface.Surface) -> tuple[float, float, float, float]:
+        x, y, w, h = super()._compute_geometry(surface)
+        parent = self.parent
+        if parent:
+            parent_x, parent_y = parent._content_origin(surface)
+            x += parent_x
+            y += parent_y
+        return x, y, w, h
+    
+    
+    def _content_origin(self, surface: pygame.surface.Surface) -> tuple[float, float]:
+        """ Get the point the positions of this component's children are relative to. """
+        x, y, _, _ = self._client_geometry(surface)
+        return x, y
     
     
     def add(self, child: LayoutNode) -> None:
@@ -71,8 +145,17 @@ class LayoutNode(UIElement):
         if child.name in self._elements:
             raise ValueError(f"container '{self}' already contains a child with the same name '{child.name}'")
         
-        self._elements[child.name] = child
+        if self._elements is LayoutNode.NO_CHILDREN:
+            self._elements = {} # built-in dict has the ability to remember insertion order since python3.7
+        self._elements[child.name] = child # type: ignore
         child._parent = weakref.ref(self)
+        child.invalidate_geometry()
+        child._attach(self._renderer)
+        self._on_children_change()
+        
+        renderer = self.renderer
+        if renderer:
+            renderer._on_structure_change(self)
         
         
     def join(self, parent: LayoutNode) -> None:
@@ -89,6 +172,13 @@ class LayoutNode(UIElement):
         parent.add(self)
         
         
+    def _attach(self, renderer: weakref.ReferenceType[ViewRenderer] | None) -> None:
+        """ Bind this component's subtree to a renderer, letting it report geometry and structure changes. """
+        self._renderer = renderer
+        for child in self._elements.values():
+            child._attach(renderer)
+        
+        
     def __getattr__(self, attr: str) -> LayoutNode:
         element = self._elements.get(attr) 
         if element is None:
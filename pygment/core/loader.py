@@ -0,0 +1,355 @@
+from __future__ import annotations
+from typing import Any, Mapping, NamedTuple
+import json
+import struct
+
+from pygment.core.layoutnode import LayoutNode
+from pygment.editor import Style
+from pygment.editor.unit import SizeUnitType, _UNIT_TYPES
+
+
+__all__ = ["LayoutSpec", "build_layout", "load_json", "LayoutSnapshot"]
+
+
+LayoutSpec = dict[str, Any] | list[dict[str, Any]]
+""" Declarative layout description. Every node is a dict of the form:
+
+        {
+            "type": "Frame",                        # component class name
+            "name": "card",
+            "rect": ["50sw", "50sh", 160, 200],     # the same values as passed to the component constructor
+            "style": {"color": [20, 20, 20]},       # optional
+            "classes": ["card"],                    # optional names of stylesheet style classes, see `build_layout`
+            "children": [...]                       # optional child node specs, in order
+        }
+
+    A spec is either a single root node or a list of layout roots. Lists inside the style values are read as tuples,
+    so the spec can be loaded from JSON.
+"""
+
+
+def default_components() -> dict[str, type[LayoutNode]]:
+    """ Get the built-in component classes which can be created from a spec, by their class names. """
+    from pygment.component import Button, Frame, Image, Label, ScrollView
+    return {cls.__name__: cls for cls in (Button, Frame, Image, Label, ScrollView)}
+
+
+def build_layout(spec: LayoutSpec, components: Mapping[str, type[LayoutNode]] | None = None, 
+                 stylesheet: Mapping[str, Style] | None = None) -> tuple[LayoutNode, ...]:
+    """ Build the layout roots described by a spec.
+
+        Args:
+            spec: a root node spec or a list of them
+            components: component classes by the names used as node types, the built-in components by default.
+                Each class is constructed as `cls(name, rect, style)`
+            stylesheet: shared style classes by the names used in the node `classes` lists
+
+        Raises:
+            ValueError when a node has an unknown type or style class or misses a required key
+            TypeError when a style value doesn't match its schema field type
+    """
+    types = components if components is not None else default_components()
+    roots = [spec] if isinstance(spec, dict) else spec
+    return tuple(_build_node(node, types, stylesheet or {}, None, "") for node in roots)
+
+
+def load_json(path: str, components: Mapping[str, type[LayoutNode]] | None = None, 
+              stylesheet: Mapping[str, Style] | None = None) -> tuple[LayoutNode, ...]:
+    """ Build the layout described by a JSON spec file. """
+    with open(path, "r", encoding="utf-8") as file:
+        return build_layout(json.load(file), components, stylesheet)
+
+
+def _build_node(spec: dict[str, Any], types: Mapping[str, type[LayoutNode]], stylesheet: Mapping[str, Style], 
+                parent: LayoutNode | None, path: str) -> LayoutNode:
+    try:
+        type_name, name, rect = spec["type"], spec["name"], spec["rect"]
+    except KeyError as e:
+        raise ValueError(f"layout node '{path}{spec.get('name', '?')}' is missing the {e} key")
+    cls = types.get(type_name)
+    if cls is None:
+        raise ValueError(f"layout node '{path}{name}' has an unknown component type '{type_name}'")
+
+    style: Style | dict[str, Any] = {key: _tuples(value) for key, value in spec.get("style", {}).items()}
+    if "classes" in spec:
+        unknown = [class_name for class_name in spec["classes"] if class_name not in stylesheet]
+        if unknown:
+            raise ValueError(f"layout node '{path}{name}' uses an unknown style class '{unknown[0]}'")
+        style = Style(style, classes=[stylesheet[class_name] for class_name in spec["classes"]])
+    node = cls(name, tuple(rect), style) # type: ignore
+    if parent is not None:
+        parent.add(node)
+    for child in spec.get("children", ()):
+        _build_node(child, types, stylesheet, node, f"{path}{name}/")
+    return node
+
+
+def _tuples(value: Any) -> Any:
+    """ Convert the lists of a JSON value to tuples. """
+    if isinstance(value, list | tuple):
+        return tuple(_tuples(v) for v in value)
+    return value
+
+
+
+
+class _NodeRecord(NamedTuple):
+    type: str
+    name: str
+    parent: int # index of the parent record, -1 for layout roots
+    rect: tuple[float | SizeUnitType, ...]
+    style: tuple[tuple[str, Any], ...]
+
+
+
+
+class LayoutSnapshot:
+    """ Layout compiled to parsed size units and validated style values, built without parsing or validating anything.
+
+        Snapshots keep the structure, rects and styles of a layout, but not its callbacks. Style classes are flattened into
+        the styles of the nodes using them, so a snapshot doesn't follow later changes of the classes. They're saved as a compact
+        binary file:
+
+            b"PGLS", version                    file header
+            count, strings                      string table of length prefixed UTF-8 strings
+            count, styles                       style table of item counts followed by (key, value) pairs
+            count, nodes                        node records, in pre-order
+
+        Every node record is a fixed size struct of its type and name (string table indices), the index of its parent
+        record (-1 for layout roots), its style table index and its 4 rect values, each stored as a kind and a float,
+        where the kind is 0 for integers, 1 for floats and 2 + string table index of the unit type name for size units.
+        Style values are tagged with a single byte:
+
+            b"N"                 None
+            b"T", b"F"           True, False
+            b"i", int64          integer
+            b"f", float64        float
+            b"s", index          string
+            b"u", index, float64 size unit, by its type name and value
+            b"t", count, values  tuple
+
+        Equal styles are stored once, and the nodes sharing a style only have it validated and decoded once. A snapshot
+        depends on the style schemas of its component classes, so it has to be compiled again when they change.
+    """
+    MAGIC = b"PGLS"
+    VERSION = 2
+    _HEADER = struct.Struct("<4sB")
+    _COUNT = struct.Struct("<I")
+    _NODE = struct.Struct("<IIiIIdIdIdId") # type, name, parent, style, (kind, value) of each rect value
+    _INT = struct.Struct("<q")
+    _FLOAT = struct.Struct("<d")
+    _UNIT = struct.Struct("<Id")
+    _TUPLE = struct.Struct("<H")
+
+
+    def __init__(self, nodes: list[_NodeRecord]):
+        self.nodes = nodes
+
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+    @classmethod
+    def from_spec(cls, spec: LayoutSpec, components: Mapping[str, type[LayoutNode]] | None = None, 
+                  stylesheet: Mapping[str, Style] | None = None) -> LayoutSnapshot:
+        """ Compile a spec, parsing its units and validating its styles.
+
+            Raises:
+                ValueError, TypeError the same way as `build_layout`
+        """
+        return cls.from_layout(build_layout(spec, components, stylesheet))
+
+
+    @classmethod
+    def from_layout(cls, layout: tuple[LayoutNode, ...]) -> LayoutSnapshot:
+        """ Capture the structure, rects and styles of a layout. """
+        nodes: list[_NodeRecord] = []
+        stack: list[tuple[LayoutNode, int]] = [(root, -1) for root in reversed(layout)]
+        while stack:
+            node, parent = stack.pop()
+            index = len(nodes)
+            nodes.append(_NodeRecord(type(node).__name__, node.name, parent, (node.x, node.y, node.width, node.height), tuple(node.style.resolved().items())))
+            stack.extend((child, index) for child in reversed(node.children))
+        return cls(nodes)
+
+
+    def build(self, components: Mapping[str, type[LayoutNode]] | None = None) -> tuple[LayoutNode, ...]:
+        """ Build the layout roots. The styles are trusted to have been validated against the components' schemas.
+
+            Raises:
+                ValueError when a node has an unknown type
+        """
+        types = components if components is not None else default_components()
+        styles: dict[tuple[type[LayoutNode], int], Style] = {} # shared by the records decoded from the same style
+        built: list[LayoutNode] = []
+        roots: list[LayoutNode] = []
+        for record in self.nodes:
+            cls = types.get(record.type)
+            if cls is None:
+                raise ValueError(f"layout node '{record.name}' has an unknown component type '{record.type}'")
+
+            style = styles.get((cls, id(record.style)))
+            if style is None:
+                style = styles[cls, id(record.style)] = Style.validated(dict(record.style), cls.style_schema)
+            node = cls(record.name, record.rect, style) # type: ignore # copied by the component
+            if record.parent < 0:
+                roots.append(node)
+            else:
+                built[record.parent].add(node)
+            built.append(node)
+        return tuple(roots)
+
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+
+    @classmethod
+    def load(cls, path: str) -> LayoutSnapshot:
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+    def to_bytes(self) -> bytes:
+        strings: dict[str, int] = {}
+        styles: dict[tuple[tuple[str, Any], ...], int] = {}
+        def string(value: str) -> int:
+            return strings.setdefault(value, len(strings))
+
+        def value(out: bytearray, val: Any) -> None:
+            if val is None:
+                out.extend(b"N")
+            elif val is True or val is False:
+                out.extend(b"T" if val else b"F")
+            elif isinstance(val, int):
+                out.extend(b"i" + self._INT.pack(val))
+            elif isinstance(val, float):
+                out.extend(b"f" + self._FLOAT.pack(val))
+            elif isinstance(val, str):
+                out.extend(b"s" + self._COUNT.pack(string(val)))
+            elif isinstance(val, SizeUnitType):
+                out.extend(b"u" + self._UNIT.pack(string(type(val).__name__), val.value))
+            elif isinstance(val, tuple):
+                out.extend(b"t" + self._TUPLE.pack(len(val)))
+                for v in val:
+                    value(out, v)
+            else:
+                raise TypeError(f"can't store value '{val}' of type '{type(val)}' in a layout snapshot")
+
+        def rect_value(val: float | SizeUnitType) -> tuple[int, float]:
+            if isinstance(val, SizeUnitType):
+                return 2 + string(type(val).__name__), val.value
+            if isinstance(val, bool) or not isinstance(val, int | float):
+                raise TypeError(f"can't store rect value '{val}' of type '{type(val)}' in a layout snapshot")
+            return (0 if isinstance(val, int) else 1), val
+
+        style_data = bytearray()
+        node_data = bytearray(self._COUNT.pack(len(self.nodes)))
+        for record in self.nodes:
+            style = styles.get(record.style)
+            if style is None:
+                style = styles[record.style] = len(styles)
+                style_data.extend(self._TUPLE.pack(len(record.style)))
+                for key, val in record.style:
+                    style_data.extend(self._COUNT.pack(string(key)))
+                    value(style_data, val)
+            rect = [field for val in record.rect for field in rect_value(val)]
+            node_data.extend(self._NODE.pack(string(record.type), string(record.name), record.parent, style, *rect))
+
+        data = bytearray(self._HEADER.pack(self.MAGIC, self.VERSION))
+        data.extend(self._COUNT.pack(len(strings)))
+        for text in strings:
+            encoded = text.encode("utf-8")
+            data.extend(self._COUNT.pack(len(encoded)))
+            data.extend(encoded)
+        data.extend(self._COUNT.pack(len(styles)))
+        return bytes(data + style_data + node_data)
+
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> LayoutSnapshot:
+        """ Raises:
+                ValueError when the data isn't a layout snapshot of a supported version
+        """
+        if len(data) < cls._HEADER.size:
+            raise ValueError("data is not a layout snapshot")
+        magic, version = cls._HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError("data is not a layout snapshot")
+        if version != cls.VERSION:
+            raise ValueError(f"unsupported layout snapshot version {version}")
+
+        count_size, unpack_count = cls._COUNT.size, cls._COUNT.unpack_from
+        offset = cls._HEADER.size
+        strings: list[str] = []
+        (count,) = unpack_count(data, offset)
+        offset += count_size
+        for _ in range(count):
+            (length,) = unpack_count(data, offset)
+            offset += count_size
+            strings.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+
+        units: dict[tuple[int, float], SizeUnitType] = {} # units are immutable, so equal ones are shared
+        def unit(kind: int, val: float) -> SizeUnitType:
+            found = units.get((kind, val))
+            if found is None:
+                found = units[kind, val] = _UNIT_TYPES[strings[kind]](val)
+            return found
+
+        def value() -> Any:
+            nonlocal offset
+            tag = data[offset:offset + 1]
+            offset += 1
+            match tag:
+                case b"N": return None
+                case b"T": return True
+                case b"F": return False
+                case b"i":
+                    (val,) = cls._INT.unpack_from(data, offset)
+                    offset += cls._INT.size
+                    return val
+                case b"f":
+                    (val,) = cls._FLOAT.unpack_from(data, offset)
+                    offset += cls._FLOAT.size
+                    return val
+                case b"s":
+                    (index,) = unpack_count(data, offset)
+                    offset += count_size
+                    return strings[index]
+                case b"u":
+                    index, val = cls._UNIT.unpack_from(data, offset)
+                    offset += cls._UNIT.size
+                    return unit(index, val)
+                case b"t":
+                    (length,) = cls._TUPLE.unpack_from(data, offset)
+                    offset += cls._TUPLE.size
+                    return tuple(value() for _ in range(length))
+            raise ValueError(f"invalid value tag {tag!r} in layout snapshot")
+
+        styles: list[tuple[tuple[str, Any], ...]] = []
+        (count,) = unpack_count(data, offset)
+        offset += count_size
+        for _ in range(count):
+            (length,) = cls._TUPLE.unpack_from(data, offset)
+            offset += cls._TUPLE.size
+            items = []
+            for _ in range(length):
+                (key,) = unpack_count(data, offset)
+                offset += count_size
+                items.append((strings[key], value()))
+            styles.append(tuple(items))
+
+        def rect_value(kind: int, val: float) -> float | SizeUnitType:
+            return int(val) if kind == 0 else val if kind == 1 else unit(kind - 2, val)
+
+        nodes: list[_NodeRecord] = []
+        (count,) = unpack_count(data, offset)
+        offset += count_size
+        for fields in cls._NODE.iter_unpack(data[offset:offset + count * cls._NODE.size]):
+            type_index, name_index, parent, style, x_kind, x, y_kind, y, w_kind, w, h_kind, h = fields
+            rect = (rect_value(x_kind, x), rect_value(y_kind, y), rect_value(w_kind, w), rect_value(h_kind, h))
+            nodes.append(_NodeRecord(strings[type_index], strings[name_index], parent, rect, styles[style]))
+        return cls(nodes)
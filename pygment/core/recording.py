@@ -0,0 +1,223 @@
+from __future__ import annotations
+from typing import Callable, Iterator, NamedTuple
+import struct
+import time
+import zlib
+
+import pygame
+
+from pygment.core.framestats import FrameSample
+from pygment.core.layoutnode import LayoutNode
+
+
+__all__ = ["MouseInput", "Wheel", "Resize", "RecordedFrame", "Recording", "ReplayReport", "replay"]
+
+
+class MouseInput(NamedTuple):
+    """ Mouse state change. `pos` is `None` while the cursor is outside of the window. """
+    pos: tuple[int, int] | None
+    pressed: bool
+
+
+class Wheel(NamedTuple):
+    """ Mouse wheel scroll, in the units of `ViewRenderer.handle_event` wheel events. """
+    x: float
+    y: float
+
+
+class Resize(NamedTuple):
+    size: tuple[int, int]
+
+
+class RecordedFrame(NamedTuple):
+    """ Inputs received before an `update` call, in order, and the `dt` it was called with. """
+    dt: int
+    events: tuple[MouseInput | Wheel | Resize, ...]
+
+
+
+
+class Recording:
+    """ Input session captured from a `ViewRenderer`, started with `ViewRenderer.start_recording`.
+
+        Recordings are saved as a zlib compressed stream of tagged binary records:
+
+            b"PGRC", version          file header
+            b"S", width, height       initial renderer size
+            b"M", x, y, flags         mouse state change, flags bit 0 - button pressed, bit 1 - outside of the window
+            b"W", x, y                mouse wheel scroll, as doubles
+            b"R", width, height       renderer resize
+            b"F", dt                  `update` call, closing the current frame
+    """
+    MAGIC = b"PGRC"
+    VERSION = 2 # version 1 recordings, without wheel records, are still read
+    _HEADER = struct.Struct("<4sB")
+    _RECORDS = {b"S": struct.Struct("<II"), b"M": struct.Struct("<iiB"), b"W": struct.Struct("<dd"), b"R": struct.Struct("<II"), b"F": struct.Struct("<I")}
+
+
+    def __init__(self, size: tuple[int, int], frames: list[RecordedFrame] | None = None):
+        self.size = size
+        self.frames = frames if frames is not None else []
+        self._pending: list[MouseInput | Wheel | Resize] = []
+        self._mouse: MouseInput | None = None
+
+
+    def record_input(self, pos: tuple[int, int] | None, pressed: bool) -> None:
+        state = MouseInput(pos, pressed)
+        if state != self._mouse:
+            self._mouse = state
+            self._pending.append(state)
+
+
+    def record_wheel(self, x: float, y: float) -> None:
+        self._pending.append(Wheel(x, y))
+
+
+    def record_resize(self, size: tuple[int, int]) -> None:
+        self._pending.append(Resize(size))
+
+
+    def record_frame(self, dt: int) -> None:
+        self.frames.append(RecordedFrame(dt, tuple(self._pending)))
+        self._pending.clear()
+
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+
+    @classmethod
+    def load(cls, path: str) -> Recording:
+        """ Load a recording saved with `save`.
+
+            Raises:
+                `ValueError` when the file isn't a valid recording
+        """
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+    def to_bytes(self) -> bytes:
+        records = [self._HEADER.pack(self.MAGIC, self.VERSION), b"S" + self._RECORDS[b"S"].pack(*self.size)]
+        for frame in self.frames:
+            for event in frame.events:
+                if isinstance(event, Resize):
+                    records.append(b"R" + self._RECORDS[b"R"].pack(*event.size))
+                elif isinstance(event, Wheel):
+                    records.append(b"W" + self._RECORDS[b"W"].pack(*event))
+                else:
+                    x, y = event.pos or (0, 0)
+                    records.append(b"M" + self._RECORDS[b"M"].pack(x, y, event.pressed | (event.pos is None) << 1))
+            records.append(b"F" + self._RECORDS[b"F"].pack(frame.dt))
+        return zlib.compress(b"".join(records), 9)
+
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Recording:
+        try:
+            data = zlib.decompress(data)
+        except zlib.error as e:
+            raise ValueError(f"invalid recording data. {e}")
+
+        magic, version = cls._HEADER.unpack_from(data) if len(data) >= cls._HEADER.size else (None, None)
+        if magic != cls.MAGIC or not 1 <= version <= cls.VERSION:
+            raise ValueError(f"invalid recording header, expected '{cls.MAGIC!r}' version up to {cls.VERSION}")
+
+        recording = cls((0, 0))
+        events: list[MouseInput | Wheel | Resize] = []
+        for tag, values in cls._iter_records(data, cls._HEADER.size):
+            match tag:
+                case b"S": recording.size = values
+                case b"M": events.append(MouseInput(None if values[2] & 2 else values[:2], bool(values[2] & 1)))
+                case b"W": events.append(Wheel(*values))
+                case b"R": events.append(Resize(values))
+                case b"F":
+                    recording.frames.append(RecordedFrame(values[0], tuple(events)))
+                    events.clear()
+        return recording
+
+
+    @classmethod
+    def _iter_records(cls, data: bytes, offset: int) -> Iterator[tuple[bytes, tuple[int, ...]]]:
+        while offset < len(data):
+            tag = data[offset:offset + 1]
+            record = cls._RECORDS.get(tag)
+            if record is None or offset + 1 + record.size > len(data):
+                raise ValueError(f"invalid recording record '{tag!r}' at offset {offset}")
+            yield tag, record.unpack_from(data, offset + 1)
+            offset += 1 + record.size
+
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+
+
+
+class ReplayReport(NamedTuple):
+    frame_times: list[float]
+    """ Time spent in `update` and `render` on every frame, in seconds. """
+    checksums: list[int]
+    """ CRC32 of the rendered output after every frame. """
+    samples: list[FrameSample]
+    """ Per-phase timings and counters of every frame. """
+
+    @property
+    def checksum(self) -> int:
+        """ Get the checksum of the final frame. """
+        return self.checksums[-1] if self.checksums else 0
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.frame_times)
+
+
+
+
+def replay(recording: Recording, layout_factory: Callable[[], tuple[LayoutNode, ...]]) -> ReplayReport:
+    """ Feed a recorded session into a new renderer and measure every frame.
+
+        Inputs are delivered through `ViewRenderer.handle_event`, so the replay doesn't depend on the live mouse state.
+        The pygame display has to be initialized, which can be done with the SDL dummy video driver when running headless.
+        Replays are deterministic as long as the layout is, e.g. images loaded in the background may finish at different frames.
+
+        Args:
+            recording: the recorded session
+            layout_factory: callable building a fresh layout of the recorded application
+    """
+    from pygment.core.viewrenderer import ViewRenderer
+
+    renderer = ViewRenderer(recording.size, layout_factory())
+    stats = renderer.enable_stats(history=max(len(recording), 1))
+    dest = pygame.surface.Surface(recording.size)
+    frame_times, checksums = [], []
+    mouse = MouseInput(None, False)
+
+    for frame in recording.frames:
+        start = time.perf_counter()
+        for event in frame.events:
+            if isinstance(event, Resize):
+                renderer.size = event.size
+                dest = pygame.surface.Surface(event.size)
+            else:
+                renderer.handle_event(_to_event(mouse, event))
+                if isinstance(event, MouseInput):
+                    mouse = event
+        renderer.update(frame.dt)
+        dest.fill((0, 0, 0))
+        renderer.render(dest, (0, 0))
+        frame_times.append(time.perf_counter() - start)
+        checksums.append(zlib.crc32(pygame.image.tobytes(dest, "RGB")))
+
+    return ReplayReport(frame_times, checksums, list(stats.history))
+
+
+def _to_event(previous: MouseInput, state: MouseInput | Wheel) -> pygame.event.Event:
+    if isinstance(state, Wheel):
+        return pygame.event.Event(pygame.MOUSEWHEEL, x=round(state.x), y=round(state.y), precise_x=state.x, precise_y=state.y)
+    if state.pos is None:
+        return pygame.event.Event(pygame.WINDOWLEAVE)
+    if state.pressed != previous.pressed:
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN if state.pressed else pygame.MOUSEBUTTONUP, pos=state.pos, button=pygame.BUTTON_LEFT)
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=state.pos)
@@ -0,0 +1,137 @@
+from __future__ import annotations
+from typing import Generic, Hashable, Iterator, TypeVar
+
+import pygame
+
+
+__all__ = ["SpatialGrid"]
+
+
+_T = TypeVar("_T", bound=Hashable)
+class SpatialGrid(Generic[_T]):
+    """ Uniform grid index mapping objects to the cells overlapped by their bounding rects.
+
+        The grid is unbounded - cells are created on demand - so objects positioned outside of the renderer
+        surface are indexed as well. Rects spanning more than `max_cells` cells are kept in a separate
+        oversized bucket which is checked linearly on every query.
+    """
+    def __init__(self, cell_size: int = 64, max_cells: int = 256):
+        self._cell_size = cell_size
+        self._max_cells = max_cells
+        self._cells: dict[tuple[int, int], set[_T]] = {}
+        self._oversized: set[_T] = set()
+        self._rects: dict[_T, pygame.Rect] = {}
+
+
+    @property
+    def cell_size(self) -> int:
+        return self._cell_size
+
+
+    def rect_of(self, obj: _T) -> pygame.Rect | None:
+        """ Get the rect an object was last indexed with, or `None` if the object isn't indexed. """
+        return self._rects.get(obj)
+
+
+    def update(self, obj: _T, rect: pygame.Rect) -> None:
+        """ Insert an object into the index, or move it if it's already indexed. """
+        prev = self._rects.get(obj)
+        if prev is not None:
+            if prev == rect:
+                return
+            self.remove(obj)
+
+        self._rects[obj] = rect
+        cells = self._cell_span(rect)
+        if cells is None:
+            return
+
+        x0, y0, x1, y1 = cells
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > self._max_cells:
+            self._oversized.add(obj)
+            return
+
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self._cells.setdefault((cx, cy), set()).add(obj)
+
+
+    def remove(self, obj: _T) -> None:
+        """ Remove an object from the index. Removing an object which isn't indexed is a no-op. """
+        rect = self._rects.pop(obj, None)
+        if rect is None:
+            return
+
+        if obj in self._oversized:
+            self._oversized.remove(obj)
+            return
+
+        cells = self._cell_span(rect)
+        if cells is None:
+            return
+
+        x0, y0, x1, y1 = cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = self._cells[(cx, cy)]
+                bucket.discard(obj)
+                if not bucket:
+                    del self._cells[(cx, cy)]
+
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._oversized.clear()
+        self._rects.clear()
+
+
+    def query_point(self, pos: tuple[int, int]) -> list[_T]:
+        """ Return all indexed objects whose rect contains the point. """
+        cell = (pos[0] // self._cell_size, pos[1] // self._cell_size)
+        bucket = self._cells.get(cell, ())
+        rects = self._rects
+        hits = [obj for obj in bucket if rects[obj].collidepoint(pos)]
+        hits.extend(obj for obj in self._oversized if rects[obj].collidepoint(pos))
+        return hits
+
+
+    def query_rect(self, rect: pygame.Rect) -> set[_T]:
+        """ Return all indexed objects whose rect overlaps the given rect. """
+        cells = self._cell_span(rect)
+        if cells is None:
+            return set()
+
+        x0, y0, x1, y1 = cells
+        found: set[_T] = set(self._oversized)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+            for cell, bucket in self._cells.items():
+                if x0 <= cell[0] <= x1 and y0 <= cell[1] <= y1:
+                    found.update(bucket)
+        else:
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    found.update(self._cells.get((cx, cy), ()))
+
+        rects = self._rects
+        return {obj for obj in found if rects[obj].colliderect(rect)}
+
+
+    def _cell_span(self, rect: pygame.Rect) -> tuple[int, int, int, int] | None:
+        """ Get the inclusive (x0, y0, x1, y1) range of cells covered by a rect, or `None` for empty rects. """
+        if rect.w <= 0 or rect.h <= 0:
+            return None
+
+        size = self._cell_size
+        return rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size
+
+
+    def __contains__(self, obj: _T) -> bool:
+        return obj in self._rects
+
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+
+    def __iter__(self) -> Iterator[_T]:
+        return iter(self._rects)
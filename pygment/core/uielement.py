@@ -9,11 +9,28 @@ from pygment.core.eventtarget import EventTarget
 
 from pygment.editor.unit import SizeUnitType, str_to_unit
 from pygment.editor.type import _UnitRect
-from pygment.editor import Style
+from pygment.editor import Style, StyleSchema, StyleField
         
 
 class UIElement(EventTarget, ABC):
-    """ Base class defining a renderable visual component. """
+    """ Base class defining a renderable visual component. 
+    
+        Components are slotted to keep large layouts compact. Subclasses which don't declare `__slots__` 
+        get a regular instance `__dict__`.
+    """
+    __slots__ = ("_x", "_y", "_width", "_height", "_geometry", "_geometry_size", "_style", "_callbacks", "_hovered", "_dirty", "__weakref__")
+    GEOMETRY_STYLE_KEYS = frozenset({"centered"})
+    style_schema = StyleSchema(
+        hidden = StyleField(bool, False),
+        centered = StyleField(bool, False),
+        cache_as_surface = StyleField(bool, False),
+        layer = StyleField(bool, False),
+        clip = StyleField(bool, False),
+    )
+    
+    scrolls_content = False # whether the component moves its content by a scroll offset, see `ScrollView`
+    _counting_units = 0 # number of renderers recording frame stats, evaluated units are only counted while there's any
+    
     on_mouse_over = callback_property()
     on_mouse_enter = callback_property()
     on_mouse_click = callback_property()
@@ -23,8 +40,11 @@ class UIElement(EventTarget, ABC):
     
     
     def __init__(self, rect: _UnitRect, style: Style | dict[str, Any] = {}, **kwargs: Any):
-        self.x, self.y, self.width, self.height = rect
-        self.style = style | kwargs
+        self._callbacks = callback_property.NO_CALLBACKS
+        self._geometry: tuple[float, float, float, float] = (0, 0, 0, 0)
+        self._geometry_size: tuple[int, int] | None = None
+        self._x, self._y, self._width, self._height = (str_to_unit(value) if isinstance(value, str) else value for value in rect)
+        self._style = self._bind_style(style, kwargs)
         self._hovered = False
         self._dirty = True
         
@@ -46,7 +66,8 @@ class UIElement(EventTarget, ABC):
         if isinstance(value, str):
             value = str_to_unit(value) 
         self._x = value
-        self._dirty = True
+        self.mark_dirty()
+        self.invalidate_geometry()
         
         
     def client_x(self, surface: pygame.surface.Surface) -> float:
@@ -57,10 +78,7 @@ class UIElement(EventTarget, ABC):
             Args:
                 surface: pygame `Surface` object
         """
-        x = self._x.evaluate(self, surface) if isinstance(self._x, SizeUnitType) else self._x
-        if self.style.get("centered", False, bool):
-            x -= self.client_width(surface) / 2
-        return x
+        return self._client_geometry(surface)[0]
         
         
     @property 
@@ -80,7 +98,8 @@ class UIElement(EventTarget, ABC):
         if isinstance(value, str):
             value = str_to_unit(value) 
         self._y = value
-        self._dirty = True
+        self.mark_dirty()
+        self.invalidate_geometry()
         
         
     def client_y(self, surface: pygame.surface.Surface) -> float:
@@ -91,10 +110,7 @@ class UIElement(EventTarget, ABC):
             Args:
                 surface: pygame `Surface` object
         """
-        y = self._y.evaluate(self, surface) if isinstance(self._y, SizeUnitType) else self._y
-        if self.style.get("centered", False, bool):
-            y -= self.client_height(surface) / 2 
-        return y
+        return self._client_geometry(surface)[1]
 
         
     @property 
@@ -114,7 +130,8 @@ class UIElement(EventTarget, ABC):
         if isinstance(value, str):
             value = str_to_unit(value) 
         self._width = value
-        self._dirty = True
+        self.mark_dirty()
+        self.invalidate_geometry()
         
 
     def client_width(self, surface: pygame.surface.Surface) -> float:
@@ -125,9 +142,7 @@ class UIElement(EventTarget, ABC):
             Args:
                 surface: pygame `Surface` object
         """
-        if isinstance(self._width, SizeUnitType):
-            return self._width.evaluate(self, surface)
-        return self._width
+        return self._client_geometry(surface)[2]
     
     
     @property 
@@ -147,7 +162,8 @@ class UIElement(EventTarget, ABC):
         if isinstance(value, str):
             value = str_to_unit(value) 
         self._height = value
-        self._dirty = True
+        self.mark_dirty()
+        self.invalidate_geometry()
 
 
     def client_height(self, surface: pygame.surface.Surface) -> float:
@@ -158,9 +174,7 @@ class UIElement(EventTarget, ABC):
             Args:
                 surface: pygame `Surface` object
         """
-        if isinstance(self._height, SizeUnitType):
-            return self._height.evaluate(self, surface)
-        return self._height
+        return self._client_geometry(surface)[3]
     
     
     def client_rect(self, surface: pygame.surface.Surface) -> pygame.Rect:
@@ -169,20 +183,118 @@ class UIElement(EventTarget, ABC):
             Args:
                 surface: pygame `Surface` object
         """
-        x, y = self.client_x(surface), self.client_y(surface)
-        w, h = self.client_width(surface), self.client_height(surface)
-        return pygame.Rect(x, y, w, h)
+        return pygame.Rect(self._client_geometry(surface))
+    
+    
+    def mark_dirty(self) -> None:
+        """ Flag this component to be rerendered on the next frame. """
+        self._dirty = True
+        
+        
+    def invalidate_geometry(self) -> None:
+        """ Drop this component's cached client geometry, forcing it to be recomputed on the next access. 
+        
+            Called automatically whenever a property the geometry depends on is changed.
+        """
+        self._geometry_size = None
+        
+        
+    def _client_geometry(self, surface: pygame.surface.Surface) -> tuple[float, float, float, float]:
+        """ Get the cached (x, y, width, height) client geometry, recomputing it when invalid or computed for a different surface size. """
+        size = surface.get_size()
+        if self._geometry_size != size:
+            self._geometry = self._compute_geometry(surface)
+            self._geometry_size = size
+        return self._geometry
+    
+    
+    def _count_unit_evaluations(self, count: int) -> None:
+        """ Called with the number of size units evaluated by `_compute_geometry`, for profiling. """
+        pass
+    
+    
+    def _surface_dependence(self, parent_resizes: bool) -> tuple[bool, bool]:
+        """ Check whether this component's own units make its (position, size) change with the renderer surface size.
+        
+            Args:
+                parent_resizes: whether the size of this component's parent changes with the surface size
+        """
+        def depends(value: float | SizeUnitType) -> bool:
+            return isinstance(value, SizeUnitType) and (value.depends_on_surface(self) or parent_resizes and value.relative_to_parent)
+        
+        resizes = depends(self._width) or depends(self._height)
+        moves = depends(self._x) or depends(self._y) or resizes and self._style.computed.centered
+        return moves, resizes
+    
+    
+    def _compute_geometry(self, surface: pygame.surface.Surface) -> tuple[float, float, float, float]:
+        """ Evaluate this component's size units into an (x, y, width, height) tuple. """
+        values = [self._x, self._y, self._width, self._height]
+        units = 0
+        for i, value in enumerate(values):
+            if isinstance(value, SizeUnitType):
+                values[i] = value.evaluate(self, surface)
+                units += 1
+        if units and UIElement._counting_units:
+            self._count_unit_evaluations(units)
+        
+        x, y, w, h = values
+        if self._style.computed.centered:
+            x -= w / 2
+            y -= h / 2
+        return x, y, w, h
     
     
     @property 
     def style(self) -> Style:
+        """ Get or set this component's style. 
+        
+            The style is bound to the component class's `style_schema`, which validates the declared attributes on assignment.
+            Setting it to a `Style` already bound to the same schema copies its values without validating them again.
+            The style classes of a `Style` are kept, so components can share them, e.g. `Frame(name, rect, Style(classes=[button]))`.
+
+            Raises:
+                TypeError when setting a value that doesn't match its schema field type
+        """
         return self._style
 
 
     @style.setter
     def style(self, value: Style | dict[str, Any]) -> None:
-        self._style = Style(value)
+        self._style = self._bind_style(value)
+        self.mark_dirty()
+        self.invalidate_geometry()
         
+        
+    def _bind_style(self, value: Style | dict[str, Any], overrides: dict[str, Any] = {}) -> Style:
+        """ Make a style bound to this component's schema from a style value and local overrides and subscribe to its changes. """
+        classes = value.classes if isinstance(value, Style) else ()
+        if isinstance(value, Style) and value.schema is self.style_schema and not overrides:
+            style = Style.validated(value, self.style_schema, classes)
+        else:
+            style = Style(value | overrides if overrides else value, schema=self.style_schema, classes=classes)
+        style.add_listener(self._on_style_change)
+        return style
+        
+        
+    def _on_style_change(self, key: str) -> None:
+        self.mark_dirty()
+        if key in self.GEOMETRY_STYLE_KEYS:
+            self.invalidate_geometry()
+        
+    
+    def handle_wheel(self, x: float, y: float) -> bool:
+        """ Handle a mouse wheel event over this component. Components are offered the event innermost first.
+        
+            Args:
+                x: horizontal scroll amount, positive to the right
+                y: vertical scroll amount, positive away from the user
+                
+            Returns:
+                `True` or `False` whether the event was consumed
+        """
+        return False
+    
     
     @abstractmethod
     def update(self, dt: int) -> bool:
@@ -1,26 +1,135 @@
 from __future__ import annotations
-from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+import asyncio
+import bisect
+import heapq
+import math
+import threading
+import time
+import weakref
 
 import pygame
 
+from pygment.core.assets import surface_bytes
+from pygment.core.framestats import FrameStats
 from pygment.core.layoutnode import LayoutNode
+from pygment.core.recording import Recording
+from pygment.core.spatialindex import SpatialGrid
 from pygment.core.uielement import UIElement
 
 
+_RetainedSurface = tuple[pygame.surface.Surface, pygame.Rect]
+
+
+class _SharedSurface(pygame.surface.Surface):
+    """ Surface painted on by several render threads at once, each through its own full size subsurface with its own clip.
+    
+        Blits are serialized. pygame blits to a subsurface on its root surface, temporarily clipped to the subsurface's clip,
+        and SDL caches the mapping of a source surface to the last destination it was blitted to on the source, neither
+        of which is safe from several threads. Fills and draws aren't affected. Subsurfaces keep the class.
+    """
+    _blit_lock = threading.Lock()
+    
+    
+    def blit(self, *args: Any, **kwargs: Any) -> pygame.Rect:
+        with self._blit_lock:
+            return super().blit(*args, **kwargs)
+        
+        
+    def blits(self, blit_sequence: Any, doreturn: Any = 1) -> list[pygame.Rect] | None:
+        rects = [self.blit(*blit) for blit in blit_sequence]
+        return rects if doreturn else None
+
+
+
+
+def _stop_counting_units() -> None:
+    UIElement._counting_units -= 1
+
+
+
+
 class ViewRenderer:
-    def __init__(self, size: tuple[int, int], layout: tuple[LayoutNode, ...]):
-        self._surface = pygame.surface.Surface(size).convert_alpha()
+    AUTO_CACHE_MIN_NODES = 8 # smallest subtree cached automatically
+    AUTO_CACHE_FRAMES = 60 # number of frames a subtree has to stay unchanged before it's cached automatically
+    RESIZE_MARGIN = 1.25 # factor the renderer surfaces are over-allocated by, so that growing them reuses their pixels
+    TILE_SIZE = 256 # edge length of the tiles damaged regions are split into when painting on several threads
+    DIRTY_TILE_SIZE = 64 # edge length of the tiles of the grid tracking which parts of the surface need to be repainted
+    
+    
+    def __init__(self, size: tuple[int, int], layout: tuple[LayoutNode, ...], auto_cache: bool = False, render_threads: int = 1):
+        """ Make a new renderer for a layout. 
+        
+            Constructing a renderer doesn't require a display mode, its surfaces are converted to the display pixel format
+            on the first render after one is set, see `_convert_surfaces`.
+        
+            Args:
+                size: the renderer surface size
+                layout: the layout root components, in painting order
+                auto_cache: whether large subtrees which stay unchanged are automatically rendered to cached surfaces, 
+                    the same way as subtrees with the `cache_as_surface` style
+                render_threads: the number of threads damaged regions spanning several tiles are painted on, see `_paint_tiles`.
+                    Regions are painted on the calling thread when set to 1
+        """
+        self._display_format: pygame.surface.Surface | None = None # surface in the display pixel format, once converted to it
+        self._render_threads = max(1, render_threads)
+        self._surface = self._fit_surface(None, size)
         self._surface.fill((0,0,0,0))
+        self.auto_cache = auto_cache
         
-        self._dirty: set[LayoutNode] = set(layout)
+        self._dirty: set[LayoutNode] = set() # nodes which need to be repainted
+        self._painted: dict[LayoutNode, pygame.Rect] = {} # rects the nodes were last painted at
+        self._full_repaint = True
+        self._frame = 0
         self._pressed: set[UIElement] = set()
         self._hovered: set[UIElement] = set()
         self._layout = layout
         
+        self._index: SpatialGrid[LayoutNode] = SpatialGrid()
+        self._nodes: list[LayoutNode] = [] # every node of the layout in pre-order
+        self._order: dict[LayoutNode, int] = {} # pre-order position of every node in the layout
+        self._extent: dict[LayoutNode, int] = {} # end of the order range spanned by each node's subtree
+        self._unindexed: set[LayoutNode] = set()
+        self._structure_changed = True
+        self._surface_dependents: set[LayoutNode] | None = None # nodes whose geometry depends on the surface size
+        self._pending_size: tuple[int, int] | None = None # last size requested by resize events, applied on the next update
+        self._exposed: list[pygame.Rect] = [] # surface regions uncovered by growing it, to be repainted
+        self._tile_grid = bytearray() # dirty flags of the tiles covering the surface in row-major order, cleared after every frame
+        self._names: dict[str, LayoutNode] | None = None # first node of every name in tree order, None when outdated
+        self._paths: dict[str, LayoutNode] = {}
+        self._selections: dict[tuple[type | None, str | None], tuple[LayoutNode, ...]] = {}
+        
+        self._mouse_pos: tuple[int, int] | None = None # None while the cursor is outside of the window
+        self._mouse_pressed = False
+        self._input_changed = True
+        self._press_pending = False
+        self._event_driven = False
+        self._layout_version = 0 # bumped on every geometry or structure change
+        self._resolved_version: dict[LayoutNode, int] = {}
+        
+        self._surface_caches: dict[LayoutNode, _RetainedSurface | None] = {} # None when invalidated
+        self._layers: dict[LayoutNode, _RetainedSurface | None] = {}
+        self._root_intervals: dict[int, tuple[list[int], list[int], list[LayoutNode]]] = {} # see `_enclosing`, cleared when the roots or the tree order change
+        self._clip_roots: set[LayoutNode] = set() # nodes with the `clip` style
+        self._scroll_views: dict[LayoutNode, tuple[int, int]] = {} # content offset each retained scroll view surface was drawn at
+        self._view_damage: dict[LayoutNode, list[pygame.Rect]] = {} # regions of scroll view surfaces to redraw
+        self._spaces: dict[LayoutNode, LayoutNode] = {} # nodes inside scroll views -> the innermost one, whose content space they're laid out in
+        self._auto_cached: set[LayoutNode] = set()
+        self._changed_frame: dict[LayoutNode, int] = {} # frame on which anything in a node's subtree has last changed
+        self._scratch: pygame.surface.Surface | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._stats: FrameStats | None = None
+        self._stats_finalizer: weakref.finalize | None = None
+        self._recording: Recording | None = None
+        
+        for component in layout:
+            component._attach(weakref.ref(self))
+        
         
     @property
     def surface(self) -> pygame.surface.Surface:
-        """ Get the renderer's cached surface. """
+        """ Get the renderer's cached surface. Subtrees with the `layer` style are composited on top of it in `render` and aren't drawn on it. """
         return self._surface
     
     
@@ -30,95 +139,1160 @@ class ViewRenderer:
         return self._layout
     
     
+    @property
+    def surface_cache_bytes(self) -> int:
+        """ Get the amount of memory held by the retained surfaces of cached subtrees and layers. """
+        entries = (*self._surface_caches.values(), *self._layers.values())
+        return sum(surface_bytes(entry[0]) for entry in entries if entry is not None)
+    
+    
+    @property
+    def stats(self) -> FrameStats | None:
+        """ Get the per-frame timings and counters recorded since `enable_stats` was called, or `None` when disabled. """
+        return self._stats
+    
+    
+    def enable_stats(self, history: int = 240) -> FrameStats:
+        """ Start recording per-phase timings and counters of every frame. 
+        
+            Args:
+                history: the number of most recent frames to keep
+        """
+        self._stats = FrameStats(history)
+        if self._stats_finalizer is None: # also stops counting units when the renderer is collected with stats enabled
+            UIElement._counting_units += 1
+            self._stats_finalizer = weakref.finalize(self, _stop_counting_units)
+        return self._stats
+    
+    
+    def disable_stats(self) -> None:
+        self._stats = None
+        if self._stats_finalizer is not None:
+            self._stats_finalizer()
+            self._stats_finalizer = None
+        
+        
+    def start_recording(self) -> Recording:
+        """ Start capturing the mouse and wheel input, `dt` and resizes of every frame, to be saved and replayed headless with `pygment.core.recording.replay`. """
+        self._recording = Recording(self.size)
+        return self._recording
+    
+    
+    def stop_recording(self) -> Recording | None:
+        """ Stop capturing input and return the recording, or `None` if there was none in progress. """
+        recording, self._recording = self._recording, None
+        return recording
+    
+    
+    def get_element(self, key: str) -> LayoutNode:
+        """ Get a component of the layout by its name, or by its path of slash separated names starting at a layout root,
+            e.g. `"card/card_frame/card_image"`. A name shared by several components refers to the first one in tree order.
+            
+            Lookups go through an index of the layout, which is rebuilt on the first lookup after its structure has changed.
+            
+            Raises:
+                KeyError when no component matches the key
+        """
+        if self._names is None:
+            self._refresh_names()
+        found = self._paths.get(key) if "/" in key else self._names.get(key) # type: ignore
+        if found is None:
+            raise KeyError(f"element '{key}' is missing from the layout")
+        return found
+    
+    
+    def select(self, component_type: type[LayoutNode] | None = None, style_key: str | None = None) -> tuple[LayoutNode, ...]:
+        """ Get the components of the layout which are instances of a class and have a style attribute set, in tree order.
+        
+            The results are cached until the layout structure changes or the style attribute is changed on any component.
+        
+            Args:
+                component_type: the class to match, or None to match components of any class
+                style_key: the style attribute to match, or None to match components regardless of their style
+        """
+        key = (component_type, style_key)
+        found = self._selections.get(key)
+        if found is None:
+            self._refresh_index()
+            found = self._selections[key] = tuple(
+                node for node in self._nodes 
+                if (component_type is None or isinstance(node, component_type)) and (style_key is None or style_key in node.style)
+            )
+        return found
+    
+    
     @property
     def size(self) -> tuple[int, int]:
-        """ Get or set this renderer's surface size. """
+        """ Get or set this renderer's surface size. 
+        
+            Resizing only relayouts and repaints the nodes whose geometry depends on the surface size, through the `sw` 
+            and `sh` units, the `pw` and `ph` units of layout roots, or a dependent parent. The surface is a view of an
+            over-allocated backing surface, so that small size changes keep its pixels and only repaint the exposed strips.
+        """
         return self._surface.get_size()
     
     
     @size.setter
     def size(self, size: tuple[int, int]) -> None:
-        self._surface = pygame.surface.Surface(size).convert_alpha()
-        self._surface.fill((0,0,0,0))
+        self._pending_size = None
+        old_width, old_height = old_size = self.size
+        size = (size[0], size[1])
+        if size == old_size:
+            return
+        
+        if self._recording is not None:
+            self._recording.record_resize(size)
+        self._refresh_index()
+        dependents = self._dependents_of_surface()
+        backing = self._surface.get_parent()
+        self._surface = self._fit_surface(self._surface, size)
+        if self._scratch is not None:
+            self._scratch = self._fit_surface(self._scratch, size)
+            
+        for component in self._nodes: # in pre-order, so every parent is laid out before its children
+            if component in dependents:
+                component._geometry_size = None # invalidated one by one, as the independent children keep their geometry
+                self._on_geometry_change(component)
+                component._client_geometry(self._surface)
+            elif component._geometry_size == old_size: # evaluates the same for any surface size
+                component._geometry_size = size
+        
+        width, height = size
+        if self._surface.get_parent() is not backing: # the pixels weren't kept
+            self._surface.fill((0,0,0,0))
+            self._full_repaint = True
+        else:
+            if width > old_width:
+                self._exposed.append(pygame.Rect(old_width, 0, width - old_width, height))
+            if height > old_height:
+                self._exposed.append(pygame.Rect(0, old_height, width, height - old_height))
+                
+        for entries in (self._surface_caches, self._layers):
+            for component, entry in entries.items():
+                if entry is not None and (width > old_width and entry[1].right >= old_width or height > old_height and entry[1].bottom >= old_height):
+                    entries[component] = None # may have been cut off at the previous surface bounds
+            
         
-        self._dirty = set(self._layout)
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        """ Feed a pygame mouse event to this renderer.
+        
+            Handles `MOUSEMOTION`, `MOUSEBUTTONDOWN`, `MOUSEBUTTONUP` (left button), `MOUSEWHEEL`, `WINDOWLEAVE` and `VIDEORESIZE` events. 
+            Once this method has been called, `update` stops polling the mouse state and relies on the received events instead.
+            
+            Wheel events are offered to the components under the cursor, innermost first, until one of them scrolls.
+            `VIDEORESIZE` events resize the renderer on the next `update`, so a burst of them results in a single resize.
             
+            Mouse motion is coalesced and resolved on the next `update`. A button press and release arriving within the same 
+            frame are resolved as separate transitions, so quick clicks aren't lost.
+            
+            Args:
+                event: pygame `Event` object
+                
+            Returns:
+                `True` or `False` whether the event was consumed as an input event
+        """
+        self._event_driven = True
+        match event.type:
+            case pygame.MOUSEMOTION:
+                self._set_mouse_state(event.pos, self._mouse_pressed)
+            case pygame.MOUSEBUTTONDOWN | pygame.MOUSEBUTTONUP if event.button == pygame.BUTTON_LEFT:
+                self._set_mouse_state(event.pos, event.type == pygame.MOUSEBUTTONDOWN)
+            case pygame.WINDOWLEAVE:
+                self._set_mouse_state(None, self._mouse_pressed)
+            case pygame.MOUSEWHEEL:
+                x, y = getattr(event, "precise_x", event.x), getattr(event, "precise_y", event.y)
+                if self._recording is not None:
+                    self._recording.record_wheel(x, y)
+                self._dispatch_wheel(x, y)
+            case pygame.VIDEORESIZE:
+                self._pending_size = event.size
+            case _:
+                return False
+        return True
+        
         
     def update(self, dt: int) -> None:
-        """ Update the state of this renderer's layout by `dt` ticks. """
-        mouse_pos = pygame.mouse.get_pos()
-        lmb_pressed = pygame.mouse.get_pressed()[0]
+        """ Update the state of this renderer's layout by `dt` ticks. 
+        
+            Hover and click states are only resolved when the mouse input or the layout has changed, otherwise the
+            `on_mouse_over` and `on_mouse_down` callbacks are repeated for the hovered and pressed components.
+        """
+        if self._pending_size is not None:
+            self.size = self._pending_size
+        if not self._event_driven:
+            self._set_mouse_state(pygame.mouse.get_pos(), pygame.mouse.get_pressed()[0])
+        if self._recording is not None:
+            self._recording.record_frame(dt)
         
+        input_changed = self._input_changed
+        self._input_changed = self._press_pending = False
+        stats = self._stats
         for component in self._layout:
-            self._update_mouse_hover(component, mouse_pos)
-            self._update_mouse_click(component, lmb_pressed)
+            if stats is not None: start = time.perf_counter()
+            if input_changed or self._resolved_version.get(component) != self._layout_version:
+                self._resolve_input(component)
+            else:
+                self._tick_input(component)
+            if stats is not None: 
+                resolved = time.perf_counter()
+                stats.current.timings["input"] += resolved - start
                
-            if component.update(dt):
-                self._dirty.add(component)
+            if component.update(dt) and not self._has_dirty(component):
+                self._cascade_action(component, self._dirty.add) # the component didn't report what changed
+            if stats is not None: stats.current.timings["update"] += time.perf_counter() - resolved
             
         
     def render(self, dest_surface: pygame.surface.Surface, dest: tuple[int, int]) -> None:
         """ Render this renderer's contents to a desired `pygame.Surface` object.
         
+            Only the regions covered by the dirty nodes' previous and current rects are cleared and redrawn, 
+            replaying every node that intersects them in tree order, clipped to the region. The regions are tracked
+            on a persistent grid of `DIRTY_TILE_SIZE` tiles, so that sparse changes don't repaint the space between them. Subtrees with the
+            `cache_as_surface` style are rendered once into their own surface, which is then blitted in their place
+            until anything inside the subtree changes. Note that a cached subtree is alpha blended as a whole, so 
+            semi-transparent colors inside it blend with the content below instead of replacing it.
+            
+            Subtrees with the `layer` style are left out of the renderer surface. Each one is rendered into its own
+            surface, redrawn only when something inside it changes, and composited above the renderer surface in tree order.
+            Descendants of nodes with the `clip` style are drawn and hit-tested only within the node's rect.
+        
             Args:
                 dest_surface: the destination surface to render to
                 dest: the destination (x, y) cordinates 
         """
+        self._frame += 1
+        stats = self._stats
+        if stats is not None: start = time.perf_counter()
+        if self._display_format is None and pygame.display.get_surface() is not None:
+            self._convert_surfaces()
+        self._refresh_index()
+        if stats is not None: 
+            indexed = time.perf_counter()
+            stats.current.timings["index"] += indexed - start
+        
+        if self._full_repaint:
+            for view in self._scroll_views:
+                self._surface_caches[view] = None
+            self._repaint(self._surface.get_rect())
+            self._dirty.update(self._order)
+            self._exposed.clear()
+            if stats is not None:
+                columns, rows = self._tile_grid_size()
+                stats.current.counts["dirty_tiles"] += columns * rows
+                stats.current.counts["repainted_pixels"] += self._surface.get_width() * self._surface.get_height()
+        else:
+            for rect in self._damaged_regions():
+                self._repaint(rect)
+            
         for component in self._dirty:
-            self._surface.fill((0,0,0,0), component.client_rect(self._surface))
-            self._cascade_action(component, lambda component: component.render(self._surface))
+            self._painted[component] = self._index.rect_of(component)
             component._dirty = False
             
+        layers = sorted(self._layers, key=self._order.__getitem__)
+        entries = [self._retained_surface(self._layers, layer) for layer in layers]
+        if stats is not None:
+            painted = time.perf_counter()
+            stats.current.timings["paint"] += painted - indexed
+            stats.current.counts["dirty_nodes"] += len(self._dirty)
+            
+        self._full_repaint = False
         self._dirty.clear()
         dest_surface.blit(self._surface, dest)
+        for image, rect in entries:
+            dest_surface.blit(image, (dest[0] + rect.x, dest[1] + rect.y))
+            
+        if stats is not None:
+            stats.current.timings["blit"] += time.perf_counter() - painted
+            stats.current.counts["blits"] += 1 + len(entries)
+            stats.end_frame()
         
         
-    def _update_mouse_click(self, component: LayoutNode, mouse_pressed: bool) -> None:
-        was_pressed = component in self._pressed
-        is_pressed  =  mouse_pressed and component in self._hovered
-        if is_pressed: component.on_mouse_down()
-        
-        if was_pressed != is_pressed:
-            if is_pressed:
-                component.on_mouse_click()
-                self._pressed.add(component)
+    async def run(self, window: pygame.surface.Surface, fps: float = 60, background: Any = (0, 0, 0)) -> None:
+        """ Drive this renderer from the running asyncio event loop until the window is closed. 
+        
+            Every frame handles the pending pygame events, updates the layout, renders it to the window and flips the display,
+            then sleeps until the next frame is due, letting other tasks run. Frames which were missed aren't caught up on. 
+            Callbacks defined with `async def` are scheduled as tasks on the same loop, so they run between the frames.
+            The loop returns on a `QUIT` event, and can also be stopped by cancelling the task running it.
+            
+            Args:
+                window: the display surface
+                fps: the number of frames rendered per second
+                background: the color the window is cleared to before rendering, or `None` to draw over the previous frame
+        """
+        loop = asyncio.get_running_loop()
+        frame_time = 1 / fps
+        last = deadline = loop.time()
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+                self.handle_event(event)
+                
+            dt = round((loop.time() - last) * 1000)
+            last += dt / 1000 # keeps the rounded off remainder for the next frame
+            self.update(dt)
+            if background is not None:
+                window.fill(background)
+            self.render(window, (0, 0))
+            pygame.display.flip()
+            
+            deadline = max(deadline + frame_time, loop.time())
+            await asyncio.sleep(deadline - loop.time())
+            
+            
+    def _damaged_regions(self) -> list[pygame.Rect]:
+        """ Collect the regions to repaint, covering the tiles of the dirty tile grid touched by the previous and current rects
+            of all dirty nodes outside of layers and by the exposed regions.
+            
+            Dirty tiles are merged into rects, first the runs of adjacent tiles in a row and then equal runs of consecutive rows,
+            and every rect is trimmed to the bounds of the damage inside it. Large but sparse damage, like the rects of a moved
+            node far from its previous position, is then repainted only around the changed nodes instead of over their union.
+        """
+        bounds = self._surface.get_rect()
+        damage: list[pygame.Rect] = []
+        for rect in self._exposed:
+            damage.append(rect.clip(bounds))
+        self._exposed = []
+        for component in self._dirty:
+            if self._layers and self._enclosing(self._layers, self._order.get(component, -1)) is not None:
+                continue
+            if self._scroll_views:
+                self._collect_view_damage(component)
+            
+            for rect in (self._painted.get(component), self._index.rect_of(component)):
+                if rect is not None:
+                    damage.append(self._to_surface(component, rect).clip(bounds))
+        damage = [rect for rect in damage if rect.w and rect.h]
+        if not damage:
+            return []
+        
+        size = self.DIRTY_TILE_SIZE
+        columns, rows = self._tile_grid_size()
+        grid = self._tile_grid
+        if len(grid) != columns * rows:
+            grid = self._tile_grid = bytearray(columns * rows)
+        for rect in damage:
+            first, last = rect.left // size, (rect.right - 1) // size
+            for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                grid[row * columns + first:row * columns + last + 1] = b"\x01" * (last - first + 1)
+        
+        regions: list[pygame.Rect] = []
+        runs: dict[tuple[int, int], pygame.Rect] = {} # rects of the previous row's runs, extended while the next row has an equal run
+        for row in range(rows):
+            start, end = row * columns, (row + 1) * columns
+            row_runs = {}
+            first = grid.find(1, start, end)
+            while first != -1:
+                last = grid.find(0, first, end)
+                if last == -1:
+                    last = end
+                run = (first - start, last - start)
+                rect = runs.get(run)
+                if rect is None:
+                    rect = pygame.Rect(run[0] * size, row * size, (run[1] - run[0]) * size, size)
+                    regions.append(rect)
+                else:
+                    rect.h += size
+                row_runs[run] = rect
+                first = grid.find(1, last, end)
+            runs = row_runs
+            
+        if self._stats is not None:
+            self._stats.current.counts["dirty_tiles"] += len(grid) - grid.count(0)
+        grid[:] = bytes(len(grid))
+        
+        for i, rect in enumerate(regions):
+            inside = [damage[j] for j in rect.collidelistall(damage)]
+            regions[i] = inside[0].unionall(inside[1:]).clip(rect)
+            if self._stats is not None: self._stats.current.counts["repainted_pixels"] += regions[i].w * regions[i].h
+        return regions
+    
+    
+    def _tile_grid_size(self) -> tuple[int, int]:
+        """ Get the number of (columns, rows) of the dirty tile grid covering the surface. """
+        width, height = self.size
+        return -(-width // self.DIRTY_TILE_SIZE), -(-height // self.DIRTY_TILE_SIZE)
+    
+    
+    def _repaint(self, rect: pygame.Rect) -> None:
+        """ Clear a region of the surface and redraw every node intersecting it, clipped to the region. 
+        
+            With several render threads, regions spanning several tiles are painted tile by tile in parallel, see `_paint_tiles`.
+        """
+        operations = self._paint_operations(rect)
+        tiles = self._tiles(rect, operations) if self._render_threads > 1 else []
+        if len(tiles) > 1:
+            self._paint_tiles(tiles)
+            return
+        
+        self._surface.set_clip(rect)
+        self._surface.fill((0,0,0,0), rect)
+        self._paint(self._surface, rect, operations)
+        self._surface.set_clip(None)
+        
+        
+    def _paint_operations(self, rect: pygame.Rect) -> list[LayoutNode | _RetainedSurface]:
+        """ List what has to be drawn to repaint a region in painting order, either nodes or the retained surfaces of cached subtrees.
+        
+            Cached subtrees which have been invalidated are rendered again to their retained surface.
+        """
+        order = self._order
+        nodes = sorted(self._index.query_rect(rect), key=order.__getitem__)
+        if self._spaces: # the content of scroll views is drawn as a part of their retained surfaces
+            nodes = [node for node in nodes if node not in self._spaces]
+        if self._stats is not None:
+            self._stats.current.counts["clears"] += 1
+            self._stats.current.counts["nodes_visited"] += len(nodes)
+        
+        operations: list[LayoutNode | _RetainedSurface] = []
+        skip_until = -1
+        for component in nodes:
+            position = order[component]
+            if position < skip_until: # already drawn as a part of a cached subtree or belongs to a layer
+                continue
+            
+            layer = self._enclosing(self._layers, position)
+            if layer is not None:
+                skip_until = self._extent[layer]
+                continue
+            
+            cached = self._enclosing(self._surface_caches, position)
+            if cached is None and self._should_auto_cache(component):
+                self._surface_caches[component] = None
+                self._auto_cached.add(component)
+                self._root_intervals.clear()
+                cached = component
+                
+            if cached is None:
+                operations.append(component)
+            else:
+                operations.append(self._retained_surface(self._surface_caches, cached))
+                skip_until = self._extent[cached]
+                if self._stats is not None: self._stats.current.counts["blits"] += 1
+        return operations
+    
+    
+    def _paint(self, target: pygame.surface.Surface, region: pygame.Rect, operations: list[LayoutNode | _RetainedSurface]) -> None:
+        """ Draw paint operations on a target surface, which is clipped to the region. """
+        for operation in operations:
+            if isinstance(operation, tuple):
+                target.blit(*operation)
+            elif self._clip_roots:
+                self._render_clipped(operation, target, region)
+            else:
+                operation.render(target)
+                
+                
+    def _tiles(self, rect: pygame.Rect, operations: list[LayoutNode | _RetainedSurface]) -> list[tuple[pygame.Rect, list[LayoutNode | _RetainedSurface]]]:
+        """ Split a region into its parts covered by the tiles of a `TILE_SIZE` grid aligned to the surface origin,
+            each with the paint operations intersecting it, in painting order.
+        """
+        size = self.TILE_SIZE
+        left, top = rect.left // size, rect.top // size
+        columns, rows = (rect.right - 1) // size - left + 1, (rect.bottom - 1) // size - top + 1
+        tiles: list[tuple[pygame.Rect, list[LayoutNode | _RetainedSurface]]] = [
+            (pygame.Rect((left + i % columns) * size, (top + i // columns) * size, size, size).clip(rect), []) for i in range(columns * rows)
+        ]
+        for operation in operations:
+            bounds = operation[1] if isinstance(operation, tuple) else self._index.rect_of(operation)
+            bounds = bounds.clip(rect) if bounds is not None else None
+            if not bounds:
+                continue
+            
+            for row in range(bounds.top // size - top, (bounds.bottom - 1) // size - top + 1):
+                for column in range(bounds.left // size - left, (bounds.right - 1) // size - left + 1):
+                    tiles[row * columns + column][1].append(operation)
+        return tiles
+    
+    
+    def _paint_tiles(self, tiles: list[tuple[pygame.Rect, list[LayoutNode | _RetainedSurface]]]) -> None:
+        """ Repaint the tiles of a region on the render threads. 
+        
+            Every thread paints a contiguous run of tiles through its own view of the renderer surface, drawing only the
+            operations which intersect each tile, clipped to it. This gives the same pixels as painting the region at once,
+            as long as nodes don't draw outside of their rect. pygame releases the GIL in fills, scaling and blits, though
+            blits are serialized, see `_SharedSurface`.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self._render_threads, thread_name_prefix="pygment-render")
+            
+        count = min(self._render_threads, len(tiles))
+        futures = [
+            self._executor.submit(self._paint_tile_run, self._surface.subsurface(self._surface.get_rect()), tiles[i * len(tiles) // count:(i + 1) * len(tiles) // count])
+            for i in range(count)
+        ]
+        for future in futures:
+            future.result()
+        
+        
+    def _paint_tile_run(self, view: pygame.surface.Surface, tiles: list[tuple[pygame.Rect, list[LayoutNode | _RetainedSurface]]]) -> None:
+        for tile, operations in tiles:
+            view.set_clip(tile)
+            view.fill((0,0,0,0), tile)
+            self._paint(view, tile, operations)
+        
+        
+    def _fit_surface(self, surface: pygame.surface.Surface | None, size: tuple[int, int]) -> pygame.surface.Surface:
+        """ Get a surface of a given size, viewing the top-left corner of an over-allocated backing surface.
+        
+            The backing surface of a previous view is reused while it's large enough, and not more than four times too large.
+        """
+        width, height = size
+        backing = surface.get_parent() if surface is not None else None
+        if backing is None or width > backing.get_width() or height > backing.get_height() or 4 * width * height < backing.get_width() * backing.get_height():
+            backing = self._new_surface((max(1, math.ceil(width * self.RESIZE_MARGIN)), max(1, math.ceil(height * self.RESIZE_MARGIN))))
+        return backing.subsurface((0, 0, width, height))
+    
+    
+    def _new_surface(self, size: tuple[int, int]) -> pygame.surface.Surface:
+        """ Make a blank per-pixel alpha surface, in the display pixel format once a display mode has been set, see `_convert_surfaces`. """
+        surface_type = _SharedSurface if self._render_threads > 1 else pygame.surface.Surface
+        if self._display_format is None:
+            return surface_type(size, pygame.SRCALPHA)
+        return surface_type(size, pygame.SRCALPHA, self._display_format)
+    
+    
+    def _convert_surfaces(self) -> None:
+        """ Convert the renderer surfaces and retained surfaces to the display pixel format, for faster blitting.
+        
+            Conversion needs a display mode to be set, so it's deferred from construction to the first render after one is,
+            which keeps renderers usable headless. Pixels are kept as they are.
+        """
+        self._display_format = pygame.surface.Surface((1, 1)).convert_alpha()
+        for name in ("_surface", "_scratch"):
+            surface = getattr(self, name)
+            if surface is not None:
+                backing = self._new_surface(surface.get_parent().get_size())
+                backing.blit(surface.get_parent(), (0, 0), special_flags=pygame.BLEND_RGBA_MAX) # copies onto the blank pixels
+                setattr(self, name, backing.subsurface(surface.get_rect()))
+        for entries in (self._surface_caches, self._layers):
+            for component, entry in entries.items():
+                if entry is not None:
+                    entries[component] = (entry[0].convert_alpha(), entry[1])
+    
+    
+    def _dependents_of_surface(self) -> set[LayoutNode]:
+        """ Get the nodes whose geometry or clipping changes with the surface size. 
+        
+            A node depends on the surface size through its own `sw` and `sh` units, a parent which moves with it, 
+            parent relative units of a parent which resizes with it, or a clipping ancestor which depends on it.
+        """
+        if self._surface_dependents is None:
+            dependents = self._surface_dependents = set()
+            flags: dict[LayoutNode | None, tuple[bool, bool, bool]] = {None: (False, False, False)} # node -> moves, resizes, clipped
+            for component in self._nodes: # in pre-order, so parents are resolved first
+                parent = component.parent
+                parent_moves, parent_resizes, clipped = flags[parent]
+                moves, resizes = component._surface_dependence(parent_resizes)
+                moves = moves or parent_moves
+                clipped = clipped or parent in self._clip_roots and parent in dependents
+                flags[component] = (moves, resizes, clipped)
+                if moves or resizes or clipped:
+                    dependents.add(component)
+        return self._surface_dependents
+        
+        
+    def _enclosing(self, roots: dict[LayoutNode, Any], position: int) -> LayoutNode | None:
+        """ Get the outermost of the subtree roots containing the node at a given tree order position. 
+        
+            Subtrees are either nested or disjoint, so the outermost roots are kept as disjoint (start, end) intervals 
+            sorted by their start and searched with bisect.
+        """
+        intervals = self._root_intervals.get(id(roots))
+        if intervals is None:
+            starts: list[int] = []
+            ends: list[int] = []
+            outermost: list[LayoutNode] = []
+            for component in sorted((component for component in roots if component in self._order), key=self._order.__getitem__):
+                start = self._order[component]
+                if ends and start < ends[-1]: # nested in the previous outermost root
+                    continue
+                starts.append(start)
+                ends.append(self._extent[component])
+                outermost.append(component)
+            intervals = self._root_intervals[id(roots)] = (starts, ends, outermost)
+            
+        starts, ends, outermost = intervals
+        i = bisect.bisect_right(starts, position) - 1
+        return outermost[i] if i >= 0 and position < ends[i] else None
+    
+    
+    def _should_auto_cache(self, component: LayoutNode) -> bool:
+        return (
+            self.auto_cache 
+            and self._extent[component] - self._order[component] >= self.AUTO_CACHE_MIN_NODES
+            and self._frame - self._changed_frame.get(component, 0) >= self.AUTO_CACHE_FRAMES
+        )
+    
+    
+    def _retained_surface(self, entries: dict[LayoutNode, _RetainedSurface | None], component: LayoutNode) -> _RetainedSurface:
+        """ Get the retained surface of a cached subtree or a layer and the rect it covers, rendering it if it's been invalidated. 
+        
+            The subtree is drawn on a scratch surface of the renderer's size, so that its nodes lay out the same way
+            as on the renderer surface, and the covered area is copied out. Nested layers are left out.
+        """
+        entry = entries[component]
+        if entry is not None:
+            if component in self._scroll_views:
+                self._scroll_retained(component, entry)
+            return entry
+        
+        if component in self._scroll_views: # covers the whole viewport, as the content moves within it
+            self._scroll_views[component] = component.content_offset # type: ignore
+            self._view_damage.pop(component, None)
+            rect = self._surface_rect(component).clip(self._surface.get_rect())
+            nodes = self._view_nodes(component, rect)
+        else:
+            nodes = self._subtree_without_layers(component)
+            rects = [self._to_surface(node, rect) for node in nodes if (rect := self._index.rect_of(node))]
+            rect = rects[0].unionall(rects).clip(self._surface.get_rect()) if rects else pygame.Rect(0, 0, 0, 0)
+        if not rect:
+            entry = entries[component] = (pygame.surface.Surface((0, 0)), rect)
+            return entry
+        
+        self._render_region(nodes, rect)
+        entry = entries[component] = (self._scratch.subsurface(rect).copy(), rect) # type: ignore
+        return entry
+    
+    
+    def _render_region(self, nodes: list[LayoutNode], region: pygame.Rect) -> None:
+        """ Clear a region of the scratch surface and draw nodes on it, clipped to the region. """
+        if self._scratch is None:
+            self._scratch = self._fit_surface(None, self.size)
+        self._scratch.set_clip(region)
+        self._scratch.fill((0,0,0,0), region)
+        if self._stats is not None:
+            self._stats.current.counts["clears"] += 1
+            self._stats.current.counts["nodes_visited"] += len(nodes)
+        for node in nodes:
+            if node in self._spaces:
+                self._render_scrolled(node, self._scratch, region)
+            elif self._clip_roots:
+                self._render_clipped(node, self._scratch, region)
+            else:
+                node.render(self._scratch)
+        self._scratch.set_clip(None)
+        
+        
+    def _render_scrolled(self, component: LayoutNode, target: pygame.surface.Surface, region: pygame.Rect) -> None:
+        """ Draw a node laid out in the content space of a scroll view at its scrolled position, clipped to the scroll views containing it. 
+        
+            The node's cached geometry is moved by the scroll offset for as long as it's being rendered.
+        """
+        clip = region.clip(self._surface_rect(self._spaces[component]))
+        x, y = self._space_offset(component)
+        if self._clip_roots:
+            own = self._clip_rect(component)
+            if own is not None:
+                clip = clip.clip(own.move(-x, -y))
+        if not clip:
+            return
+        
+        geometry = component._client_geometry(target)
+        component._geometry = (geometry[0] - x, geometry[1] - y, geometry[2], geometry[3])
+        target.set_clip(clip)
+        try:
+            component.render(target)
+        finally:
+            component._geometry = geometry
+            target.set_clip(region)
+    
+    
+    def _scroll_retained(self, view: LayoutNode, entry: _RetainedSurface) -> None:
+        """ Bring a scroll view's retained surface up to date with its content.
+        
+            Scrolling shifts the existing pixels with `Surface.scroll`, leaving only the newly exposed strips to be drawn,
+            together with the regions damaged by changes inside the view.
+        """
+        image, rect = entry
+        damage = self._view_damage.pop(view, [])
+        (x, y), (new_x, new_y) = self._scroll_views[view], view.content_offset # type: ignore
+        dx, dy = new_x - x, new_y - y
+        if dx or dy:
+            self._scroll_views[view] = (new_x, new_y)
+            image.scroll(-dx, -dy)
+            if dx:
+                damage.append(pygame.Rect(rect.right - dx if dx > 0 else rect.x, rect.y, abs(dx), rect.h))
+            if dy:
+                damage.append(pygame.Rect(rect.x, rect.bottom - dy if dy > 0 else rect.y, rect.w, abs(dy)))
+            if self._stats is not None: self._stats.current.counts["blits"] += 1
+        
+        regions: list[pygame.Rect] = []
+        for region in damage:
+            region = region.clip(rect)
+            if region.w and region.h:
+                while (i := region.collidelist(regions)) != -1:
+                    region.union_ip(regions.pop(i))
+                regions.append(region)
+        
+        for region in regions:
+            self._render_region(self._view_nodes(view, region), region)
+            
+            target = region.move(-rect.x, -rect.y)
+            image.fill((0,0,0,0), target)
+            image.blit(self._scratch, target, region, special_flags=pygame.BLEND_RGBA_MAX) # type: ignore # copies onto the cleared pixels
+    
+    
+    def _view_nodes(self, view: LayoutNode, region: pygame.Rect) -> list[LayoutNode]:
+        """ List the nodes drawn in a region of a scroll view's retained surface in tree order, leaving out nested layers.
+        
+            These are the view itself and the nodes of its content intersecting the region, looked up in the content space
+            of the view and of every scroll view nested in it.
+        """
+        nodes = [view]
+        spaces = [view]
+        while spaces:
+            space = spaces.pop()
+            x, y = self._space_offset(space)
+            dx, dy = space.content_offset # type: ignore
+            content = [node for node in self._index.query_rect(region.move(x + dx, y + dy)) if self._spaces.get(node) is space]
+            nodes.extend(content)
+            spaces.extend(node for node in content if node in self._scroll_views)
+        
+        order = self._order
+        start, end = order[view], self._extent[view]
+        nested = [layer for layer in self._layers if start < order.get(layer, -1) < end]
+        if nested:
+            nodes = [node for node in nodes if not any(order[layer] <= order[node] < self._extent[layer] for layer in nested)]
+        nodes.sort(key=order.__getitem__)
+        return nodes
+    
+    
+    def _collect_view_damage(self, component: LayoutNode) -> None:
+        """ Add the previous and current rect of a changed node to the damage of the scroll views it's drawn in. """
+        position = self._order.get(component, -1)
+        for view in self._scroll_views:
+            if self._surface_caches.get(view) is None:
+                continue
+            if self._order.get(view, -1) < position < self._extent.get(view, -1):
+                damage = self._view_damage.setdefault(view, [])
+                for rect in (self._painted.get(component), self._index.rect_of(component)):
+                    if rect is not None:
+                        damage.append(self._to_surface(component, rect))
+    
+    
+    def _clip_rect(self, component: LayoutNode) -> pygame.Rect | None:
+        """ Get the intersection of the rects of a node's ancestors with the `clip` style, or `None` if it isn't clipped. 
+        
+            Only the ancestors laid out in the same content space are taken into account, the scroll views containing the
+            node clip it when it's translated to the surface, see `_to_surface`.
+        """
+        position = self._order.get(component, -1)
+        view = self._spaces.get(component)
+        floor = self._order.get(view, -1) if view is not None else -1
+        clip = None
+        for root in self._clip_roots:
+            if floor < self._order.get(root, -1) < position < self._extent.get(root, -1):
+                rect = root.client_rect(self._surface)
+                clip = rect if clip is None else clip.clip(rect)
+        return clip
+    
+    
+    def _hit_rect(self, component: LayoutNode) -> pygame.Rect:
+        """ Get the rect a node is indexed at, in its content space, cut down by its clipping ancestors. """
+        rect = component.client_rect(self._surface)
+        if self._clip_roots:
+            clip = self._clip_rect(component)
+            if clip is not None:
+                rect = rect.clip(clip)
+        return rect
+    
+    
+    def _space_offset(self, component: LayoutNode) -> tuple[int, int]:
+        """ Get the distance the content space of a node is scrolled by from the surface, summed over the scroll views containing it. """
+        x = y = 0
+        view = self._spaces.get(component)
+        while view is not None:
+            dx, dy = view.content_offset # type: ignore
+            x, y = x + dx, y + dy
+            view = self._spaces.get(view)
+        return x, y
+    
+    
+    def _to_surface(self, component: LayoutNode, rect: pygame.Rect) -> pygame.Rect:
+        """ Translate a rect from the content space of a node to the surface, cut down by the scroll views containing the node. """
+        view = self._spaces.get(component)
+        if view is None:
+            return rect
+        x, y = self._space_offset(component)
+        return rect.move(-x, -y).clip(self._surface_rect(view))
+    
+    
+    def _surface_rect(self, component: LayoutNode) -> pygame.Rect:
+        """ Get the rect a node is hit-tested and painted at on the surface. """
+        return self._to_surface(component, self._hit_rect(component))
+    
+    
+    def _nodes_at(self, point: tuple[int, int]) -> list[LayoutNode]:
+        """ Look up the nodes whose rect on the surface contains a point, translating the point into the content space 
+            of every scroll view it's inside of. 
+        """
+        nodes = self._index.query_point(point)
+        if not self._spaces:
+            return nodes
+        
+        nodes = [node for node in nodes if node not in self._spaces]
+        views = [node for node in nodes if node in self._scroll_views]
+        while views:
+            view = views.pop()
+            x, y = self._space_offset(view)
+            dx, dy = view.content_offset # type: ignore
+            content = [node for node in self._index.query_point((point[0] + x + dx, point[1] + y + dy)) if self._spaces.get(node) is view]
+            nodes.extend(content)
+            views.extend(node for node in content if node in self._scroll_views)
+        return nodes
+    
+    
+    def _render_clipped(self, component: LayoutNode, target: pygame.surface.Surface, region: pygame.Rect) -> None:
+        clip = self._clip_rect(component)
+        if clip is None:
+            component.render(target)
+            return
+        
+        target.set_clip(region.clip(clip))
+        component.render(target)
+        target.set_clip(region)
+    
+    
+    def _subtree_without_layers(self, component: LayoutNode) -> list[LayoutNode]:
+        """ List the nodes of a subtree in tree order, leaving out the subtrees of nested layers. """
+        start, end = self._order[component], self._extent[component]
+        nodes = self._nodes[start:end]
+        nested = [layer for layer in self._layers if start < self._order.get(layer, -1) < end]
+        if not nested:
+            return nodes
+        
+        order, extent = self._order, self._extent
+        return [node for node in nodes if not any(order[layer] <= order[node] < extent[layer] for layer in nested)]
+    
+    
+    def _invalidate_retained(self, component: LayoutNode, changed: bool = True) -> None:
+        """ Invalidate the retained surfaces of the cached subtrees and the layer containing a changed node. 
+        
+            Changes inside a layer don't affect anything outside of it, so the invalidation stops at the layer's root.
+            The surfaces of scroll views are kept unless the view itself has `changed`, as the regions damaged inside
+            them are redrawn in place.
+        """
+        node: LayoutNode | None = component
+        while node is not None:
+            self._changed_frame[node] = self._frame
+            if node in self._surface_caches:
+                if node in self._scroll_views and (node is not component or not changed):
+                    pass # the damaged regions are redrawn into the view's surface when it's rendered
+                elif node in self._auto_cached: # the subtree has to stay unchanged again to be cached
+                    self._auto_cached.remove(node)
+                    del self._surface_caches[node]
+                    self._root_intervals.clear()
+                else:
+                    self._surface_caches[node] = None
+                    
+            if node in self._layers:
+                self._layers[node] = None
+                return
+            node = node.parent
+            
+            
+    def _sync_retained(self, nodes: list[LayoutNode]) -> None:
+        """ Register the subtrees with the `cache_as_surface`, `layer` and `clip` styles and drop the ones which have left the layout. """
+        for entries in (self._surface_caches, self._layers):
+            for component in list(entries):
+                if component not in self._order:
+                    del entries[component]
+                    self._auto_cached.discard(component)
+        self._clip_roots.intersection_update(self._order)
+        for view in [view for view in self._scroll_views if view not in self._order]:
+            del self._scroll_views[view]
+            self._view_damage.pop(view, None)
+        for component in nodes:
+            self._sync_retained_styles(component)
+            
+            
+    def _sync_retained_styles(self, component: LayoutNode) -> None:
+        style = component.style.computed
+        if style.cache_as_surface or component.scrolls_content:
+            if component not in self._surface_caches:
+                self._surface_caches[component] = None
+                self._root_intervals.clear()
+            self._auto_cached.discard(component)
+            if component.scrolls_content:
+                self._scroll_views.setdefault(component, (0, 0))
+        elif component in self._surface_caches and component not in self._auto_cached:
+            del self._surface_caches[component]
+            self._root_intervals.clear()
+            
+        if style.clip != (component in self._clip_roots): # the descendants' rects change
+            if style.clip:
+                self._clip_roots.add(component)
+            else:
+                self._clip_roots.remove(component)
+            if component in self._order:
+                start, end = self._order[component], self._extent[component]
+                self._unindexed.update(self._nodes[start + 1:end])
+                self._drop_retained(start, end)
+            self._full_repaint = True
+            
+        if style.layer != (component in self._layers): # the subtree moves between the renderer surface and a layer
+            if style.layer:
+                self._layers[component] = None
+            else:
+                del self._layers[component]
+                if component.parent is not None: # the subtree is drawn into the surfaces above it again
+                    self._invalidate_retained(component.parent)
+            self._root_intervals.clear()
+            self._full_repaint = True
+        
+        
+    def _drop_retained(self, start: int, end: int) -> None:
+        """ Invalidate the retained surfaces of the cached subtrees and layers with their roots in a range of the paint order. """
+        order = self._order
+        for component in [component for component in self._surface_caches if start <= order.get(component, -1) < end]:
+            if component in self._auto_cached:
+                self._auto_cached.remove(component)
+                del self._surface_caches[component]
+                self._root_intervals.clear()
             else:
-                component.on_mouse_up()
-                self._pressed.remove(component)
+                self._surface_caches[component] = None
+        for component in self._layers:
+            if start <= order.get(component, -1) < end:
+                self._layers[component] = None
+
+
+    def _set_mouse_state(self, mouse_pos: tuple[int, int] | None, mouse_pressed: bool) -> None:
+        if self._recording is not None:
+            self._recording.record_input(mouse_pos, mouse_pressed)
+        if mouse_pressed != self._mouse_pressed:
+            if self._press_pending: # the previous button transition wasn't resolved yet
+                for component in self._layout:
+                    self._resolve_input(component)
+            self._press_pending = True
+            
+        if mouse_pos != self._mouse_pos or mouse_pressed != self._mouse_pressed:
+            self._mouse_pos = mouse_pos
+            self._mouse_pressed = mouse_pressed
+            self._input_changed = True
+            
+            
+    def _resolve_input(self, component: LayoutNode) -> None:
+        """ Run the full hover and click passes for a layout root's subtree. """
+        self._resolved_version[component] = self._layout_version
+        self._update_mouse_hover(component, self._mouse_pos)
+        self._update_mouse_click(component, self._mouse_pressed)
+        
+        
+    def _tick_input(self, component: LayoutNode) -> None:
+        """ Repeat the `on_mouse_over` and `on_mouse_down` callbacks of a layout root's subtree without resolving input. """
+        start, end = self._order[component], self._extent[component]
+        order = self._order
+        for active, callback in ((self._hovered, "on_mouse_over"), (self._pressed, "on_mouse_down")):
+            if active:
+                nodes = [node for node in active if start <= order.get(node, -1) < end]
+                nodes.sort(key=order.__getitem__)
+                if self._stats is not None: self._stats.current.counts["nodes_visited"] += len(nodes)
+                for node in nodes:
+                    getattr(node, callback)()
+            
+            
+    def _update_mouse_click(self, component: LayoutNode, mouse_pressed: bool) -> None:
+        """ Resolve mouse button callbacks for a layout root's subtree. 
+        
+            Only hovered or previously pressed nodes can change their state, so only those are visited, in tree order.
+        """
+        self._refresh_index()
+        start, end = self._order[component], self._extent[component]
+        order = self._order
+        candidates = [node for node in self._hovered | self._pressed if start <= order.get(node, -1) < end]
+        candidates.sort(key=order.__getitem__)
+        if self._stats is not None: self._stats.current.counts["nodes_visited"] += len(candidates)
+        
+        for node in candidates:
+            was_pressed = node in self._pressed
+            is_pressed  =  mouse_pressed and node in self._hovered
+            if is_pressed: node.on_mouse_down()
+            
+            if was_pressed != is_pressed:
+                if is_pressed:
+                    node.on_mouse_click()
+                    self._pressed.add(node)
+                else:
+                    node.on_mouse_up()
+                    self._pressed.remove(node)
         
-        for child in component.children:
-            self._update_mouse_click(child, mouse_pressed)
         
+    def _update_mouse_hover(self, component: LayoutNode, mouse_pos: tuple[int, int] | None) -> None:
+        """ Resolve mouse hover callbacks for a layout root's subtree. 
         
-    def _update_mouse_hover(self, component: LayoutNode, mouse_pos: tuple[int, int]) -> None:
-        was_hover = component in self._hovered
-        is_hover  = component.client_rect(self._surface).collidepoint(mouse_pos)
-        if is_hover: component.on_mouse_over()
+            Only the nodes under the cursor, looked up in the spatial index, and the previously hovered nodes are visited,
+            in tree order. When a callback changes the layout, the index is refreshed and the lookup repeated for the nodes
+            that weren't visited yet, so the result is the same as testing every node of the subtree one after another.
+        """
+        self._refresh_index()
+        start, end = self._order[component], self._extent[component]
+        order = self._order
         
-        if was_hover != is_hover:
-            if is_hover: 
-                component.on_mouse_enter()
-                self._hovered.add(component)
-            else: 
-                component.on_mouse_leave()
-                self._hovered.remove(component)
+        def collect(after: int) -> list[tuple[int, int, LayoutNode]]:
+            candidates = set(self._nodes_at(mouse_pos)) | self._hovered if mouse_pos is not None else self._hovered
+            return [(order[node], id(node), node) for node in candidates if after < order.get(node, -1) < end]
         
-        for child in component.children:
-            self._update_mouse_hover(child, mouse_pos)
+        visited: set[LayoutNode] = set()
+        queue = collect(start - 1)
+        heapq.heapify(queue)
+        while queue:
+            position, _, node = heapq.heappop(queue)
+            if node in visited: 
+                continue
+            visited.add(node)
             
+            was_hover = node in self._hovered
+            is_hover  = mouse_pos is not None and self._surface_rect(node).collidepoint(mouse_pos)
+            if is_hover: node.on_mouse_over()
             
-    def _get_element_by_id(self, name: str) -> UIElement: # TODO: exctract to Body object
-        def _recget(component: LayoutNode) -> UIElement | None:
-            if component.name == name: return component
+            if was_hover != is_hover:
+                if is_hover: 
+                    node.on_mouse_enter()
+                    self._hovered.add(node)
+                else: 
+                    node.on_mouse_leave()
+                    self._hovered.remove(node)
+                    
+            if self._unindexed or self._structure_changed: # a callback has modified the layout
+                self._refresh_index()
+                start, end = self._order[component], self._extent[component]
+                for entry in collect(order[node]):
+                    if entry[2] not in visited:
+                        heapq.heappush(queue, entry)
+        if self._stats is not None: self._stats.current.counts["nodes_visited"] += len(visited)
+            
+            
+    def _on_scroll(self, view: LayoutNode) -> None:
+        """ Move the content of a scroll view whose content offset has changed. 
+        
+            The content keeps its geometry and its place in the spatial index, as it's laid out in the view's content space.
+            Only the view is repainted. Its retained surface is kept, to be shifted by the scroll distance when it's rendered next,
+            while the layers inside it are drawn again at their new position.
+        """
+        self._dirty.add(view)
+        self._invalidate_retained(view, changed=False)
+        start, end = self._order.get(view, -1), self._extent.get(view, -1)
+        for layer in self._layers:
+            if start < self._order.get(layer, -1) < end:
+                self._layers[layer] = None
+        self._layout_version += 1
+            
+            
+    def _dispatch_wheel(self, x: float, y: float) -> None:
+        if self._mouse_pos is None:
+            return
+        
+        self._refresh_index()
+        for node in sorted(self._nodes_at(self._mouse_pos), key=self._order.__getitem__, reverse=True):
+            if node.handle_wheel(x, y):
+                return
+        
+        
+    def _release_input(self, component: LayoutNode) -> None:
+        """ Reset the input state of a node which is about to represent a different item, e.g. a recycled list row.
+        
+            The node gets its `on_mouse_up` and `on_mouse_leave` callbacks while still bound to its old item, and is
+            entered again, as the new item, on the next input resolution.
+        """
+        if component in self._pressed:
+            self._pressed.remove(component)
+            component.on_mouse_up()
+        if component in self._hovered:
+            self._hovered.remove(component)
+            component.on_mouse_leave()
+        self._layout_version += 1
+        
+        
+    def _on_dirty(self, component: LayoutNode) -> None:
+        self._surface_dependents = None # its units may have changed
+        self._dirty.add(component)
+        self._invalidate_retained(component)
+        self._sync_retained_styles(component)
+        
+        
+    def _on_geometry_change(self, component: LayoutNode) -> None:
+        self._invalidate_retained(component)
+        self._unindexed.add(component)
+        self._dirty.add(component)
+        self._layout_version += 1
+        
+        
+    def _on_structure_change(self, component: LayoutNode) -> None:
+        self._structure_changed = True
+        self._surface_dependents = None
+        self._names = None
+        self._selections.clear()
+        self._invalidate_retained(component)
+        self._layout_version += 1
+        
+        
+    def _on_style_change(self, component: LayoutNode, key: str) -> None:
+        if self._selections:
+            for selection in [selection for selection in self._selections if selection[1] == key]:
+                del self._selections[selection]
+                
+                
+    def _has_dirty(self, component: LayoutNode) -> bool:
+        """ Check whether any node of a layout root's subtree is marked for repainting. """
+        start, end = self._order[component], self._extent[component]
+        return any(start <= self._order.get(node, -1) < end for node in self._dirty)
+        
+        
+    def _refresh_index(self) -> None:
+        """ Bring the spatial index and tree ordering up to date with the layout. """
+        if self._structure_changed:
+            self._structure_changed = False
+            self._order.clear()
+            self._extent.clear()
+            self._index.clear()
+            self._unindexed.clear()
             
-            for child in component:
-                return _recget(child)
+            nodes = self._nodes = []
+            stack = list(reversed(self._layout))
+            while stack:
+                node = stack.pop()
+                self._order[node] = len(nodes)
+                nodes.append(node)
+                self._unindexed.add(node)
+                if node._dirty:
+                    self._dirty.add(node)
+                stack.extend(reversed(node.children))
+                
+            for node in reversed(nodes): # a subtree ends where the subtree of its last child does
+                children = node.children
+                self._extent[node] = self._extent[children[-1]] if children else self._order[node] + 1
+                
+            self._sync_retained(nodes)
+            self._root_intervals.clear()
+            spaces = self._spaces = {}
+            if self._scroll_views:
+                for node in nodes: # in pre-order, so every parent is assigned first
+                    parent = node.parent
+                    if parent in self._scroll_views:
+                        spaces[node] = parent
+                    elif parent in spaces:
+                        spaces[node] = spaces[parent]
+        
+        if self._unindexed:
+            for node in self._unindexed:
+                self._index.update(node, self._hit_rect(node))
+            self._unindexed.clear()
             
-        for element in self._layout:
-            out = _recget(element)
-            if out: return out
             
-        raise KeyError(f"element with name {name} is missing from view body")
+    def _refresh_names(self) -> None:
+        """ Rebuild the name and path index of the layout. """
+        self._refresh_index()
+        names: dict[str, LayoutNode] = {}
+        paths: dict[str, LayoutNode] = {}
+        path_of: dict[LayoutNode, str] = {}
+        for node in self._nodes: # in pre-order, so parents get their paths first
+            parent_path = path_of.get(node.parent) # type: ignore
+            path = path_of[node] = node.name if parent_path is None else f"{parent_path}/{node.name}"
+            names.setdefault(node.name, node)
+            paths.setdefault(path, node)
+        self._names, self._paths = names, paths
     
     
     @classmethod
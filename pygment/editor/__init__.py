@@ -1 +1,17 @@
-from .style import Style
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from pygment.core import lazy_exports
+
+if TYPE_CHECKING:
+    from pygment.editor.style import Style
+    from pygment.editor.schema import StyleSchema, StyleField, ColorField, NumberField
+
+# `Style` alone doesn't depend on pygame, the schema classes are imported on first access
+__all__ = ["Style", "StyleSchema", "StyleField", "ColorField", "NumberField"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "Style": "pygment.editor.style",
+    "StyleSchema": "pygment.editor.schema",
+    "StyleField": "pygment.editor.schema",
+    "ColorField": "pygment.editor.schema",
+    "NumberField": "pygment.editor.schema",
+})
@@ -0,0 +1,125 @@
+from __future__ import annotations
+from typing import Any
+
+import pygame
+
+from pygment.editor.style import compile_type_check
+
+
+__all__ = ["StyleField", "ColorField", "NumberField", "StyleSchema", "ComputedStyle"]
+
+
+class StyleField:
+    """ Declaration of a typed style attribute.
+
+        Values assigned to the attribute are type checked once, when they're set, and then passed through `normalize`.
+    """
+    __slots__ = ("type_spec", "default", "_check")
+    def __init__(self, type_spec: Any, default: Any):
+        self.type_spec = type_spec
+        self.default = default
+        self._check = compile_type_check(type_spec)
+
+
+    def validate(self, key: str, value: Any) -> Any:
+        """ Check a value against this field's type and return its normalized form.
+
+            Raises:
+                TypeError when the value doesn't match the field's type specifier
+        """
+        if not self._check(value):
+            raise TypeError(f"key '{key}' type expected to be '{self.type_spec}', got '{value}' of type '{type(value)}' instead")
+        return self.normalize(value)
+
+
+    def normalize(self, value: Any) -> Any:
+        return value
+
+
+
+
+class ColorField(StyleField):
+    """ Style attribute holding a color value. Color names are resolved to RGBA tuples. """
+    __slots__ = ()
+    def __init__(self, default: Any, optional: bool = False):
+        from pygment.editor.type import _ColorValue
+        super().__init__(_ColorValue | None if optional else _ColorValue, default)
+
+
+    def normalize(self, value: Any) -> Any:
+        if isinstance(value, str):
+            try:
+                return tuple(pygame.Color(value))
+            except ValueError:
+                raise ValueError(f"invalid color name '{value}'")
+        return value
+
+
+
+
+class NumberField(StyleField):
+    """ Numeric style attribute, optionally clamped to a range and rounded to an integer. """
+    __slots__ = ("minimum", "maximum", "integer")
+    def __init__(self, default: float, minimum: float | None = None, maximum: float | None = None, integer: bool = False):
+        super().__init__(int | float, default)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.integer = integer
+
+
+    def normalize(self, value: float) -> float:
+        if self.minimum is not None:
+            value = max(value, self.minimum)
+        if self.maximum is not None:
+            value = min(value, self.maximum)
+        return round(value) if self.integer else value
+
+
+
+
+class ComputedStyle:
+    """ Plain attribute view of a style's validated values.
+
+        Every schema has its own subclass with a slot for each field, which new instances fill with the field defaults.
+    """
+    __slots__ = ()
+
+
+
+
+class StyleSchema:
+    """ Collection of typed style fields declared by a component class. """
+    def __init__(self, **fields: StyleField):
+        self._fields = fields
+        self._defaults = tuple((key, field.default) for key, field in fields.items())
+        self._computed_type = type("ComputedStyle", (ComputedStyle,), {"__slots__": tuple(fields)})
+
+
+    @property
+    def fields(self) -> dict[str, StyleField]:
+        return self._fields
+
+
+    def extend(self, **fields: StyleField) -> StyleSchema:
+        """ Create a new schema with additional fields, overriding the fields with the same names. """
+        return StyleSchema(**(self._fields | fields))
+
+
+    def new_computed(self, base: ComputedStyle | None = None) -> ComputedStyle:
+        """ Create a computed style object holding the default values, or a copy of the values of another computed style of this schema. """
+        computed = self._computed_type()
+        if base is None:
+            for key, default in self._defaults:
+                setattr(computed, key, default)
+        else:
+            for key in self._fields:
+                setattr(computed, key, getattr(base, key))
+        return computed
+
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._fields
+
+
+    def __getitem__(self, key: str) -> StyleField:
+        return self._fields[key]
@@ -1,4 +1,11 @@
-from typing import Any, TypeVar, Union, Type, no_type_check
+from __future__ import annotations
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Mapping, TypeVar, Union, Type, no_type_check
+import functools
+import weakref
+
+if TYPE_CHECKING:
+    from pygment.editor.schema import ComputedStyle, StyleSchema
 
 
 __all__ = ["Style"]
@@ -51,18 +58,223 @@ def isinstance_generic(val: Any, type_spec: _UnionType | tuple[Type, ...]) -> bo
             return True  
     return True
         
+
+
+
+@no_type_check
+@functools.lru_cache(maxsize=None)
+def compile_type_check(type_spec: _UnionType | tuple[Type, ...]) -> Callable[[Any], bool]:
+    """ Build a predicate performing the same generic type checking as `isinstance_generic` for a given type specifier. 
+    
+        The type specifier is analysed once and the resulting predicates are cached, so checking a value doesn't 
+        involve any exception handling or type introspection.
+    """
+    if isinstance(type_spec, tuple):
+        type_spec = Union[type_spec]
+        
+    try:
+        isinstance(None, type_spec)
+        return lambda val: isinstance(val, type_spec)
+    except TypeError: # parametrized generics
+        pass
+    
+    if isinstance(type_spec, _GenericAlias):
+        origin, args = type_spec.__origin__, type_spec.__args__
+        if origin is list:
+            check = compile_type_check(args[0])
+            return lambda val: type(val) is list and all(check(v) for v in val)
+        if origin is tuple:
+            if len(args) == 2 and args[1] is Ellipsis:
+                check = compile_type_check(args[0])
+                return lambda val: type(val) is tuple and all(check(v) for v in val)
+            checks = tuple(compile_type_check(a) for a in args)
+            return lambda val: type(val) is tuple and len(val) == len(checks) and all(c(v) for c, v in zip(checks, val))
+        return lambda val: isinstance(val, origin)
+    
+    if isinstance(type_spec, _UnionType):
+        nongenerics = tuple(t for t in type_spec.__args__ if type(t) is not _GenericAlias)
+        checks = tuple(compile_type_check(t) for t in type_spec.__args__ if type(t) is _GenericAlias)
+        return lambda val: isinstance(val, nongenerics) or any(c(val) for c in checks)
+    
+    return lambda val: True
+        
         
         
         
 _VT = TypeVar("_VT", bound=Any)
 class Style(dict[str, Any]):
-    def __init__(self, obj: dict[str, Any] = {}, **kwargs: Any):
-        super().__init__(obj | kwargs)
-        self.__dict__["_changes"] = {}
-        self._changes: dict[str, Any]
+    """ Dictionary based class for defining component visual style. 
+    
+        A style can be bound to a `StyleSchema`, in which case the values of the declared fields are validated and normalized
+        as they're assigned, and are readable as plain attributes of the `computed` object, defaults included.
+        
+        A style can also inherit the values of style classes, shared styles referenced by many others. The classes are applied
+        in order, the later ones taking precedence, and are overridden by the style's own local values. The dictionary holds 
+        just the local values, while attribute access and `computed` include the inherited ones. A change to a class reaches
+        only the styles using it, and is validated once for all of them bound to the same schema.
+    """
+    __slots__ = ("_changes", "_listeners", "_schema", "_computed", "_binding", "_dependents", "__weakref__")
+    NO_CHANGES: Mapping[str, Any] = MappingProxyType({}) # shared by all styles without pending changes
+    
+    
+    def __init__(self, obj: dict[str, Any] = {}, *, schema: StyleSchema | None = None, classes: Iterable[Style] = (), **kwargs: Any):
+        items = obj | kwargs
+        if schema is not None:
+            items = {key: schema[key].validate(key, value) if key in schema else value for key, value in items.items()}
+            
+        super().__init__(items)
+        self._changes: Mapping[str, Any]
+        self._listeners: tuple[tuple[weakref.ReferenceType[Any], Callable[[Any, str], None]], ...] # (owner, function) pairs
+        self._schema: StyleSchema | None
+        self._computed: ComputedStyle | None
+        self._binding: _ClassBinding | None
+        self._dependents: tuple[weakref.ReferenceType[_ClassBinding], ...] # bindings of the styles using this style as a class
+        self._bind(schema, tuple(classes))
+    
+    
+    @classmethod
+    def validated(cls, obj: dict[str, Any], schema: StyleSchema, classes: Iterable[Style] = ()) -> Style:
+        """ Make a style bound to a schema from values which have already been validated against it, skipping the validation. 
+        
+            Meant for values which come out of another style bound to the same schema, e.g. restored from a layout snapshot.
+            The values inherited from the classes are validated as usual.
+        """
+        style = cls.__new__(cls)
+        dict.__init__(style, obj)
+        style._bind(schema, tuple(classes))
+        return style
+    
+    
+    def _bind(self, schema: StyleSchema | None, classes: tuple[Style, ...]) -> None:
+        object.__setattr__(self, "_changes", Style.NO_CHANGES)
+        object.__setattr__(self, "_listeners", ())
+        object.__setattr__(self, "_schema", schema)
+        object.__setattr__(self, "_dependents", ())
+        object.__setattr__(self, "_binding", _ClassBinding.get(schema, classes) if classes else None)
+        if self._binding is not None:
+            self._binding.add(self)
+        object.__setattr__(self, "_computed", self._compute())
+    
+    
+    def _compute(self) -> ComputedStyle | None:
+        """ Make the computed style of the inherited and local values, sharing the one of the binding when nothing is overridden. """
+        schema, binding = self._schema, self._binding
+        if schema is None:
+            return None
+        local = [(key, value) for key, value in self.items() if key in schema]
+        if binding is not None and not local:
+            return binding.computed
+        
+        computed = schema.new_computed(binding.computed if binding is not None else None)
+        for key, value in local:
+            setattr(computed, key, value)
+        return computed
+    
+    
+    def _own_computed(self) -> ComputedStyle:
+        """ Get the computed style for a local change, copying it first if it's shared with the binding. """
+        if self._binding is not None and self._computed is self._binding.computed:
+            object.__setattr__(self, "_computed", self._schema.new_computed(self._computed)) # type: ignore
+        return self._computed # type: ignore
+    
+    
+    @property
+    def schema(self) -> StyleSchema | None:
+        return self._schema
+    
+    
+    @property
+    def computed(self) -> ComputedStyle:
+        """ Get the validated values of the schema fields as plain attributes. 
+        
+            Raises:
+                AttributeError when the style isn't bound to a schema
+        """
+        if self._computed is None:
+            raise AttributeError("style is not bound to a schema")
+        return self._computed
+    
+    
+    @property
+    def classes(self) -> tuple[Style, ...]:
+        """ Get the style classes this style inherits from, in the order of precedence. """
+        return self._binding.classes if self._binding is not None else ()
+    
+    
+    def add_class(self, style_class: Style) -> None:
+        """ Inherit the values of a style class, taking precedence over the classes added before it. 
+        
+            Raises:
+                ValueError when the class is already used by this style or inherits from it
+                TypeError when an inherited value doesn't match its schema field type
+        """
+        if any(c is style_class for c in self.classes) or style_class is self or style_class._inherits_from(self):
+            raise ValueError("style class is already used by the style or inherits from it")
+        self._set_classes((*self.classes, style_class))
+        
+        
+    def remove_class(self, style_class: Style) -> None:
+        """ Stop inheriting the values of a style class.
+        
+            Raises:
+                ValueError when the class isn't used by this style
+        """
+        if not any(c is style_class for c in self.classes):
+            raise ValueError("style class is not used by the style")
+        self._set_classes(tuple(c for c in self.classes if c is not style_class))
+        
+        
+    def _set_classes(self, classes: tuple[Style, ...]) -> None:
+        old = self._binding
+        new = _ClassBinding.get(self._schema, classes) if classes else None
+        keys = {key for binding in (old, new) if binding is not None for key in binding.values if key not in self}
+        previous = {key: self._inherited(key) for key in keys}
+        
+        if old is not None:
+            old.remove(self)
+        if new is not None:
+            new.add(self)
+        object.__setattr__(self, "_binding", new)
+        object.__setattr__(self, "_computed", self._compute())
+        for key, prev in previous.items():
+            if self._inherited(key) != prev:
+                self._on_change(key, prev)
+                
+                
+    def _inherits_from(self, style: Style) -> bool:
+        return any(c is style or c._inherits_from(style) for c in self.classes)
+    
+    
+    def _inherited(self, key: str) -> Any:
+        """ Get the value a key has without a local value, `None` when it isn't set by any class nor the schema. """
+        if self._schema is not None and key in self._schema:
+            return getattr(self._computed, key)
+        return self._binding.values.get(key) if self._binding is not None else None
+    
+    
+    def _inherit(self, key: str, prev: Any) -> None:
+        """ Apply a change of an inherited value, already made to the computed style of the binding. """
+        if key in self:
+            return # overridden locally
+        binding = self._binding
+        if self._schema is not None and key in self._schema and self._computed is not binding.computed: # type: ignore
+            setattr(self._computed, key, getattr(binding.computed, key)) # type: ignore
+        self._on_change(key, prev)
+    
+    
+    def resolved(self) -> dict[str, Any]:
+        """ Get a plain dictionary of the values inherited from the classes overridden by the local values.
+
+            The values of the schema fields are the validated ones, like the local values of a style bound to a schema.
+        """
+        if self._binding is None:
+            return dict(self)
+        values = self._binding.values | self
+        if self._schema is not None:
+            values.update((key, getattr(self._computed, key)) for key in values if key in self._schema)
+        return values
     
     
-    """ Dictionary based class for defining component visual style. """
     def get(self, key: str, /, default: _VT, expected_type: type[_VT]) -> _VT:
         """ Return the value for key if key is in the dictionary, else default. 
         
@@ -78,31 +290,162 @@ class Style(dict[str, Any]):
                 TypeError when the retrieved value doesn't match against the expected_type parameter 
         """
         attr = super().get(key, default)
-        if not isinstance_generic(attr, expected_type):
+        if not compile_type_check(expected_type)(attr):
             raise TypeError(f"key '{key}' type expected to be '{expected_type}', got '{attr}' of type '{type(attr)}' instead")
         return attr
     
     
     def poll_changes(self) -> dict[str, Any]:
         """ Returns names of style attribute changes that were made from when this method was last called. """
-        changes = self._changes.copy()
-        self._changes.clear()
-        return changes
+        changes = self._changes
+        if changes is Style.NO_CHANGES:
+            return {}
+        object.__setattr__(self, "_changes", Style.NO_CHANGES)
+        return changes # type: ignore
+    
+    
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """ Register a bound method to be called with the key name whenever a style attribute changes its value. 
+        
+            Listeners are held by weak references, so subscribing doesn't keep the listener's owner alive.
+        """
+        listener = (weakref.ref(callback.__self__), callback.__func__) # type: ignore
+        object.__setattr__(self, "_listeners", (*self._listeners, listener))
     
     
     def __getattr__(self, key: str) -> Any:
+        if key not in self:
+            if self._schema is not None and key in self._schema:
+                return getattr(self._computed, key)
+            if self._binding is not None and key in self._binding.values:
+                return self._binding.values[key]
         return self.__getitem__(key)
     
     
     def __setattr__(self, key: str, value: Any) -> None:
-        if key in dir(self):
+        if hasattr(type(self), key):
             raise AttributeError(f"attribute '{key}' is read-only")
         self.__setitem__(key, value)
     
     
     def __setitem__(self, key: str, value: Any) -> None:
+        schema = self._schema
+        if schema is not None and key in schema:
+            value = schema[key].validate(key, value)
+            setattr(self._own_computed(), key, value)
+            
         prev = super().get(key)
-        if value != prev:
-            self._changes[key] = prev
         super().__setitem__(key, value)
-    
\ No newline at end of file
+        if value != prev:
+            self._on_change(key, prev)
+                    
+                    
+    def __delitem__(self, key: str) -> None:
+        prev = super().pop(key)
+        if self._schema is not None and key in self._schema:
+            inherited = self._binding.computed if self._binding is not None else None
+            setattr(self._own_computed(), key, getattr(inherited, key) if inherited is not None else self._schema[key].default)
+        self._on_change(key, prev)
+        
+        
+    def update(self, *args: Any, **kwargs: Any) -> None: # type: ignore
+        for key, value in dict(*args, **kwargs).items():
+            self.__setitem__(key, value)
+            
+            
+    def _on_change(self, key: str, prev: Any) -> None:
+        if self._changes is Style.NO_CHANGES:
+            object.__setattr__(self, "_changes", {})
+        self._changes[key] = prev # type: ignore
+        for owner_ref, function in self._listeners:
+            owner = owner_ref()
+            if owner is not None:
+                function(owner, key)
+        for binding_ref in self._dependents:
+            binding = binding_ref()
+            if binding is not None:
+                binding.refresh(key)
+                
+                
+    def _add_dependent(self, binding: _ClassBinding) -> None:
+        dependents = tuple(ref for ref in self._dependents if ref() is not None)
+        object.__setattr__(self, "_dependents", (*dependents, weakref.ref(binding)))
+                
+                
+                
+                
+class _ClassBinding:
+    """ Values inherited from a sequence of style classes, shared by all the styles bound to the same schema and classes.
+    
+        The inherited values are validated once for the binding, and its computed style is shared by the styles which don't
+        override any schema field. Bindings are referenced by their styles and dropped with the last of them.
+    """
+    __slots__ = ("schema", "classes", "values", "computed", "_styles", "__weakref__")
+    _bindings: weakref.WeakValueDictionary[tuple[int, ...], _ClassBinding] = weakref.WeakValueDictionary() # by schema and class ids
+    
+    
+    def __init__(self, schema: StyleSchema | None, classes: tuple[Style, ...]):
+        self.schema = schema
+        self.classes = classes # referenced to keep the ids in the binding key valid
+        self.values: dict[str, Any] = {}
+        for style_class in classes:
+            self.values.update(style_class.resolved())
+        self.computed = schema.new_computed() if schema is not None else None
+        if schema is not None:
+            for key, value in self.values.items():
+                if key in schema:
+                    setattr(self.computed, key, schema[key].validate(key, value))
+        self._styles: list[weakref.ReferenceType[Style]] = []
+        for style_class in classes:
+            style_class._add_dependent(self)
+            
+            
+    @classmethod
+    def get(cls, schema: StyleSchema | None, classes: tuple[Style, ...]) -> _ClassBinding:
+        key = (id(schema), *map(id, classes))
+        binding = cls._bindings.get(key)
+        if binding is None:
+            binding = cls._bindings[key] = cls(schema, classes)
+        return binding
+    
+    
+    def add(self, style: Style) -> None:
+        styles = self._styles
+        if len(styles) & (len(styles) - 1) == 0 and styles: # drop the dead references whenever the list doubles
+            styles[:] = [ref for ref in styles if ref() is not None]
+        styles.append(weakref.ref(style))
+        
+        
+    def remove(self, style: Style) -> None:
+        alive = ((ref, ref()) for ref in self._styles)
+        self._styles = [ref for ref, other in alive if other is not None and other is not style]
+        
+        
+    def refresh(self, key: str) -> None:
+        """ Recompute an inherited value after it changed in one of the classes and pass the change on to the styles. """
+        found, value = False, None
+        for style_class in reversed(self.classes):
+            if key in style_class:
+                found, value = True, style_class[key]
+                break
+            binding = style_class._binding
+            if binding is not None and key in binding.values:
+                found, value = True, binding.values[key]
+                break
+        if found == (key in self.values) and value == self.values.get(key):
+            return # overridden by a class with higher precedence
+        
+        schema, prev = self.schema, self.values.get(key)
+        if schema is not None and key in schema:
+            prev = getattr(self.computed, key)
+            setattr(self.computed, key, schema[key].validate(key, value) if found else schema[key].default)
+        if found:
+            self.values[key] = value
+        else:
+            del self.values[key]
+            
+        self._styles = [ref for ref in self._styles if ref() is not None]
+        for ref in self._styles:
+            style = ref()
+            if style is not None:
+                style._inherit(key, prev)
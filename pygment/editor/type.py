@@ -1,7 +1,9 @@
 from __future__ import annotations
+from typing import TYPE_CHECKING
 
-import pygment.editor.unit 
+if TYPE_CHECKING: # the size units import the components, which import these types
+    from pygment.editor.unit import SizeUnitType
 
         
-_UnitRect = tuple[float | str | pygment.editor.unit.SizeUnitType, float | str | pygment.editor.unit.SizeUnitType, float | str | pygment.editor.unit.SizeUnitType, float | str | pygment.editor.unit.SizeUnitType]
+_UnitRect = tuple["float | str | SizeUnitType", "float | str | SizeUnitType", "float | str | SizeUnitType", "float | str | SizeUnitType"]
 _ColorValue = int | str | tuple[int, int, int, int] | tuple[int, int, int]
@@ -1,32 +1,69 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Callable
+from typing import TYPE_CHECKING, Any, Callable
+import functools
 import re
 
 import pygame
 
-import pygment.core.layoutnode as layoutnode
-import pygment.core.uielement as uielement
+if TYPE_CHECKING:
+    import pygment.core.layoutnode as layoutnode
+    import pygment.core.uielement as uielement
 
 
 __all__ = ["sw", "sh", "pw", "ph"]
 
 
+_UNIT_TYPES: dict[str, type[SizeUnitType]] = {} # registry of unit identifiers, filled as SizeUnitType subclasses are defined
+
+
+_LayoutNode: type[layoutnode.LayoutNode] | None = None # imported on first use, as the components import this module
+
+
+def _parent(obj: uielement.UIElement) -> layoutnode.LayoutNode | None:
+    """ Get the parent of a layout node, `None` for root nodes and other elements. """
+    global _LayoutNode
+    if _LayoutNode is None:
+        from pygment.core.layoutnode import LayoutNode as _LayoutNode
+    return obj.parent if isinstance(obj, _LayoutNode) else None
+
+
 class SizeUnitType(ABC):
-    """ Abstract class representing a computable size unit. """
+    """ Abstract class representing a computable size unit. 
+    
+        Unit objects are immutable, which lets parsed units be shared between components.
+    """
     __slots__ = ("_value")
+    relative_to_parent = False # whether the value depends on the size of the component's parent
+    
     def __init__(self, value: float):
-        self._value = value / 100
+        object.__setattr__(self, "_value", value / 100)
+        
+        
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        _UNIT_TYPES[cls.__name__] = cls
         
         
     @property 
     def value(self) -> float:
         return self._value * 100
+        
+        
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"'{type(self).__name__}' unit objects are immutable")
+    
     
+    def __eq__(self, other: object) -> bool:
+        return type(other) is type(self) and other._value == self._value # type: ignore
     
-    @value.setter
-    def value(self, val: float) -> None:
-        self._value = val / 100
+    
+    def __hash__(self) -> int:
+        return hash((type(self), self._value))
+    
+    
+    def __reduce__(self) -> tuple[type[SizeUnitType], tuple[float]]:
+        return type(self), (self.value,)
         
         
     @abstractmethod
@@ -35,6 +72,14 @@ class SizeUnitType(ABC):
         pass
     
     
+    def depends_on_surface(self, obj: uielement.UIElement) -> bool:
+        """ Check whether this unit's value for a given component changes with the renderer surface size. 
+        
+            Custom units are assumed to depend on it, unless they override this method.
+        """
+        return True
+    
+    
     @classmethod
     def parse(cls, value: str) -> SizeUnitType:
         """ Parse a string to a size unit object. 
@@ -84,28 +129,46 @@ class sh(SizeUnitType):
 class pw(SizeUnitType):
     """ Graphic unit representing a 1% of the object's parent width. """
     __slots__ = ("_value")
+    relative_to_parent = True
     def evaluate(self, obj: uielement.UIElement, surface: pygame.surface.Surface) -> int:
-        if isinstance(obj, layoutnode.LayoutNode) and obj.parent:
-            parent_width = obj.parent.client_width(surface)
+        parent = _parent(obj)
+        if parent:
+            parent_width = parent.client_width(surface)
             return round(parent_width * self._value)
         
         return round(surface.get_width() * self._value)
     
     
+    def depends_on_surface(self, obj: uielement.UIElement) -> bool:
+        return not _parent(obj) # falls back to the surface width for root components
+    
+    
     
 class ph(SizeUnitType):
     """ Graphic unit representing a 1% of the object's parent height. """
     __slots__ = ("_value")
+    relative_to_parent = True
     def evaluate(self, obj: uielement.UIElement, surface: pygame.surface.Surface) -> int:
-        if isinstance(obj, layoutnode.LayoutNode) and obj.parent:
-            parent_height = obj.parent.client_height(surface)
+        parent = _parent(obj)
+        if parent:
+            parent_height = parent.client_height(surface)
             return round(parent_height * self._value)
         
         return round(surface.get_height() * self._value)
     
     
+    def depends_on_surface(self, obj: uielement.UIElement) -> bool:
+        return not _parent(obj)
+    
+    
    
 
+_UNIT_IDENTIFIER = re.compile(r"\A[\s\d\.-]+|\s+$")
+_UNIT_LETTERS = re.compile(r"[a-zA-Z_]+")
+_identity = lambda x: x # identity pipe for strings without unit identifiers and 'px' units 
+
+
+@functools.lru_cache(maxsize=4096)
 def str_to_unit(value: str) -> SizeUnitType | float:
     """ Parse a str object to a size unit.
     
@@ -113,27 +176,21 @@ def str_to_unit(value: str) -> SizeUnitType | float:
         of white characters and `<unit identifier>` is either a name of any SizeUnitType subclass, 'px' or an empty string. 
         For the last two `<unit identifier>` value cases an unchanged float value parsed from `<float value>` is returned.
         
+        Parsed results are cached, so repeatedly parsing the same string returns the same immutable unit object.
+        
         Args:
             value: the string to be parsed
         
         Raises:
             ValueError when the string contents could not be parsed
     """
-    unit_name_mapping: dict[str, type[SizeUnitType] | Callable[[float], float]] = {
-        unit.__name__: unit  for unit in SizeUnitType.__subclasses__()
-    }
-    identity = lambda x: x # identity pipe for strings without unit identifiers and 'px' units 
-    unit_name_mapping.update(
-        {'': identity, "px": identity}
-    ) 
-    
-    unit = re.sub(r"\A[\s\d\.-]+|\s+$", '', value)
-    unit_wrapper = unit_name_mapping.get(unit)
+    unit = _UNIT_IDENTIFIER.sub('', value)
+    unit_wrapper: type[SizeUnitType] | Callable[[float], float] | None = _identity if unit in ('', "px") else _UNIT_TYPES.get(unit)
     if not unit_wrapper:
         raise ValueError(f"could not convert string '{value}' to unit. invalid size unit identifier '{unit}'") 
     
     try:
-        val = float(re.sub(r"[a-zA-Z_]+", '', value))
+        val = float(_UNIT_LETTERS.sub('', value))
     except ValueError as e:
         raise ValueError(f"could not convert string '{value}' to unit. {e}")
     
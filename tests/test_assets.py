@@ -0,0 +1,96 @@
+import pytest
+
+import os
+
+import pygame
+
+from pygment.core.assets import ImageCache, LRUCache, TextCache
+
+
+@pytest.fixture
+def image_path(tmp_path) -> str:
+    path = str(tmp_path / "image.png")
+    image = pygame.surface.Surface((40, 20))
+    image.fill((255, 0, 0))
+    pygame.image.save(image, path)
+    return path
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=3, sizeof=len)
+    cache.put("a", "x")
+    cache.put("b", "yy")
+    assert cache.get("a") == "x"
+    
+    cache.put("c", "z")
+    assert "b" not in cache
+    assert cache.stats == (1, 0, 1, 2, 2)
+    
+    
+def test_lru_cache_skips_values_over_budget():
+    cache = LRUCache(max_size=2, sizeof=len)
+    cache.put("a", "xyz")
+    assert "a" not in cache and cache.get("a") is None
+    
+    
+def test_image_cache_reuses_scaled_variants(image_path):
+    cache = ImageCache()
+    image = cache.get(image_path, (10, 10))
+    assert image.get_size() == (10, 10)
+    assert cache.get(image_path, (10, 10)) is image
+    
+    cache.get(image_path, (20, 10))
+    assert cache.stats.hits == 1 and cache.stats.misses == 2
+    assert cache.decoded_stats.hits == 1 and cache.decoded_stats.misses == 1
+    
+    
+def test_image_cache_peek_doesnt_count_as_lookup(image_path):
+    cache = ImageCache(max_bytes=2 * 10 * 10 * 4)
+    assert cache.peek(image_path, (10, 10)) is None
+    first = cache.get(image_path, (10, 10))
+    cache.get(image_path, (10, 11))
+    assert cache.peek(image_path, (10, 10)) is first
+    assert cache.stats.hits == 0 and cache.stats.misses == 2
+    
+    cache.get(image_path, (10, 12)) # peeking didn't make the first image the most recently used
+    assert cache.peek(image_path, (10, 10)) is None
+    
+    
+def test_image_cache_reports_missing_files_through_fetch(tmp_path):
+    cache = ImageCache()
+    path = str(tmp_path / "missing.png")
+    assert cache.peek(path, (10, 10)) is None and cache.lookup(path, (10, 10)) is None
+    with pytest.raises(FileNotFoundError):
+        cache.fetch(path, (10, 10)).result(timeout=5)
+    
+    
+def test_image_cache_respects_byte_budget(image_path):
+    cache = ImageCache(max_bytes=2 * 10 * 10 * 4)
+    for width in (10, 10, 10):
+        cache.get(image_path, (width, 10))
+    for height in (11, 12):
+        cache.get(image_path, (10, height))
+    assert cache.stats.size <= cache.max_bytes
+    assert cache.stats.evictions == 1
+    
+    
+def test_image_cache_reloads_modified_files(image_path):
+    cache = ImageCache()
+    first = cache.get(image_path, (10, 10))
+    
+    stat = os.stat(image_path)
+    os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.get(image_path, (10, 10)) is not first
+    
+    
+def test_text_cache_shares_fonts_and_surfaces():
+    pygame.font.init()
+    cache = TextCache(max_surfaces=2)
+    surface = cache.render("foo", (255, 255, 255), 20)
+    assert cache.render("foo", (255, 255, 255), 20) is surface
+    assert cache.font(20) is cache.font(20)
+    
+    cache.render("bar", (255, 255, 255), 20)
+    cache.render("foo", (0, 0, 0), 20)
+    assert cache.stats.evictions == 1
+    assert cache.font_stats.entries == 1
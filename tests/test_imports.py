@@ -0,0 +1,52 @@
+import pytest
+
+import subprocess
+import sys
+
+from benchmarks.bench_import import import_times
+
+
+COMPONENT_MODULES = {f"pygment.component.{name}" for name in ("button", "frame", "label", "image", "virtuallist", "scrollview")}
+
+
+@pytest.mark.parametrize("module", [
+    "pygment.editor.unit", "pygment.editor.type", "pygment.editor.schema", "pygment.core.uielement", 
+    "pygment.core.layoutnode", "pygment.core.loader", "pygment.core.viewrenderer", "pygment.component.frame",
+])
+def test_modules_import_first(module: str):
+    # the package no longer imports its modules in a fixed order, so each of them has to work as the entry point
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True, env={"SDL_VIDEODRIVER": "dummy", "PYGAME_HIDE_SUPPORT_PROMPT": "1"})
+
+
+def test_import_pygment_is_lazy():
+    imported = import_times("import pygment; import pygame")
+    assert "pygment.core.viewrenderer" not in imported and not COMPONENT_MODULES & imported.keys()
+    assert imported["pygment"][1] < imported["pygame"][1] # pygame is imported after pygment, so it isn't counted in
+    
+    imported = import_times("from pygment.editor import Style")
+    assert "pygame" not in imported and "pygment.editor.schema" not in imported
+
+
+def test_component_modules_load_on_access():
+    imported = import_times("from pygment.component import Frame")
+    assert COMPONENT_MODULES & imported.keys() == {"pygment.component.frame"}
+    assert "pygment.core.viewrenderer" not in imported
+    
+    import pygment
+    from pygment.component.label import Label
+    assert pygment.component.Label is Label and "ViewRenderer" in dir(pygment)
+    
+    
+def test_renderer_without_display():
+    script = (
+        "import pygame\n"
+        "from pygment import ViewRenderer\n"
+        "from pygment.component import Frame\n"
+        "renderer = ViewRenderer((40, 30), (Frame('root', (5, 5, 10, 10), color=(255, 0, 0)),))\n"
+        "renderer.handle_event(pygame.event.Event(pygame.MOUSEMOTION, pos=(0, 0)))\n" # polling the mouse requires a display
+        "renderer.update(16)\n"
+        "target = pygame.surface.Surface((40, 30))\n"
+        "renderer.render(target, (0, 0))\n"
+        "assert pygame.display.get_surface() is None and target.get_at((10, 10)) == (255, 0, 0, 255)\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True, env={"SDL_VIDEODRIVER": "dummy", "PYGAME_HIDE_SUPPORT_PROMPT": "1"})
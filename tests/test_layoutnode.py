@@ -3,6 +3,8 @@ from tests.testutils import make_concrete
 
 import gc
 
+import pygame
+
 import pygment.core.layoutnode as layoutnode
 LayoutNode = make_concrete(layoutnode.LayoutNode)
 
@@ -55,6 +57,15 @@ def test_container_getattr_name_lookup(container, component):
     assert getattr(container, compname) is component
     
     
+def test_component_path_follows_ancestors(container, component):
+    assert component.path == "dummy_component"
+    
+    outer = LayoutNode("outer", (0,0,0,0))
+    component.join(container)
+    container.join(outer)
+    assert component.path == "outer/dummy_container/dummy_component"
+    
+    
 def test_component_del_leaves_container_unchanged(container):
     component = LayoutNode("dummy_component", (0,0,0,0))
     assert not container.children
@@ -75,3 +86,81 @@ def test_container_del_kills_component_parent(component):
     del container
     gc.collect()
     assert component.parent is None
+    
+    
+@pytest.fixture
+def surface(): return pygame.surface.Surface((200, 100))
+
+
+def test_client_rect_follows_parent_changes(container, component, surface):
+    container.width, container.height = 100, 50
+    component.x, component.width, component.height = "10pw", "50pw", "100ph"
+    container.add(component)
+    assert component.client_rect(surface) == pygame.Rect(10, 0, 50, 50)
+    
+    container.x = 20
+    container.width = 200
+    assert component.client_rect(surface) == pygame.Rect(40, 0, 100, 50)
+    
+    
+def test_client_rect_follows_centered_style(container, component, surface):
+    component.width, component.height = 20, 10
+    container.add(component)
+    assert component.client_rect(surface) == pygame.Rect(0, 0, 20, 10)
+    
+    component.style.centered = True
+    assert component.client_rect(surface) == pygame.Rect(-10, -5, 20, 10)
+    
+    
+def test_client_rect_follows_surface_size(component):
+    component.width, component.height = "50sw", "50sh"
+    assert component.client_rect(pygame.surface.Surface((200, 100))).size == (100, 50)
+    assert component.client_rect(pygame.surface.Surface((100, 40))).size == (50, 20)
+    
+    
+def test_client_rect_follows_reparenting(container, component, surface):
+    container.x, container.y = 30, 40
+    component.x, component.y = 1, 2
+    assert component.client_rect(surface).topleft == (1, 2)
+    
+    container.add(component)
+    assert component.client_rect(surface).topleft == (31, 42)
+
+
+def test_nodes_share_empty_sentinels(container, component):
+    from pygment.component import Frame
+    from pygment.core import callback_property
+    
+    node = Frame("frame", (0,0,0,0))
+    assert not hasattr(node, "__dict__")
+    assert node._elements is LayoutNode.NO_CHILDREN and node._callbacks is callback_property.NO_CALLBACKS
+    assert node.on_mouse_click is callback_property.NO_OP
+    
+    container.add(component)
+    assert container._elements is not LayoutNode.NO_CHILDREN and component._elements is LayoutNode.NO_CHILDREN
+    
+    log = []
+    node.on_mouse_click = lambda obj: log.append(obj)
+    node.on_mouse_click()
+    assert log == [node]
+    del node.on_mouse_click
+    assert node._callbacks is callback_property.NO_CALLBACKS
+
+
+def test_coroutine_callbacks_are_scheduled_as_tasks(component):
+    import asyncio
+    
+    log = []
+    async def on_click(obj):
+        await asyncio.sleep(0)
+        log.append(obj)
+    component.on_mouse_click = on_click
+    with pytest.raises(RuntimeError, match="running event loop"):
+        component.on_mouse_click()
+    
+    async def main():
+        task = component.on_mouse_click()
+        assert isinstance(task, asyncio.Task) and log == []
+        await task
+    asyncio.run(main())
+    assert log == [component]
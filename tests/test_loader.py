@@ -0,0 +1,144 @@
+import pytest
+
+import json
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from pygment import ViewRenderer
+from pygment.component import Button, Frame, Label
+from pygment.core.layoutnode import LayoutNode
+from pygment.core.loader import LayoutSnapshot, _NodeRecord, build_layout, load_json
+from pygment.editor import Style
+from pygment.editor.unit import pw, sh, sw
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    pygame.font.init()
+    yield
+    pygame.display.quit()
+
+
+SPEC = [
+    {
+        "type": "Frame", "name": "card", "rect": ["50sw", "50sh", 160, 200],
+        "style": {"color": [20, 20, 20], "border_radius": 10, "centered": True},
+        "children": [
+            {
+                "type": "Frame", "name": "card_frame", "rect": ["50pw", "50ph", "85pw", "88ph"],
+                "style": {"color": "darkred", "centered": True},
+                "children": [
+                    {"type": "Button", "name": "play", "rect": ["80pw", "40ph", 30, 30], "style": {"color": [30, 215, 96], "hidden": True}},
+                    {"type": "Label", "name": "title", "rect": [0, "70ph", "100pw", 20.5], "style": {"text": "Liked Songs", "text_size": 18}},
+                ],
+            },
+        ],
+    },
+    {"type": "Frame", "name": "header", "rect": [0, 0, "100sw", 30]},
+]
+
+
+def describe(layout: tuple[LayoutNode, ...]) -> list:
+    """ Flatten a layout into comparable (path, type, rect, style) tuples in tree order. """
+    nodes = []
+    def visit(node):
+        nodes.append((node.path, type(node), (node.x, node.y, node.width, node.height), dict(node.style)))
+        for child in node:
+            visit(child)
+    for root in layout:
+        visit(root)
+    return nodes
+
+
+def test_build_layout_from_spec():
+    card, header = build_layout(SPEC)
+    assert isinstance(card.card_frame.play, Button) and isinstance(card.card_frame.title, Label)
+    assert (card.x, card.y, card.width) == (sw(50), sh(50), 160)
+    assert card.card_frame.title.width == pw(100)
+    assert card.style.color == (20, 20, 20) and card.card_frame.style.color == (139, 0, 0, 255)
+    assert card.card_frame.play.style.hidden and header.children == ()
+    assert build_layout(SPEC[1])[0].name == "header"
+
+
+def test_build_layout_rejects_invalid_specs():
+    with pytest.raises(ValueError, match="unknown component type 'Panel'"):
+        build_layout({"type": "Panel", "name": "panel", "rect": [0, 0, 10, 10]})
+    with pytest.raises(ValueError, match="'root/child' is missing"):
+        build_layout({"type": "Frame", "name": "root", "rect": [0, 0, 10, 10], "children": [{"type": "Frame", "name": "child"}]})
+    with pytest.raises(TypeError):
+        build_layout({"type": "Frame", "name": "root", "rect": [0, 0, 10, 10], "style": {"border_radius": "round"}})
+
+
+def test_load_json(tmp_path):
+    path = tmp_path / "layout.json"
+    path.write_text(json.dumps(SPEC))
+    assert describe(load_json(str(path))) == describe(build_layout(SPEC))
+
+
+def test_snapshot_round_trip(tmp_path):
+    expected = describe(build_layout(SPEC))
+    snapshot = LayoutSnapshot.from_spec(SPEC)
+    path = tmp_path / "layout.pgls"
+    snapshot.save(str(path))
+    assert len(snapshot) == 5
+
+    layout = LayoutSnapshot.load(str(path)).build()
+    assert describe(layout) == expected
+    assert type(layout[0].card_frame.title.height) is float and type(layout[0].card_frame.play.width) is int
+
+    renderer, reference = ViewRenderer((200, 240), layout), ViewRenderer((200, 240), build_layout(SPEC))
+    for r in (renderer, reference):
+        r.update(16)
+        r.render(pygame.surface.Surface((200, 240)), (0, 0))
+    assert pygame.image.tobytes(renderer.surface, "RGBA") == pygame.image.tobytes(reference.surface, "RGBA")
+
+
+def test_snapshot_of_built_layout_shares_styles():
+    root = Frame("list", (0, 0, "100sw", "100sh"))
+    for i in range(20):
+        Frame(f"item{i}", (0, i * 20, "100pw", 18), color=(40, 40, 40), border_radius=4).join(root)
+
+    data = LayoutSnapshot.from_layout((root,)).to_bytes()
+    (loaded,) = LayoutSnapshot.from_bytes(data).build()
+    assert describe((loaded,)) == describe((root,))
+    assert loaded.item0.style is not loaded.item1.style # every component gets its own copy
+    loaded.item0.style.color = (255, 0, 0)
+    assert loaded.item1.style.color == (40, 40, 40)
+
+
+def test_stylesheet_classes():
+    card = Style(color="darkred", border_radius=10)
+    spec = {"type": "Frame", "name": "list", "rect": [0, 0, 100, 100], "children": [
+        {"type": "Frame", "name": f"item{i}", "rect": [0, i * 20, 100, 18], "classes": ["card"]} for i in range(3)
+    ]}
+    spec["children"][0]["style"] = {"border_radius": 4}
+    (root,) = build_layout(spec, stylesheet={"card": card})
+    assert root.item1.style.classes == (card,) and dict(root.item1.style) == {}
+    assert root.item0.style.computed.border_radius == 4 and root.item1.style.computed.border_radius == 10
+    
+    (loaded,) = LayoutSnapshot.from_spec(spec, stylesheet={"card": card}).build()
+    assert [node.style for node in loaded] == [node.style.resolved() for node in root] # classes are flattened into snapshots
+    assert loaded.item1.style == {"color": (139, 0, 0, 255), "border_radius": 10}
+    with pytest.raises(ValueError, match="unknown style class 'card'"):
+        build_layout(spec)
+
+
+def test_snapshot_with_large_string_table():
+    records = [_NodeRecord("Frame", "root", -1, (0, 0, 100, 100), ())]
+    records += [_NodeRecord("Frame", f"item{i}", 0, (0, i, 10, 1), ()) for i in range(70_000)]
+    records.append(_NodeRecord("Frame", "last", 0, (sw(50), 0, pw(50), 1), ())) # unit names interned after 65k strings
+    last = LayoutSnapshot.from_bytes(LayoutSnapshot(records).to_bytes()).nodes[-1]
+    assert last.rect == (sw(50), 0, pw(50), 1)
+
+
+def test_snapshot_rejects_invalid_data():
+    with pytest.raises(ValueError, match="not a layout snapshot"):
+        LayoutSnapshot.from_bytes(b"PGRC\x01")
+    with pytest.raises(ValueError, match="unsupported"):
+        LayoutSnapshot.from_bytes(LayoutSnapshot.MAGIC + bytes([LayoutSnapshot.VERSION + 1]))
+    with pytest.raises(TypeError):
+        LayoutSnapshot.from_layout((Frame("root", (0, 0, 10, 10), custom=[1, 2]),)).to_bytes()
@@ -0,0 +1,114 @@
+import pytest
+
+import os
+import zlib
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from pygment import ViewRenderer
+from pygment.component import Frame, ScrollView
+from pygment.core.recording import MouseInput, Recording, Resize, Wheel, replay
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.display.quit()
+
+
+def make_layout(log: list) -> tuple[Frame, ...]:
+    section = Frame("section", ("10sw", 20, "80sw", 100), color=(30, 20, 60))
+    for i in range(2):
+        button = Frame(f"button{i}", ("10pw", 10 + i * 45, "80pw", 35), color=(20, 20, 20))
+        button.on_mouse_enter = lambda obj: setattr(obj.style, "color", (90, 90, 90))
+        button.on_mouse_leave = lambda obj: setattr(obj.style, "color", (20, 20, 20))
+        button.on_mouse_click = lambda obj: log.append(obj.name)
+        section.add(button)
+    return (section,)
+
+
+def test_recording_round_trip():
+    recording = Recording((100, 50))
+    recording.record_input((10, 10), False)
+    recording.record_input((10, 10), False)
+    recording.record_frame(16)
+    recording.record_resize((120, 60))
+    recording.record_wheel(0, -1.5)
+    recording.record_input(None, True)
+    recording.record_frame(17)
+
+    loaded = Recording.from_bytes(recording.to_bytes())
+    assert loaded.size == (100, 50)
+    assert [frame.dt for frame in loaded.frames] == [16, 17]
+    assert loaded.frames[0].events == (MouseInput((10, 10), False),)
+    assert loaded.frames[1].events == (Resize((120, 60)), Wheel(0, -1.5), MouseInput(None, True))
+
+    with pytest.raises(ValueError):
+        Recording.from_bytes(b"not a recording")
+
+
+def test_replay_reproduces_recorded_session(tmp_path):
+    log = []
+    renderer = ViewRenderer((200, 200), make_layout(log))
+    recording = renderer.start_recording()
+    dest = pygame.surface.Surface((200, 200))
+    checksums = []
+    events = [
+        [(pygame.MOUSEMOTION, (50, 40))],
+        [],
+        [(pygame.MOUSEBUTTONDOWN, (50, 40)), (pygame.MOUSEBUTTONUP, (50, 40))],
+        [(pygame.MOUSEMOTION, (50, 85))],
+        ["resize"],
+        [(pygame.MOUSEBUTTONDOWN, (50, 85))],
+        [(pygame.MOUSEBUTTONUP, (50, 85)), (pygame.WINDOWLEAVE, None)],
+    ]
+    for frame_events in events:
+        for event in frame_events:
+            if event == "resize":
+                renderer.size = (150, 220)
+                dest = pygame.surface.Surface((150, 220))
+            else:
+                renderer.handle_event(pygame.event.Event(event[0], pos=event[1], button=pygame.BUTTON_LEFT))
+        renderer.update(16)
+        dest.fill((0, 0, 0))
+        renderer.render(dest, (0, 0))
+        checksums.append(zlib.crc32(pygame.image.tobytes(dest, "RGB")))
+    assert renderer.stop_recording() is recording and renderer.stop_recording() is None
+
+    path = str(tmp_path / "session.pgrec")
+    recording.save(path)
+    expected_log, log[:] = log[:], []
+    report = replay(Recording.load(path), lambda: make_layout(log))
+
+    assert expected_log == ["button0", "button1"]
+    assert log == expected_log
+    assert report.checksums == checksums
+    assert len(report.frame_times) == len(report.samples) == len(events)
+    assert replay(recording, lambda: make_layout([])).checksum == report.checksum
+
+
+def test_replay_reproduces_wheel_scrolling():
+    def make_scroll_layout() -> tuple[ScrollView, ...]:
+        view = ScrollView("view", (0, 0, 100, 100), smooth_scroll=False)
+        for i in range(20):
+            Frame(f"row{i}", (0, i * 30, 100, 28), color=(i * 12, 40, 40)).join(view)
+        return (view,)
+
+    layout = make_scroll_layout()
+    renderer = ViewRenderer((100, 100), layout)
+    recording = renderer.start_recording()
+    dest = pygame.surface.Surface((100, 100))
+    renderer.handle_event(pygame.event.Event(pygame.MOUSEMOTION, pos=(50, 50)))
+    for _ in range(3):
+        renderer.handle_event(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-1, precise_x=0.0, precise_y=-1.0))
+        renderer.update(16)
+    dest.fill((0, 0, 0))
+    renderer.render(dest, (0, 0))
+    renderer.stop_recording()
+    assert layout[0].scroll_offset == (0, 3 * ScrollView.WHEEL_STEP)
+
+    report = replay(Recording.from_bytes(recording.to_bytes()), make_scroll_layout)
+    assert report.checksum == zlib.crc32(pygame.image.tobytes(dest, "RGB"))
@@ -42,4 +42,16 @@ def test_str_to_unit_returns_expected_value(unit_spec: str, expected: float):
 def test_str_to_unit_fails(unit_spec: str):
     with pytest.raises(ValueError):
         str_to_unit(unit_spec)
-        
\ No newline at end of file
+        
+
+def test_str_to_unit_returns_shared_instances():
+    assert str_to_unit("74pw") is str_to_unit("74pw")
+    assert str_to_unit("74pw") == pw(74)
+    assert str_to_unit("74pw") != ph(74)
+    
+    
+def test_unit_is_immutable():
+    unit = sw(10)
+    with pytest.raises(AttributeError):
+        unit.value = 20 # type: ignore
+    assert unit.value == 10
@@ -2,7 +2,7 @@ import pytest
 
 from typing import Any
 
-from pygment.editor import Style
+from pygment.editor import Style, StyleSchema, StyleField, ColorField, NumberField
 
 
 @pytest.fixture
@@ -54,4 +54,108 @@ def test_style_type_checking_passes(style: Style, attr: str, ret_type: type):
 def test_style_type_checking_raises(style: Style, attr: str, ret_type: type):
     with pytest.raises(TypeError):
         style.get(attr, "dummy_default", expected_type=ret_type)
-        
\ No newline at end of file
+            
+    
+@pytest.fixture
+def schema() -> StyleSchema:
+    return StyleSchema(
+        hidden = StyleField(bool, False),
+        color = ColorField((0, 0, 0)),
+        border_radius = NumberField(10, minimum=0, integer=True),
+    )
+    
+    
+def test_schema_style_validates_on_assignment(schema: StyleSchema):
+    style = Style(schema=schema)
+    with pytest.raises(TypeError):
+        style.hidden = "yes"
+    with pytest.raises(TypeError):
+        Style({"color": [1, 2, 3]}, schema=schema)
+        
+        
+def test_schema_style_normalizes_values(schema: StyleSchema):
+    style = Style({"color": "red"}, schema=schema, border_radius=-2.7)
+    assert style.color == (255, 0, 0, 255)
+    assert style.computed.border_radius == 0
+    
+    style.border_radius = 4.4
+    assert style["border_radius"] == 4
+    
+    
+def test_schema_style_computed_defaults(schema: StyleSchema):
+    style = Style(schema=schema, custom="custom")
+    assert style.computed.border_radius == 10
+    assert style.border_radius == 10
+    assert "border_radius" not in style
+    
+    style.border_radius = 20
+    del style["border_radius"]
+    assert style.computed.border_radius == 10
+    assert style.custom == "custom"
+    
+    
+def test_style_changes_and_listeners(schema: StyleSchema):
+    class Owner:
+        def __init__(self): self.keys = []
+        def on_change(self, key): self.keys.append(key)
+        
+    style = Style(schema=schema)
+    owner = Owner()
+    style.add_listener(owner.on_change)
+    assert style.poll_changes() == {} and style._changes is Style.NO_CHANGES
+    
+    style.hidden = True
+    style.border_radius = 3
+    assert style.poll_changes() == {"hidden": None, "border_radius": None}
+    assert style.poll_changes() == {} and owner.keys == ["hidden", "border_radius"]
+    
+    del owner
+    style.hidden = False # the dead listener is skipped
+    
+    
+def test_style_classes_precedence(schema: StyleSchema):
+    base = Style(color="red", border_radius=4, custom="base")
+    accent = Style(color=(0, 0, 255))
+    style = Style({"border_radius": 8}, schema=schema, classes=[base, accent])
+    assert style.classes == (base, accent) and dict(style) == {"border_radius": 8}
+    assert style.color == (0, 0, 255) and style.computed.border_radius == 8 and style.custom == "base"
+    assert style.resolved() == {"color": (0, 0, 255), "border_radius": 8, "custom": "base"}
+    
+    del style["border_radius"]
+    assert style.computed.border_radius == 4
+    style.remove_class(accent)
+    assert style.color == (255, 0, 0, 255)
+    with pytest.raises(ValueError):
+        style.remove_class(accent)
+    with pytest.raises(ValueError):
+        base.add_class(Style(classes=[base]))
+    with pytest.raises(TypeError):
+        Style(schema=schema, classes=[Style(hidden="yes")])
+    
+    
+def test_style_class_changes_reach_only_its_styles(schema: StyleSchema):
+    class Owner:
+        def __init__(self): self.keys = []
+        def on_change(self, key): self.keys.append(key)
+        
+    button, other = Style(color="red"), Style(color="green")
+    nested = Style(classes=[button])
+    styles = [Style(schema=schema, classes=[button]) for _ in range(3)] + [Style(schema=schema, classes=[nested])]
+    overridden = Style(schema=schema, classes=[button], color=(1, 2, 3))
+    unrelated = Style(schema=schema, classes=[other])
+    owners = [Owner() for _ in range(6)]
+    for style, owner in zip((*styles, overridden, unrelated), owners):
+        style.add_listener(owner.on_change)
+    assert styles[0].computed is styles[1].computed # shared until a schema field is overridden
+    
+    button.color = "blue"
+    button.border_radius = 2
+    assert [owner.keys for owner in owners] == [["color", "border_radius"]] * 4 + [["border_radius"], []]
+    assert all(style.color == (0, 0, 255, 255) for style in styles) and overridden.color == (1, 2, 3)
+    assert styles[0].poll_changes() == {"color": (255, 0, 0, 255), "border_radius": 10}
+    
+    styles[0].hidden = True
+    assert styles[0].computed is not styles[1].computed and not styles[1].hidden
+    button.color = "white"
+    assert styles[0].color == styles[1].color == (255, 255, 255, 255)
+    assert unrelated.color == (0, 255, 0, 255) and owners[5].keys == []
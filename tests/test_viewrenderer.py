@@ -0,0 +1,812 @@
+import pytest
+
+import gc
+import os
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from pygment import ViewRenderer
+from pygment.core.assets import image_cache
+from pygment.core.recording import Resize
+from pygment.component import Button, Frame, Image, Label, ScrollView, VirtualList
+from pygment.editor import Style
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.display.quit()
+
+
+@pytest.fixture
+def mouse(monkeypatch):
+    state = {"pos": (0, 0), "pressed": False}
+    monkeypatch.setattr(pygame.mouse, "get_pos", lambda: state["pos"])
+    monkeypatch.setattr(pygame.mouse, "get_pressed", lambda *_: (state["pressed"], False, False))
+    return state
+
+
+def make_layout(seed: int, log: list) -> tuple[Frame, ...]:
+    """ Build a random layout whose callbacks log their calls and occasionally resize the hovered node. """
+    rng = random.Random(seed)
+
+    def make_node(name: str, depth: int) -> Frame:
+        node = Frame(name, (rng.randint(0, 60), rng.randint(0, 60), f"{rng.randint(20, 90)}pw", rng.randint(10, 80)))
+        def logger(event: str):
+            return lambda obj: log.append((event, obj.name))
+
+        for event in ("over", "enter", "leave", "click", "down", "up"):
+            setattr(node, f"on_mouse_{event}", logger(event))
+        if rng.random() < 0.2:
+            def grow(obj):
+                log.append(("enter", obj.name))
+                obj.width = 300
+            node.on_mouse_enter = grow
+
+        if depth < 3:
+            for i in range(rng.randint(0, 4)):
+                node.add(make_node(f"{name}.{i}", depth + 1))
+        return node
+
+    return tuple(make_node(f"root{i}", 0) for i in range(3))
+
+
+def reference_update(renderer: ViewRenderer, mouse_pos: tuple[int, int], pressed: bool, hovered: set, held: set) -> None:
+    """ Straightforward whole-tree hover and click resolution the renderer has to stay equivalent to. """
+    def hover(node):
+        was_hover = node in hovered
+        is_hover = node.client_rect(renderer.surface).collidepoint(mouse_pos)
+        if is_hover: node.on_mouse_over()
+        if was_hover != is_hover:
+            if is_hover:
+                node.on_mouse_enter()
+                hovered.add(node)
+            else:
+                node.on_mouse_leave()
+                hovered.remove(node)
+        for child in node.children:
+            hover(child)
+
+    def click(node):
+        was_pressed = node in held
+        is_pressed = pressed and node in hovered
+        if is_pressed: node.on_mouse_down()
+        if was_pressed != is_pressed:
+            if is_pressed:
+                node.on_mouse_click()
+                held.add(node)
+            else:
+                node.on_mouse_up()
+                held.remove(node)
+        for child in node.children:
+            click(child)
+
+    for root in renderer.layout:
+        hover(root)
+        click(root)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_hover_resolution_matches_full_traversal(mouse, seed: int):
+    log, expected_log = [], []
+    renderer = ViewRenderer((200, 200), make_layout(seed, log))
+    reference = ViewRenderer((200, 200), make_layout(seed, expected_log))
+    hovered, held = set(), set()
+
+    rng = random.Random(seed)
+    for _ in range(100):
+        if rng.random() < 0.6: # leave the mouse still on the remaining frames
+            mouse["pos"] = (rng.randint(-10, 210), rng.randint(-10, 210))
+            mouse["pressed"] = rng.random() < 0.3
+        renderer.update(16)
+        reference_update(reference, mouse["pos"], mouse["pressed"], hovered, held)
+
+    assert log == expected_log
+
+
+def test_handle_event_resolves_input_changes():
+    log = []
+    button = Frame("button", (10, 10, 20, 20))
+    button.on_mouse_enter = lambda: log.append("enter")
+    button.on_mouse_over = lambda: log.append("over")
+    button.on_mouse_click = lambda: log.append("click")
+    button.on_mouse_up = lambda: log.append("up")
+    button.on_mouse_leave = lambda: log.append("leave")
+    renderer = ViewRenderer((100, 100), (button,))
+
+    assert renderer.handle_event(pygame.event.Event(pygame.MOUSEMOTION, pos=(15, 15)))
+    renderer.update(16)
+    renderer.update(16)
+    assert log == ["over", "enter", "over"]
+
+    log.clear()
+    renderer.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(15, 15), button=pygame.BUTTON_LEFT))
+    renderer.handle_event(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=(15, 15), button=pygame.BUTTON_LEFT))
+    renderer.update(16)
+    assert log == ["over", "click", "over", "up"]
+
+    log.clear()
+    renderer.handle_event(pygame.event.Event(pygame.WINDOWLEAVE))
+    renderer.update(16)
+    assert log == ["leave"]
+    assert not renderer.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a))
+
+
+def full_redraw(renderer: ViewRenderer) -> pygame.surface.Surface:
+    surface = renderer.surface.copy()
+    surface.fill((0, 0, 0, 0))
+    for root in renderer.layout:
+        ViewRenderer._cascade_action(root, lambda node: node.render(surface))
+    return surface
+
+
+def test_minimal_repaint_matches_full_redraw():
+    pygame.font.init()
+    card = Button("card", ("50sw", "50sh", 160, 200), color=(20, 20, 20), border_radius=10, centered=True)
+    content = Frame("content", ("50pw", "50ph", "85pw", "88ph"), centered=True, color=(40, 10, 10))
+    content.join(card)
+    play = Button("play", ("80pw", "40ph", 30, 30), color=(30, 215, 96), border_radius=30, centered=True)
+    play.join(content)
+    label = Label("label", (0, "70ph", "100pw", 20), text="Liked Songs", text_color=(200, 200, 200))
+    label.join(content)
+    header = Frame("header", (0, 0, "100sw", 30), color=(60, 60, 60), border_thickness=2, border_color=(90, 0, 0))
+
+    renderer = ViewRenderer((240, 260), (header, card))
+    dest = pygame.surface.Surface((240, 260))
+    mutations = [
+        lambda: setattr(play.style, "color", (40, 225, 106)),
+        lambda: setattr(play, "width", 44),
+        lambda: setattr(card.style, "color", (34, 34, 34)),
+        lambda: setattr(play.style, "hidden", True),
+        lambda: setattr(label.style, "text", "274 songs"),
+        lambda: setattr(content, "x", "30pw"),
+        lambda: setattr(header, "height", 50),
+        lambda: setattr(renderer, "size", (200, 300)),
+        lambda: setattr(play.style, "hidden", False),
+    ]
+    for mutate in mutations:
+        mutate()
+        renderer.update(16)
+        renderer.render(dest, (0, 0))
+        expected = full_redraw(renderer)
+        assert pygame.image.tobytes(renderer.surface, "RGBA") == pygame.image.tobytes(expected, "RGBA")
+
+
+def test_repaint_is_limited_to_dirty_regions():
+    rendered = []
+    class RecordingFrame(Frame):
+        def render(self, surface):
+            rendered.append(self.name)
+            super().render(surface)
+
+    outer = RecordingFrame("outer", (0, 0, 100, 100), color=(10, 10, 10))
+    inner = RecordingFrame("inner", (10, 10, 20, 20), color=(200, 0, 0))
+    inner.join(outer)
+    sibling = RecordingFrame("sibling", (50, 50, 20, 20), color=(200, 0, 0))
+    sibling.join(outer)
+    other = RecordingFrame("other", (150, 0, 40, 40), color=(0, 0, 200))
+    renderer = ViewRenderer((200, 200), (outer, other))
+    renderer.update(16)
+    renderer.render(pygame.surface.Surface((200, 200)), (0, 0))
+
+    rendered.clear()
+    inner.style.color = (0, 200, 0)
+    renderer.update(16)
+    renderer.render(pygame.surface.Surface((200, 200)), (0, 0))
+    assert rendered == ["outer", "inner"]
+
+
+def test_image_draws_placeholder_until_loaded(tmp_path):
+    path = str(tmp_path / "image.png")
+    source = pygame.surface.Surface((8, 8))
+    source.fill((255, 0, 0))
+    pygame.image.save(source, path)
+
+    image = Image("image", (0, 0, 20, 20), source=path, placeholder_color=(0, 0, 255), placeholder_preview=False)
+    renderer = ViewRenderer((20, 20), (image,))
+    renderer.update(16)
+    renderer.render(pygame.surface.Surface((20, 20)), (0, 0))
+    assert renderer.surface.get_at((10, 10)) == (0, 0, 255)
+
+    image._request[1].result(timeout=5)
+    renderer.update(16)
+    renderer.render(pygame.surface.Surface((20, 20)), (0, 0))
+    assert renderer.surface.get_at((10, 10)) == (255, 0, 0)
+
+
+def test_image_render_counts_cache_lookups(tmp_path):
+    path = str(tmp_path / "image.png")
+    pygame.image.save(pygame.surface.Surface((8, 8)), path)
+    image = Image("image", (0, 0, 20, 20), source=path)
+    renderer = ViewRenderer((20, 20), (image,))
+    before = image_cache.stats
+
+    renderer.update(16)
+    renderer.render(pygame.surface.Surface((20, 20)), (0, 0))
+    image._request[1].result(timeout=5)
+    for _ in range(3):
+        image.mark_dirty()
+        renderer.update(16)
+        renderer.render(pygame.surface.Surface((20, 20)), (0, 0))
+    stats = image_cache.stats
+    assert (stats.hits - before.hits, stats.misses - before.misses) == (3, 1)
+    assert image._request is None # the loaded image is held by the cache only
+
+
+@pytest.mark.parametrize("auto_cache", [False, True])
+def test_surface_cached_subtrees_match_full_redraw(monkeypatch, auto_cache: bool):
+    monkeypatch.setattr(ViewRenderer, "AUTO_CACHE_FRAMES", 2)
+    monkeypatch.setattr(ViewRenderer, "AUTO_CACHE_MIN_NODES", 3)
+    header = Frame("header", (0, 0, "100sw", 40), color=(60, 60, 60), cache_as_surface=not auto_cache)
+    for i in range(3):
+        Button(f"tab{i}", (10 + i * 40, 5, 30, 30), color=(200, 0, 0), border_radius=5).join(header)
+    card = Frame("card", (20, 20, 100, 100), color=(20, 20, 20))
+    renderer = ViewRenderer((160, 160), (header, card), auto_cache=auto_cache)
+    dest = pygame.surface.Surface((160, 160))
+
+    def frame():
+        renderer.update(16)
+        renderer.render(dest, (0, 0))
+        assert pygame.image.tobytes(renderer.surface, "RGBA") == pygame.image.tobytes(full_redraw(renderer), "RGBA")
+
+    for _ in range(4):
+        frame()
+    card.style.color = (30, 30, 30) # damages the header without changing it
+    frame()
+    assert renderer.surface_cache_bytes > 0
+
+    header.tab1.style.color = (0, 200, 0)
+    frame()
+    card.x = 30
+    frame()
+    assert renderer.surface_cache_bytes > 0 or auto_cache
+
+
+def test_layers_composite_above_static_content():
+    rendered = []
+    class RecordingFrame(Frame):
+        def render(self, surface):
+            rendered.append(self.name)
+            super().render(surface)
+
+    background = RecordingFrame("background", (0, 0, 100, 100), color=(10, 10, 10))
+    for i in range(3):
+        RecordingFrame(f"row{i}", (0, i * 30, 100, 20), color=(40, 40, 40)).join(background)
+    overlay = RecordingFrame("overlay", (20, 20, 40, 40), color=(200, 0, 0), layer=True)
+    RecordingFrame("icon", (5, 5, 10, 10), color=(0, 0, 200)).join(overlay)
+    renderer = ViewRenderer((100, 100), (background, overlay))
+    dest = pygame.surface.Surface((100, 100))
+
+    def frame() -> list[str]:
+        rendered.clear()
+        renderer.update(16)
+        renderer.render(dest, (0, 0))
+        repainted = rendered[:]
+        expected = pygame.surface.Surface((100, 100))
+        expected.blit(full_redraw(renderer), (0, 0))
+        assert pygame.image.tobytes(dest, "RGB") == pygame.image.tobytes(expected, "RGB")
+        return repainted
+
+    frame()
+    overlay.style.color = (0, 200, 0)
+    assert frame() == ["overlay", "icon"]
+    overlay.x = 50
+    assert frame() == ["overlay", "icon"]
+
+    overlay.style.layer = False
+    frame()
+    assert renderer.surface.get_at((75, 45)) == (0, 200, 0)
+
+
+def test_nested_retained_subtrees_match_full_redraw():
+    panel = Frame("panel", (0, 0, 80, 80), color=(30, 30, 30), cache_as_surface=True)
+    inner = Frame("inner", (10, 10, 50, 50), color=(0, 0, 120), cache_as_surface=True)
+    badge = Frame("badge", (5, 5, 10, 10), color=(200, 0, 0), layer=True)
+    sidebar = Frame("sidebar", (80, 0, 40, 120), color=(60, 60, 60))
+    item = Frame("item", (5, 5, 30, 30), color=(0, 120, 0), cache_as_surface=True)
+    panel.add(inner)
+    inner.add(badge)
+    sidebar.add(item)
+    renderer = ViewRenderer((120, 120), (panel, sidebar))
+    dest = pygame.surface.Surface((120, 120))
+
+    def frame():
+        renderer.update(16)
+        renderer.render(dest, (0, 0))
+        expected = pygame.surface.Surface((120, 120))
+        expected.blit(full_redraw(renderer), (0, 0))
+        assert pygame.image.tobytes(dest, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+    frame()
+    badge.style.color = (200, 200, 0)
+    frame()
+    panel.style.cache_as_surface = False # the inner subtree becomes the outermost cached root
+    inner.style.color = (0, 0, 200)
+    frame()
+    sidebar.style.layer = True # the layer encloses a cached subtree
+    item.style.color = (0, 200, 0)
+    frame()
+    Frame("extra", (0, 60, 40, 40), color=(90, 0, 90), cache_as_surface=True).join(sidebar)
+    frame()
+    sidebar.style.layer = False
+    frame()
+    assert renderer.surface.get_at((100, 80)) == (90, 0, 90)
+    badge.style.layer = False # the badge is drawn into the cached surface of its parent again
+    frame()
+    assert renderer.surface.get_at((15, 15)) == (200, 200, 0)
+
+
+def test_frame_stats_are_opt_in(monkeypatch):
+    counted = []
+    count = Frame._count_unit_evaluations
+    monkeypatch.setattr(Frame, "_count_unit_evaluations", lambda self, n: (counted.append(n), count(self, n)))
+    gc.collect() # renderers of other tests may still record stats
+    outer = Frame("outer", (0, 0, 100, 100), color=(10, 10, 10))
+    Frame("inner", ("10pw", 10, "20pw", "20ph"), color=(200, 0, 0)).join(outer)
+    renderer = ViewRenderer((100, 100), (outer,))
+    dest = pygame.surface.Surface((100, 100))
+    assert renderer.stats is None
+    renderer.update(16)
+    assert not counted # unit evaluations aren't counted at all while no renderer records stats
+
+    stats = renderer.enable_stats(history=3)
+    outer.invalidate_geometry()
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    first = stats.last
+    assert first.counts["dirty_nodes"] == 2 and first.counts["clears"] == 1 and first.counts["blits"] == 1
+    assert first.counts["unit_evaluations"] == 3 # the inner node's units, evaluated once
+    for _ in range(4):
+        renderer.update(16)
+        renderer.render(dest, (0, 0))
+    assert stats.frames == 5 and len(stats.history) == 3
+    assert sum(stats.histogram.values()) == 3
+    assert stats.last.counts["dirty_nodes"] == 0 and stats.last.counts["clears"] == 0
+
+    outer.width = 80
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    assert stats.last.counts["unit_evaluations"] == 3 # the outer node has no units
+    assert stats.last.counts["dirty_nodes"] == 2
+    assert all(seconds >= 0 for seconds in stats.last.timings.values())
+
+    renderer.disable_stats()
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    assert renderer.stats is None and stats.frames == 6
+    counted.clear()
+    outer.width = 90
+    renderer.update(16)
+    assert not counted
+
+
+def test_virtual_list_recycles_rows():
+    log, created = [], []
+    def make_row(index, row):
+        if row is None:
+            row = Frame(f"row{len(created)}", (0, 0, 0, 0))
+            row.on_mouse_enter = lambda obj: log.append(("enter", obj.parent.index_of(obj)))
+            row.on_mouse_leave = lambda obj: log.append(("leave", obj.parent.index_of(obj)))
+            created.append(row)
+        row.style.color = (index % 256, 0, 0)
+        return row
+
+    items = VirtualList("items", (0, 10, 100, 100), item_count=10_000, row_height=20, row_factory=make_row, overscan=1)
+    renderer = ViewRenderer((100, 120), (items,))
+    dest = pygame.surface.Surface((100, 120))
+    renderer.handle_event(pygame.event.Event(pygame.MOUSEMOTION, pos=(50, 55)))
+    for _ in range(2):
+        renderer.update(16)
+        renderer.render(dest, (0, 0))
+    assert len(created) == len(items) == 6 # 5 visible rows and 1 overscan row
+    assert log == [("enter", 2)]
+    assert renderer.surface.get_at((50, 55))[:3] == (2, 0, 0)
+
+    log.clear()
+    items.scroll_offset = (0, 5000)
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    assert len(created) == 7
+    assert log == [("leave", 2), ("enter", 252)]
+    assert items.index_of(items.row_for(252)) == 252 and items.row_for(2) is None
+    assert renderer.surface.get_at((50, 55))[:3] == (252 % 256, 0, 0)
+
+    items.scroll_offset = (0, 5010) # rows partially scrolled out are clipped to the list
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    assert renderer.surface.get_at((50, 5)) == (0, 0, 0, 0)
+    assert renderer.surface.get_at((50, 115)) == (0, 0, 0, 0)
+
+    items.item_count = 3
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    assert items.scroll_offset == (0, 0) and renderer.surface.get_at((50, 85)) == (0, 0, 0, 0)
+
+
+def test_virtual_list_scrolls_as_a_scroll_view():
+    make_row = lambda index, row: Frame(f"row{index}", (0, 0, 0, 0), color=(200, 0, 0)) if row is None else row
+    items = VirtualList("items", (0, 0, 100, 100), item_count=100, row_height=20, row_factory=make_row, smooth_scroll=False)
+    renderer = ViewRenderer((100, 100), (items,))
+    renderer.update(16)
+    assert items.max_scroll_offset == (0, 1900)
+
+    items.scroll_to_index(50)
+    assert items.scroll_offset == (0, 50 * 20 + 20 - 100)
+    assert items.row_for(50).client_rect(renderer.surface).y == 50 * 20 # rows stay in the list's content space
+    assert items.handle_wheel(0, -1) and items.scroll_offset == (0, 920 + ScrollView.WHEEL_STEP)
+    assert {row.name for row in items} >= {"row0", "row1"} # recycled rows keep their names
+
+    duplicates = VirtualList("duplicates", (0, 0, 100, 100), item_count=10, row_height=20, row_factory=lambda index, row: Frame("row", (0, 0, 0, 0)) if row is None else row)
+    with pytest.raises(ValueError):
+        ViewRenderer((100, 100), (duplicates,)).update(16)
+
+
+def test_scroll_view_matches_full_redraw(mouse):
+    def build(log: list) -> tuple[Frame, ScrollView]:
+        view = ScrollView("view", (10, 20, 120, 100), color=(10, 10, 30), smooth_scroll=False)
+        for i in range(30):
+            row = Frame(f"row{i}", (5, i * 17, "50pw", 15), color=(i * 8, 100, 255 - i * 8), border_radius=3)
+            row.on_mouse_enter = lambda obj: log.append(obj.name)
+            row.join(view)
+        backdrop = Frame("backdrop", (0, 0, "100sw", "100sh"), color=(50, 0, 0))
+        return backdrop, view
+
+    def render(renderer: ViewRenderer) -> bytes:
+        renderer.update(16)
+        renderer.render(pygame.surface.Surface(renderer.surface.get_size()), (0, 0))
+        return pygame.image.tobytes(renderer.surface, "RGBA")
+
+    log = []
+    backdrop, view = build(log)
+    renderer = ViewRenderer((160, 140), (backdrop, view))
+    mouse["pos"] = (40, 60)
+    render(renderer)
+    assert log == ["row2"]
+
+    steps = [
+        lambda: setattr(view, "scroll_offset", (0, 33)),
+        lambda: renderer.handle_event(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-1, precise_x=0.0, precise_y=-1.0)),
+        lambda: setattr(view.row6.style, "color", (255, 255, 255)), # changed content is redrawn within the retained surface
+        lambda: renderer.handle_event(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=2, precise_x=0.0, precise_y=2.0)),
+        lambda: setattr(view, "scroll_offset", (0, 10_000)), # clamped to the end of the content
+    ]
+    for step in steps:
+        step()
+        actual = render(renderer)
+        _, reference_view = layout = build([])
+        reference_view.style.smooth_scroll = False
+        reference = ViewRenderer((160, 140), layout)
+        reference_view.row6.style.color = view.row6.style.color
+        reference_view.scroll_offset = view.scroll_offset
+        assert actual == render(reference)
+
+    assert view.scroll_offset == view.max_scroll_offset == (0, 30 * 17 - 2 - 100)
+    assert log[-1] == "row{}".format((60 - 20 + 408) // 17) # hover follows the scrolled content
+
+
+def test_scroll_view_scrolls_smoothly():
+    view = ScrollView("view", (0, 0, 100, 100))
+    Frame("content", (0, 0, 100, 1000), color=(200, 0, 0)).join(view)
+    renderer = ViewRenderer((100, 100), (view,))
+    renderer.update(16)
+    assert view.handle_wheel(0, -1)
+
+    offsets = []
+    while view.scroll_offset[1] < ScrollView.WHEEL_STEP and len(offsets) < 100:
+        renderer.update(16)
+        offsets.append(view.scroll_offset[1])
+    assert 2 < len(offsets) < 100 and offsets == sorted(offsets)
+    assert view.content_offset == (0, ScrollView.WHEEL_STEP)
+
+
+def test_scroll_view_scrolls_without_relayout(mouse):
+    view = ScrollView("view", (0, 0, 100, 100), smooth_scroll=False)
+    for i in range(200):
+        Frame(f"row{i}", (0, i * 20, "100pw", 18), color=(i, 0, 0)).join(view)
+    renderer = ViewRenderer((100, 100), (view,))
+    stats = renderer.enable_stats()
+    dest = pygame.surface.Surface((100, 100))
+    mouse["pos"] = (50, 40)
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    row = view.row100
+    rect = row.client_rect(renderer.surface)
+
+    view.scroll_offset = (0, 1970)
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    assert stats.last.counts["unit_evaluations"] == 0 # the content keeps its geometry in the view's content space
+    assert stats.last.counts["dirty_nodes"] == 1
+    assert row.client_rect(renderer.surface) == rect
+    assert renderer.surface.get_at((50, 40))[:3] == (100, 0, 0)
+    assert row in renderer._hovered # hit-tested at its scrolled position
+
+    view.scroll_offset = (0, 1980) # only the exposed strip is drawn
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    assert stats.last.counts["nodes_visited"] < 10 # out of 200 rows
+    assert renderer.surface.get_at((50, 30))[:3] == (100, 0, 0)
+
+
+def test_scroll_view_clamps_only_after_changes(monkeypatch):
+    view = ScrollView("view", (0, 0, 100, 100), smooth_scroll=False)
+    content = Frame("content", (0, 0, 100, 1000), color=(200, 0, 0))
+    content.join(view)
+    renderer = ViewRenderer((100, 100), (view,))
+    renderer.update(16)
+    view.scroll_offset = (0, 900)
+    renderer.update(16)
+
+    measured = []
+    content_origin = ScrollView._content_origin
+    monkeypatch.setattr(ScrollView, "_content_origin", lambda self, surface: measured.append(self) or content_origin(self, surface))
+    for _ in range(3):
+        renderer.update(16)
+    assert measured == [] # the content size isn't measured again while nothing changes
+
+    def settle() -> tuple[float, float]:
+        for _ in range(50): # the view glides back into the scrollable range
+            renderer.update(16)
+        return view.scroll_offset
+
+    content.height = 500
+    assert settle() == (0, 400)
+    view.height = 200
+    assert settle() == (0, 300)
+    Frame("footer", (0, 600, 100, 100)).join(view)
+    assert settle() == (0, 300) and view.max_scroll_offset == (0, 500)
+
+
+def test_resize_repaints_only_surface_relative_nodes():
+    fixed = Frame("fixed", (10, 10, 50, 50), color=(200, 0, 0))
+    Frame("inner", (5, 5, "50pw", 10), color=(0, 200, 0)).join(fixed)
+    footer = Frame("footer", (0, "80sh", "100sw", 20), color=(0, 0, 200))
+    Frame("badge", ("90pw", 0, 10, 10), color=(200, 200, 0)).join(footer)
+    panel = Frame("panel", (0, 70, "100sw", 10), color=(90, 90, 90), clip=True)
+    Frame("logo", (2, 2, 6, 6), color=(250, 250, 250)).join(panel) # keeps its geometry, but is clipped by its parent
+    Frame("icon", (10, 2, 6, 6), color=(250, 250, 250)).join(panel)
+    panel.style.clip = False
+    renderer = ViewRenderer((100, 100), (fixed, footer, panel))
+    stats = renderer.enable_stats()
+    dest = pygame.surface.Surface((300, 300))
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    assert renderer._dependents_of_surface() == {footer, footer.badge, panel}
+    panel.style.clip = True
+    assert renderer._dependents_of_surface() == {footer, footer.badge, panel, panel.logo, panel.icon}
+    panel.style.clip = False
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+
+    backing = renderer.surface.get_parent()
+    for size, reused in [((110, 105), True), ((90, 120), True), ((300, 240), False), ((120, 110), False)]:
+        renderer.size = size
+        renderer.update(16)
+        renderer.render(dest, (0, 0))
+        assert pygame.image.tobytes(renderer.surface, "RGBA") == pygame.image.tobytes(full_redraw(renderer), "RGBA")
+        assert (renderer.surface.get_parent() is backing) == reused
+        if reused: # only the surface relative nodes are relaid out and repainted
+            assert stats.last.counts["dirty_nodes"] == 3
+        backing = renderer.surface.get_parent()
+
+
+def test_resize_events_are_coalesced():
+    footer = Frame("footer", (0, "80sh", "100sw", 20), color=(0, 0, 200))
+    renderer = ViewRenderer((100, 100), (footer,))
+    recording = renderer.start_recording()
+    for size in [(110, 100), (120, 105), (130, 110)]:
+        assert renderer.handle_event(pygame.event.Event(pygame.VIDEORESIZE, size=size, w=size[0], h=size[1]))
+    assert renderer.size == (100, 100)
+
+    renderer.update(16)
+    assert renderer.size == (130, 110) and footer.client_rect(renderer.surface) == pygame.Rect(0, 88, 130, 20)
+    assert recording.frames[0].events == (Resize((130, 110)),)
+
+
+def test_element_lookup_by_name_and_path():
+    card = Frame("card", (0, 0, 100, 100))
+    frame = Frame("card_frame", (0, 0, "100pw", "100ph"))
+    frame.join(card)
+    Frame("first", (0, 0, 10, 10)).join(frame)
+    image = Frame("card_image", (0, 0, 10, 10), color=(0, 0, 0))
+    image.join(frame)
+    header = Frame("header", (0, 0, 100, 20))
+    Frame("card_image", (0, 0, 10, 10)).join(header) # names only have to be unique among siblings
+    renderer = ViewRenderer((100, 100), (card, header))
+
+    assert renderer.get_element("card_image") is image # the first one in tree order, beyond the first child
+    assert renderer.get_element("card/card_frame/card_image") is image
+    assert renderer.get_element("header/card_image") is header.card_image
+    with pytest.raises(KeyError):
+        renderer.get_element("card/card_image")
+
+    late = Frame("late", (0, 0, 10, 10))
+    late.join(header.card_image)
+    assert renderer.get_element("header/card_image/late") is late
+    assert renderer.get_element(late.path) is late
+
+
+def test_selections_are_cached_until_invalidated():
+    root = Frame("root", (0, 0, 100, 100))
+    labels = [Label(f"label{i}", (0, i * 10, 50, 10), text=str(i)) for i in range(3)]
+    for label in labels:
+        label.join(root)
+    button = Button("button", (0, 50, 50, 20), color=(200, 0, 0))
+    button.join(root)
+    renderer = ViewRenderer((100, 100), (root,))
+
+    assert renderer.select(Label) == tuple(labels)
+    assert renderer.select(Label) is renderer.select(Label)
+    assert renderer.select(style_key="color") == (button,)
+    assert renderer.select(Label, style_key="color") == ()
+
+    selection = renderer.select(Label)
+    labels[1].style.color = (0, 0, 200) # doesn't affect selections by class
+    assert renderer.select(Label) is selection
+    assert renderer.select(style_key="color") == (labels[1], button)
+
+    extra = Label("extra", (0, 80, 50, 10), text="extra")
+    extra.join(button)
+    assert renderer.select(Label) == (*labels, extra)
+    assert renderer.select(Label, style_key="color") == (labels[1],)
+    del button.style["color"]
+    assert renderer.select(style_key="color") == (labels[1],)
+
+
+def test_surfaces_convert_to_display_format_on_first_render(mouse):
+    layout = (Frame("root", (0, 0, "100sw", "100sh"), color=(10, 20, 30)), Frame("cached", (10, 10, 40, 40), color=(200, 0, 0), cache_as_surface=True))
+    renderer = ViewRenderer((80, 60), layout)
+    backing = renderer.surface.get_parent() # constructed without a display format conversion
+    
+    target = pygame.surface.Surface((80, 60))
+    renderer.update(16)
+    renderer.render(target, (0, 0))
+    converted = renderer.surface.get_parent()
+    assert converted is not backing and converted.get_size() == backing.get_size()
+    assert target.get_at((0, 0)) == (10, 20, 30, 255) and target.get_at((20, 20)) == (200, 0, 0, 255)
+    
+    renderer.render(target, (0, 0))
+    assert renderer.surface.get_parent() is converted
+    renderer.size = (200, 150)
+    renderer.update(16)
+    renderer.render(target, (0, 0))
+    assert target.get_at((70, 50)) == (10, 20, 30, 255)
+
+
+def test_tiled_repaint_matches_serial_repaint(monkeypatch, mouse):
+    monkeypatch.setattr(ViewRenderer, "TILE_SIZE", 32)
+    pygame.font.init()
+    def make_layout():
+        header = Frame("header", (0, 0, "100sw", 30), color=(60, 60, 60), border_thickness=2, border_color=(90, 0, 0))
+        tabs = Frame("tabs", (0, 30, "100sw", 40), color=(30, 30, 30), cache_as_surface=True)
+        for i in range(4):
+            Button(f"tab{i}", (10 + i * 50, 5, 40, 30), color=(200, 0, 0), border_radius=8).join(tabs)
+        card = Frame("card", ("50sw", "60sh", 150, 120), color=(20, 20, 20, 180), border_radius=12, centered=True, clip=True)
+        Frame("overflow", (-20, "50ph", "120pw", 40), color=(40, 120, 200)).join(card)
+        Label("title", (10, 10, 200, 20), text="Liked Songs", text_color=(220, 220, 220)).join(card)
+        return (header, tabs, card)
+
+    serial, tiled = ViewRenderer((240, 260), make_layout()), ViewRenderer((240, 260), make_layout(), render_threads=3)
+    dest = pygame.surface.Surface((240, 260))
+    mutations = [
+        lambda layout: None,
+        lambda layout: setattr(layout[2].style, "color", (90, 20, 20, 200)),
+        lambda layout: setattr(layout[1].tab2.style, "color", (0, 200, 0)),
+        lambda layout: setattr(layout[2].title.style, "text", "274 songs"),
+        lambda layout: setattr(layout[2], "x", "30sw"),
+        lambda layout: setattr(layout[0], "height", 50),
+    ]
+    for mutate in mutations:
+        for renderer in (serial, tiled):
+            mutate(renderer.layout)
+            renderer.update(16)
+            renderer.render(dest, (0, 0))
+        assert pygame.image.tobytes(tiled.surface, "RGBA") == pygame.image.tobytes(serial.surface, "RGBA")
+    assert tiled._executor is not None and serial._executor is None
+
+
+def test_sparse_damage_repaints_only_dirty_tiles():
+    rendered = []
+    class RecordingFrame(Frame):
+        def render(self, surface):
+            rendered.append(self.name)
+            super().render(surface)
+
+    root = RecordingFrame("root", (0, 0, 200, 200), color=(10, 10, 10))
+    header = RecordingFrame("header", (0, 0, 200, 20), color=(60, 60, 60))
+    sidebar = RecordingFrame("sidebar", (0, 0, 20, 200), color=(60, 60, 60))
+    content = RecordingFrame("content", (100, 100, 80, 80), color=(200, 0, 0))
+    for node in (header, sidebar, content):
+        node.join(root)
+    renderer = ViewRenderer((200, 200), (root,))
+    dest = pygame.surface.Surface((200, 200))
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    assert renderer.enable_stats().current.counts["dirty_tiles"] == 0
+
+    rendered.clear()
+    header.style.color = sidebar.style.color = (90, 90, 90) # their union would cover the content
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    assert "content" not in rendered
+    assert renderer.stats.last.counts["dirty_tiles"] == 7 # the top row of the 4 by 4 grid and the rest of its first column
+    assert renderer.stats.last.counts["repainted_pixels"] == 200 * 64 + 20 * 136
+    assert pygame.image.tobytes(renderer.surface, "RGBA") == pygame.image.tobytes(full_redraw(renderer), "RGBA")
+
+
+def test_run_schedules_coroutine_callbacks():
+    import asyncio
+    
+    log = []
+    button = Frame("button", (10, 10, 20, 20))
+    async def on_click():
+        log.append("fetch")
+        await asyncio.sleep(0.1) # far longer than a frame
+        log.append("done")
+    button.on_mouse_click = on_click
+    renderer = ViewRenderer((100, 100), (button,))
+    stats = renderer.enable_stats()
+    
+    async def main():
+        run = asyncio.ensure_future(renderer.run(pygame.display.get_surface(), fps=200))
+        await asyncio.sleep(0.02)
+        for event in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            pygame.event.post(pygame.event.Event(event, pos=(15, 15), button=pygame.BUTTON_LEFT))
+        while not log:
+            await asyncio.sleep(0.005)
+        frames = stats.frames
+        await asyncio.sleep(0.05)
+        assert log == ["fetch"] and stats.frames > frames # frames keep coming while the callback waits
+        
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+        await asyncio.wait_for(run, 1)
+        await asyncio.sleep(0.1)
+    
+    pygame.event.clear()
+    pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(15, 15)))
+    asyncio.run(main())
+    assert log == ["fetch", "done"]
+
+
+def test_style_class_change_repaints_only_its_nodes():
+    button, panel = Style(color=(60, 60, 60), border_radius=4), Style(color=(20, 20, 20))
+    root = Frame("root", (0, 0, 200, 200), Style(classes=[panel]))
+    for i in range(8):
+        Frame(f"button{i}", (10, i * 24, 80, 20), Style(classes=[button])).join(root)
+    Frame("hovered", (100, 10, 80, 20), Style(classes=[button]), color=(90, 90, 90)).join(root)
+    renderer = ViewRenderer((200, 200), (root,))
+    dest = pygame.surface.Surface((200, 200))
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    stats = renderer.enable_stats()
+
+    button.color = (0, 120, 200)
+    renderer.update(16)
+    renderer.render(dest, (0, 0))
+    assert stats.last.counts["dirty_nodes"] == 8 # the overriding node keeps its color
+    assert root.button3.style.computed.color == (0, 120, 200) and root.hovered.style.computed.color == (90, 90, 90)
+    assert pygame.image.tobytes(renderer.surface, "RGBA") == pygame.image.tobytes(full_redraw(renderer), "RGBA")
+
+
+@pytest.mark.parametrize("retained", ["cache_as_surface", "layer"])
+def test_clip_invalidates_retained_descendants(retained: str):
+    def render(clip: bool, renderer: ViewRenderer | None = None) -> tuple[ViewRenderer, pygame.surface.Surface]:
+        if renderer is None:
+            outer = Frame("outer", (10, 10, 20, 20), color=(0, 0, 0), clip=clip)
+            Frame("inner", (0, 0, 60, 60), color=(255, 0, 0), **{retained: True}).join(outer)
+            renderer = ViewRenderer((100, 100), (outer,))
+        dest = pygame.surface.Surface((100, 100))
+        renderer.update(16)
+        renderer.render(dest, (0, 0))
+        return renderer, dest
+
+    renderer, dest = render(clip=False)
+    assert dest.get_at((50, 50)) == (255, 0, 0, 255)
+    renderer.layout[0].style.clip = True # the retained surface was drawn without the clip
+    dest = render(True, renderer)[1]
+    assert dest.get_at((50, 50)) == (0, 0, 0, 255) and dest.get_at((20, 20)) == (255, 0, 0, 255)
+    assert pygame.image.tobytes(dest, "RGB") == pygame.image.tobytes(render(clip=True)[1], "RGB")
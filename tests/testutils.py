@@ -8,7 +8,8 @@ def make_concrete(abctype: type[_T]) -> type[_T]:
     
         All abstract methods in the new type are overwritten with a NO-OP function. 
     """
-    new_dict = dict(abctype.__dict__)
+    slots = getattr(abctype, "__slots__", ())
+    new_dict = {key: value for key, value in abctype.__dict__.items() if key not in (*slots, "__slots__", "__dict__", "__weakref__")}
     for abstractmethod in getattr(abctype, "__abstractmethods__"):
         new_dict[abstractmethod] = lambda *args, **kwargs: None
         